@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "BlogHub.settings")
+# Read by the settings to pick connection defaults that suit ASGI
+os.environ.setdefault("BLOGHUB_ASGI", "True")
 
 application = get_asgi_application()
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -26,6 +27,8 @@ SECRET_KEY = os.getenv('SECRET_KEY')
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+TESTING = sys.argv[1:2] == ['test']
+
 ALLOWED_HOSTS = []
 
 
@@ -43,20 +46,23 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "blog.profiling.QueryProfileMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "blog.routers.ReplicaPinningMiddleware",
 ]
 
 ROOT_URLCONF = "BlogHub.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "blog.profiling.ProfilingDjangoTemplates",
         "DIRS": [BASE_DIR / 'templates']
         ,
         "APP_DIRS": True,
@@ -65,6 +71,8 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "blog.context_processors.cache_settings",
+                "blog.context_processors.navigation",
             ],
         },
     },
@@ -78,6 +86,27 @@ WSGI_APPLICATION = "BlogHub.wsgi.application"
 load_dotenv()
 
 
+# Connection reuse. DB_POOL=True uses psycopg's connection pool (needs
+# psycopg[pool]); otherwise each worker thread keeps its connection open for
+# DB_CONN_MAX_AGE seconds (0 closes it after every request, None never does).
+# Health checks test a reused connection before handing it to a request.
+# Under ASGI (BlogHub.asgi sets BLOGHUB_ASGI) the ORM runs in executor
+# threads that outlive requests, so persistent connections pile up and
+# DB_CONN_MAX_AGE defaults to 0; use DB_POOL=True to reuse connections.
+
+RUNNING_ASGI = os.getenv('BLOGHUB_ASGI', 'False') == 'True'
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+DB_CONN_MAX_AGE = os.getenv('DB_CONN_MAX_AGE', '0' if RUNNING_ASGI else '60')
+
+DATABASE_OPTIONS = {}
+if DB_POOL:
+    DATABASE_OPTIONS['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', 600)),
+    }
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -86,9 +115,70 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        # The pool owns connection lifetimes, so Django must not keep them
+        'CONN_MAX_AGE': 0 if DB_POOL else (None if DB_CONN_MAX_AGE == 'None' else int(DB_CONN_MAX_AGE)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+        'OPTIONS': DATABASE_OPTIONS,
+    }
+}
+
+# Read replica: set DB_REPLICA_HOST (and any DB_REPLICA_* that differ from
+# the primary) to serve listing and detail reads from it. Clients that just
+# wrote stay on the primary for DB_REPLICA_PIN_SECONDS. Tests always get a
+# separate, empty "replica" database instead, and the routing tests switch
+# BLOG_READ_REPLICA on themselves.
+
+BLOG_READ_REPLICA = None
+if TESTING:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'TEST': {'NAME': f"test_{DATABASES['default']['NAME']}_replica"},
+    }
+elif os.getenv('DB_REPLICA_HOST'):
+    BLOG_READ_REPLICA = 'replica'
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+    }
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+BLOG_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 10))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND is "locmem", "file", "redis" or a dotted backend path; any
+# Redis-compatible server (or a local stand-in) works via CACHE_LOCATION.
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_DEFAULT_LOCATIONS = {
+    'locmem': 'bloghub',
+    'file': str(BASE_DIR / '.cache'),
+    'redis': 'redis://127.0.0.1:6379/1',
+}
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND),
+        "LOCATION": os.getenv('CACHE_LOCATION', CACHE_DEFAULT_LOCATIONS.get(CACHE_BACKEND, '')),
+        "TIMEOUT": 300,
     }
 }
 
+# Anonymous full-page and template fragment caching (seconds, 0 disables)
+BLOG_PAGE_CACHE_TIMEOUT = int(os.getenv('BLOG_PAGE_CACHE_TIMEOUT', 300))
+BLOG_FRAGMENT_CACHE_TIMEOUT = int(os.getenv('BLOG_FRAGMENT_CACHE_TIMEOUT', 900))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -131,6 +221,65 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+STATIC_ROOT = os.getenv('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+
+# collectstatic prunes BLOG_PRUNE_CSS to the classes the templates use, hashes
+# every file name and writes .gz/.br copies. The test runner renders
+# templates without a collected manifest, so it keeps the plain storage.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage" if TESTING
+            else "blog.staticfiles.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
+BLOG_PRUNE_CSS = ['css/bootstrap.min.css']
+
+# Serve STATIC_ROOT from Django (pre-compressed, hashed names cached as
+# immutable) when no web server in front does it.
+BLOG_SERVE_STATIC = os.getenv('BLOG_SERVE_STATIC', str(not DEBUG)) == 'True'
+
+# Post view counting
+# Views are buffered in memory and written in batches; this is the maximum
+# number of seconds a view can wait before reaching the database (0 writes through,
+# the default under tests so no flusher thread outlives a test database).
+
+BLOG_VIEW_COUNT_FLUSH_INTERVAL = int(os.getenv('BLOG_VIEW_COUNT_FLUSH_INTERVAL', 0 if TESTING else 10))
+
+# Admin bulk actions
+# Posts are updated BLOG_BULK_CHUNK_SIZE at a time, one short transaction per
+# chunk; selections over BLOG_BULK_BACKGROUND_THRESHOLD run as a background
+# job (a thread of the web process, resumed by "manage.py run_bulk_jobs").
+# No threads under tests, where jobs are run explicitly.
+
+BLOG_BULK_CHUNK_SIZE = int(os.getenv('BLOG_BULK_CHUNK_SIZE', 500))
+BLOG_BULK_BACKGROUND_THRESHOLD = int(os.getenv('BLOG_BULK_BACKGROUND_THRESHOLD', 2000))
+BLOG_BULK_JOB_THREADS = os.getenv('BLOG_BULK_JOB_THREADS', str(not TESTING)) == 'True'
+
+# Request profiling
+# Every response carries a Server-Timing header and a JSON line is logged on
+# "blog.profiling". Views over their @query_budget raise while testing.
+
+BLOG_ENFORCE_QUERY_BUDGETS = os.getenv('BLOG_ENFORCE_QUERY_BUDGETS', str(TESTING)) == 'True'
+BLOG_PROFILE_ALLOCATIONS = os.getenv('BLOG_PROFILE_ALLOCATIONS', 'False') == 'True'
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "blog.profiling": {
+            "handlers": ["console"],
+            "level": os.getenv('BLOG_PROFILE_LOG_LEVEL', 'WARNING' if TESTING else 'INFO'),
+            "propagate": False,
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
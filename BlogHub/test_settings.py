@@ -0,0 +1,21 @@
+"""
+Settings for running the test suite without PostgreSQL:
+
+    python manage.py test --settings=BlogHub.test_settings
+
+Two local SQLite databases stand in for the primary and the read replica.
+"""
+from .settings import *  # noqa: F401,F403
+
+SECRET_KEY = SECRET_KEY or 'insecure-test-key'  # noqa: F405
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',  # noqa: F405
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db-replica.sqlite3',  # noqa: F405
+    },
+}
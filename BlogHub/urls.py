@@ -14,8 +14,11 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from blog.staticfiles import serve as serve_static
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -23,3 +26,6 @@ urlpatterns = [
 
 
 ]
+
+if settings.BLOG_SERVE_STATIC:
+    urlpatterns.insert(0, re_path(rf"^{settings.STATIC_URL.lstrip('/')}(?P<path>.*)$", serve_static))
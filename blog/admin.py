@@ -1,8 +1,12 @@
 from django.contrib import admin
+from django.urls import reverse
 from unicodedata import category
 
-from .models import Category, Tag, Post, Comment
-from django.utils.html import format_html
+from . import bulk
+from .archive import load_archived_content
+from .changelist import AutocompleteFilter, EstimatedCountPaginator, autocomplete_filter_media
+from .models import BulkJob, Category, Tag, Post, Comment
+from django.utils.html import format_html, format_html_join
 
 # Register your models here.
 @admin.register(Tag)
@@ -13,9 +17,10 @@ class TagAdmin(admin.ModelAdmin):
     list_per_page = 20
 
     def post_count(self, obj):
-        return obj.posts.count()
+        return obj.post_count
 
     post_count.short_description = "Used In Posts"
+    post_count.admin_order_field = "post_count"
 
 
 @admin.register(Post)
@@ -38,8 +43,8 @@ class PostAdmin(admin.ModelAdmin):
         "status",
         "is_featured",
         "category",
-        "author",
-        "tags",
+        ("author", AutocompleteFilter),
+        ("tags", AutocompleteFilter),
         "created_at",
     )
     search_fields = (
@@ -52,6 +57,9 @@ class PostAdmin(admin.ModelAdmin):
     )
 
     list_per_page = 15
+    paginator = EstimatedCountPaginator
+    # Filtered changelists would otherwise COUNT(*) the whole table as well
+    show_full_result_count = False
     prepopulated_fields = {'slug': ('title',)}
 
     fieldsets = (
@@ -59,7 +67,7 @@ class PostAdmin(admin.ModelAdmin):
             'fields': ('title', 'slug', 'author')
         }),
         ('Content', {
-            'fields': ('excerpt', 'content')
+            'fields': ('excerpt', 'content', 'content_format')
         }),
         ('Classification', {
             'fields': ('category', 'tags')
@@ -72,52 +80,77 @@ class PostAdmin(admin.ModelAdmin):
             'classes': ('collapse',),  # Collapsible section
         }),
     )
-    filter_horizontal = ('tags',)
+    autocomplete_fields = ('author', 'category', 'tags')
 
     readonly_fields = ("views_count", "created_at")
 
 
     actions = ['make_published', 'make_draft', 'reset_views']
 
-    def make_published(self, request, queryset):
-        """Publish selected posts."""
-        updated = queryset.update(status=Post.Status.PUBLISHED)
+    @property
+    def media(self):
+        return super().media + autocomplete_filter_media(self.admin_site)
+
+    def get_queryset(self, request):
+        # One query for the page, whatever list_display shows per row
+        return super().get_queryset(request).select_related('author', 'category').prefetch_related('tags')
+
+    def get_object(self, request, object_id, from_field=None):
+        # Edit the content of archived posts, not the emptied hot columns
+        post = super().get_object(request, object_id, from_field)
+        return post and load_archived_content(post)
+
+    def run_bulk(self, request, queryset, operation, done_message, level='info'):
+        """Apply a ``blog.bulk`` operation in chunks, in the background for large selections."""
+        total = queryset.count()
+        if total <= bulk.background_threshold():
+            self.message_user(request, done_message.format(count=bulk.apply(operation, queryset)), level=level)
+            return
+        job = bulk.create_job(operation, queryset, user=request.user)
+        bulk.start_job(job)
         self.message_user(
             request,
-            f'{updated} post(s) were successfully published.'
+            format_html(
+                '{} post(s) are being processed in the background; <a href="{}">follow the progress</a>.',
+                total,
+                reverse('admin:blog_bulkjob_change', args=[job.pk]),
+            ),
+        )
+
+    def make_published(self, request, queryset):
+        """Publish selected posts."""
+        self.run_bulk(
+            request, queryset, BulkJob.Operation.PUBLISH,
+            '{count} post(s) were successfully published.'
         )
 
     make_published.short_description = 'Publish selected posts'
 
     def make_draft(self, request, queryset):
         """Set selected posts to draft."""
-        updated = queryset.update(status=Post.Status.DRAFT)
-        self.message_user(
-            request,
-            f'{updated} post(s) were set to draft.'
+        self.run_bulk(
+            request, queryset, BulkJob.Operation.DRAFT,
+            '{count} post(s) were set to draft.'
         )
 
     make_draft.short_description = 'Set selected posts to draft'
 
     def reset_views(self, request, queryset):
         """Reset view count to zero."""
-        updated = queryset.update(views_count=0)
-        self.message_user(
-            request,
-            f'View count reset for {updated} post(s).',
-            level='warning'
+        self.run_bulk(
+            request, queryset, BulkJob.Operation.RESET_VIEWS,
+            'View count reset for {count} post(s).', level='warning'
         )
 
     reset_views.short_description = 'Reset view count'
 
     def tag_list(self, obj):
-        tags = obj.tags.all()
-        tags_list = []
-        for tag in tags:
-            tags_list.append(
-                f"<span style='color:white;background-color:#333;padding:0 5px;border-radius:8px;'>{tag.name}</span>"
-            )
-        return format_html(" ".join(tags_list))
+        # Prefetched by get_queryset
+        return format_html_join(
+            " ",
+            "<span style='color:white;background-color:#333;padding:0 5px;border-radius:8px;'>{}</span>",
+            ((tag.name,) for tag in obj.tags.all()),
+        )
 
     tag_list.short_description = "Tags"
 
@@ -134,4 +167,30 @@ class PostAdmin(admin.ModelAdmin):
 class CommentAdmin(admin.ModelAdmin):
     pass
 
-admin.site.register(Category)
\ No newline at end of file
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ("name", "published_post_count")
+    search_fields = ("name",)
+
+
+@admin.register(BulkJob)
+class BulkJobAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "status", "progress_bar", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "operation")
+    fields = ("operation", "status", "progress_bar", "total", "processed", "last_pk",
+              "error", "created_by", "created_at", "updated_at", "finished_at")
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        # Jobs are started from the post actions
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def progress_bar(self, obj):
+        return format_html(
+            '<progress value="{}" max="100"></progress> {}%', obj.progress, obj.progress
+        )
+
+    progress_bar.short_description = "Progress"
@@ -0,0 +1,98 @@
+"""
+Archive tiering of post content.
+
+Archiving moves the heavy columns of a post (``content`` and
+``content_html``) into ``PostArchive`` and leaves them empty in
+``blog_post``, so listings and their indexes only carry narrow rows; the
+summary and read time stay on the post. ``post_detail`` and the edit
+views load the archived copy back onto the instance with one primary key
+lookup, and saving edited content brings the post back to the hot table.
+
+The ``archive_posts`` command moves archived posts (and, with
+``--older-than``, posts published long ago) in and out in batches.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Post, PostArchive
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def archivable_posts(older_than_days=None):
+    """Posts whose content should be archived: archived ones, and optionally old published ones."""
+    condition = Q(status=Post.Status.ARCHIVED)
+    if older_than_days is not None:
+        condition |= Q(
+            status=Post.Status.PUBLISHED,
+            published_at__lt=timezone.now() - timedelta(days=older_than_days),
+        )
+    return Post.objects.filter(condition, content_archived=False)
+
+
+def archive_batch(queryset, after_pk=0, batch_size=DEFAULT_BATCH_SIZE):
+    """Archive the next batch of ``queryset`` after ``after_pk``; returns the primary keys moved."""
+    with transaction.atomic():
+        posts = list(
+            queryset.filter(pk__gt=after_pk, content_archived=False).order_by('pk')
+            .values_list('pk', 'content', 'content_html')[:batch_size]
+        )
+        if not posts:
+            return []
+        PostArchive.objects.bulk_create([
+            PostArchive(post_id=pk, content=content, content_html=content_html)
+            for pk, content, content_html in posts
+        ])
+        pks = [pk for pk, _, _ in posts]
+        # Readers see the same page, so updated_at and the caches stay as they are
+        Post.objects.filter(pk__in=pks).update(content='', content_html='', content_archived=True)
+    return pks
+
+
+def restore_batch(queryset, after_pk=0, batch_size=DEFAULT_BATCH_SIZE):
+    """Bring the next batch of archived posts of ``queryset`` back; returns their primary keys."""
+    with transaction.atomic():
+        pks = list(
+            queryset.filter(pk__gt=after_pk, content_archived=True).order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return []
+        archives = PostArchive.objects.filter(post_id__in=pks)
+        Post.objects.bulk_update(
+            [
+                Post(pk=archive.post_id, content=archive.content, content_html=archive.content_html,
+                     content_archived=False)
+                for archive in archives
+            ],
+            ['content', 'content_html', 'content_archived'],
+        )
+        archives.delete()
+    return pks
+
+
+def _archived_content(post):
+    return PostArchive.objects.filter(post_id=post.pk).values('content', 'content_html')
+
+
+def _fill(post, archive):
+    if archive is not None:
+        post.content, post.content_html = archive['content'], archive['content_html']
+        post._archived_content_loaded = True
+    return post
+
+
+def _needs_loading(post):
+    return post.content_archived and not post.__dict__.get('_archived_content_loaded')
+
+
+def load_archived_content(post):
+    """Fill in the content of an archived ``post`` from ``PostArchive``; no query for others."""
+    return _fill(post, _archived_content(post).first()) if _needs_loading(post) else post
+
+
+async def aload_archived_content(post):
+    return _fill(post, await _archived_content(post).afirst()) if _needs_loading(post) else post
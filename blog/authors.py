@@ -0,0 +1,95 @@
+"""
+Materialized author statistics (``AuthorProfile``).
+
+Signals keep ``published_post_count``, ``total_views`` and
+``latest_published_at`` current with ``F()`` updates as posts change, the
+view counter adds views when it flushes, and ``recount_authors`` rebuilds
+them from scratch (``recount`` command, bulk imports).
+"""
+from django.contrib.auth.models import User
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import AuthorProfile, Post
+from .slugs import allocate_slugs
+
+LEADERBOARD_ORDERINGS = {
+    'posts': ('-published_post_count', '-total_views', 'id'),
+    'views': ('-total_views', 'id'),
+}
+
+
+def _published_posts(user_field):
+    return Post.objects.filter(
+        status=Post.Status.PUBLISHED, author_id=OuterRef(user_field)
+    ).order_by().values('author_id')
+
+
+def ensure_profiles(user_ids):
+    """Create the missing profiles of ``user_ids`` in bulk (users created with ``bulk_create``)."""
+    missing = list(User.objects.filter(pk__in=user_ids, author_profile__isnull=True).values_list('pk', 'username'))
+    if missing:
+        slugs = allocate_slugs(AuthorProfile, [username for _, username in missing])
+        AuthorProfile.objects.bulk_create(
+            [AuthorProfile(user_id=pk, slug=slug) for (pk, _), slug in zip(missing, slugs)],
+            ignore_conflicts=True,
+        )
+
+
+def recount_authors(user_ids=None):
+    profiles = AuthorProfile.objects.all() if user_ids is None else AuthorProfile.objects.filter(user_id__in=user_ids)
+    return profiles.update(
+        published_post_count=Coalesce(
+            Subquery(_published_posts('user_id').annotate(total=Count('*')).values('total'),
+                     output_field=IntegerField()),
+            Value(0),
+        ),
+        total_views=Coalesce(
+            Subquery(
+                Post.objects.filter(author_id=OuterRef('user_id')).order_by().values('author_id')
+                .annotate(total=Sum('views_count')).values('total'),
+            ),
+            Value(0),
+        ),
+        latest_published_at=Subquery(
+            _published_posts('user_id').annotate(latest=Max('published_at')).values('latest')
+        ),
+    )
+
+
+def refresh_latest_published(user_ids):
+    AuthorProfile.objects.filter(user_id__in=user_ids).update(
+        latest_published_at=Subquery(
+            _published_posts('user_id').annotate(latest=Max('published_at')).values('latest')
+        )
+    )
+
+
+def adjust_author(user_id, posts=0, views=0):
+    changes = {}
+    if posts:
+        changes['published_post_count'] = F('published_post_count') + posts
+    if views:
+        changes['total_views'] = F('total_views') + views
+    if user_id is not None and changes:
+        AuthorProfile.objects.filter(user_id=user_id).update(**changes)
+
+
+def add_views(post_ids, count):
+    """Add ``count`` views per post in ``post_ids`` to their authors' totals, in one UPDATE."""
+    posts = Post.objects.filter(pk__in=post_ids).order_by()
+    AuthorProfile.objects.filter(
+        user_id__in=posts.values('author_id')
+    ).update(
+        total_views=F('total_views') + count * Subquery(
+            posts.filter(author_id=OuterRef('user_id')).values('author_id')
+            .annotate(total=Count('*')).values('total'),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def leaderboard(order='posts', limit=50):
+    return AuthorProfile.objects.filter(
+        published_post_count__gt=0
+    ).select_related('user').order_by(*LEADERBOARD_ORDERINGS[order])[:limit]
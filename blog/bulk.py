@@ -0,0 +1,182 @@
+"""
+Chunked bulk operations on posts, for the admin actions.
+
+A selection is walked in primary key order, ``chunk_size`` posts at a
+time: each chunk is updated in its own short transaction, then the
+counters, author statistics and caches of just those posts are brought up
+to date. Selections larger than ``background_threshold`` become a
+``BulkJob`` run outside the request. The job stores the primary keys it
+was started with (plain JSON, not a query that later code would have to
+rebuild) and the last one it finished, so ``run_bulk_jobs`` resumes it
+where an interrupted worker stopped, and its progress shows in the admin.
+"""
+import bisect
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
+
+from .authors import recount_authors
+from .cache import category_tag, invalidate_post_cards, invalidate_tags, post_tag
+from .counters import recount_categories
+from .models import BulkJob, Post
+from .related import invalidate_neighbour_pages
+from .stats import invalidate_homepage_stats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_BACKGROUND_THRESHOLD = 2000
+# A running job whose heartbeat is older than this lost its worker
+STALE_AFTER = timedelta(minutes=5)
+# Fields of the rows ``update_rows`` and ``refresh_rows`` take
+ROW_FIELDS = ('pk', 'slug', 'author_id', 'category_id', 'category__slug')
+
+
+def chunk_size():
+    return getattr(settings, 'BLOG_BULK_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def background_threshold():
+    return getattr(settings, 'BLOG_BULK_BACKGROUND_THRESHOLD', DEFAULT_BACKGROUND_THRESHOLD)
+
+
+def _status_changes(status):
+    changes = {'status': status, 'related_stale': True, 'updated_at': Now()}
+    if status == Post.Status.PUBLISHED:
+        # Same rule as Post.save: keep an existing publish date
+        changes['published_at'] = Coalesce(F('published_at'), Now())
+    return changes
+
+
+# operation: (changes, status changed)
+OPERATIONS = {
+    BulkJob.Operation.PUBLISH: (_status_changes(Post.Status.PUBLISHED), True),
+    BulkJob.Operation.DRAFT: (_status_changes(Post.Status.DRAFT), True),
+    BulkJob.Operation.RESET_VIEWS: ({'views_count': 0, 'updated_at': Now()}, False),
+}
+
+
+def update_rows(operation, rows):
+    """Apply ``operation`` to the posts of ``rows``."""
+    changes, _ = OPERATIONS[operation]
+    Post.objects.filter(pk__in=[row['pk'] for row in rows]).update(**changes)
+
+
+def refresh_rows(operation, rows):
+    """
+    Recount the counters the posts of ``rows`` feed and drop the cached
+    pages showing them. Run it after the update commits: the recounts lock
+    shared category and author rows, which must not be held with the posts.
+    """
+    _, status_changed = OPERATIONS[operation]
+    if status_changed:
+        recount_categories({row['category_id'] for row in rows} - {None})
+    recount_authors({row['author_id'] for row in rows})
+    invalidate_tags(
+        'posts',
+        *{post_tag(row['slug']) for row in rows},
+        *{category_tag(row['category__slug']) for row in rows if row['category__slug']},
+    )
+    invalidate_post_cards([row['pk'] for row in rows])
+    invalidate_neighbour_pages([row['pk'] for row in rows])
+    invalidate_homepage_stats()
+
+
+def process_chunk(operation, queryset, after_pk=0, size=None):
+    """
+    Apply ``operation`` to the next chunk of ``queryset`` after ``after_pk``;
+    returns the primary keys processed (empty once the selection is done).
+    """
+    with transaction.atomic():
+        rows = list(queryset.filter(pk__gt=after_pk).order_by('pk').values(*ROW_FIELDS)[:size or chunk_size()])
+        if rows:
+            update_rows(operation, rows)
+    if rows:
+        refresh_rows(operation, rows)
+    return [row['pk'] for row in rows]
+
+
+def apply(operation, queryset):
+    """Run ``operation`` over the whole of ``queryset`` now; returns the number of posts."""
+    total = 0
+    after_pk = 0
+    while pks := process_chunk(operation, queryset, after_pk):
+        total += len(pks)
+        after_pk = pks[-1]
+    return total
+
+
+def create_job(operation, queryset, user=None):
+    post_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    return BulkJob.objects.create(
+        operation=operation, post_ids=post_ids, total=len(post_ids), created_by=user,
+    )
+
+
+def job_chunks(job):
+    """The selected primary keys after ``job.last_pk``, ``chunk_size()`` at a time."""
+    post_ids = job.post_ids
+    size = chunk_size()
+    for start in range(bisect.bisect_right(post_ids, job.last_pk), len(post_ids), size):
+        yield post_ids[start:start + size]
+
+
+def claim(job):
+    """Mark ``job`` as running for this worker; ``False`` if another worker has it."""
+    claimed = BulkJob.objects.filter(claimable_jobs(), pk=job.pk).update(
+        status=BulkJob.Status.RUNNING, updated_at=timezone.now()
+    )
+    return bool(claimed)
+
+
+def claimable_jobs():
+    return Q(status=BulkJob.Status.PENDING) | Q(
+        status=BulkJob.Status.RUNNING, updated_at__lt=timezone.now() - STALE_AFTER
+    )
+
+
+def run_job(job):
+    """Process ``job`` from its last finished chunk; returns ``False`` if it was not claimed."""
+    if not claim(job):
+        return False
+    job.refresh_from_db()
+    try:
+        for post_ids in job_chunks(job):
+            # Posts deleted since the job started are simply not found
+            process_chunk(job.operation, Post.objects.filter(pk__in=post_ids), job.last_pk, len(post_ids))
+            job.last_pk = post_ids[-1]
+            job.processed += len(post_ids)
+            job.save(update_fields=['last_pk', 'processed', 'updated_at'])
+    except Exception as error:
+        logger.exception('Bulk job %s failed', job.pk)
+        job.status, job.error = BulkJob.Status.FAILED, str(error)
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        raise
+    job.status, job.finished_at = BulkJob.Status.DONE, timezone.now()
+    job.save(update_fields=['status', 'finished_at', 'updated_at'])
+    return True
+
+
+def _run_in_thread(job_pk):
+    try:
+        run_job(BulkJob.objects.get(pk=job_pk))
+    except Exception:
+        # Logged and recorded on the job by run_job
+        pass
+    finally:
+        connections.close_all()
+
+
+def start_job(job):
+    """Run ``job`` in a background thread once the current transaction commits."""
+    if not getattr(settings, 'BLOG_BULK_JOB_THREADS', True):
+        return
+    transaction.on_commit(lambda: threading.Thread(
+        target=_run_in_thread, args=(job.pk,), name=f'blog-bulk-job-{job.pk}', daemon=True
+    ).start())
@@ -0,0 +1,140 @@
+"""
+Page and fragment caching for anonymous traffic.
+
+Cached pages are keyed by URL plus the versions of the *tags* they depend
+on (``post:<slug>``, ``category:<slug>``, ``posts`` ...). Invalidating a
+tag bumps its version, so only the pages that depend on it are missed;
+nothing has to enumerate keys. Template fragments are evicted directly
+with ``make_template_fragment_key``.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.cache import patch_vary_headers
+
+DEFAULT_PAGE_CACHE_TIMEOUT = 60 * 5
+DEFAULT_FRAGMENT_CACHE_TIMEOUT = 60 * 15
+
+# Fragment names used with {% cache %} around post cards in the listing templates
+POST_CARD_FRAGMENTS = ('posts_card', 'category_posts_card', 'search_posts_card')
+
+
+def page_cache_timeout():
+    return getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', DEFAULT_PAGE_CACHE_TIMEOUT)
+
+
+def fragment_cache_timeout():
+    return getattr(settings, 'BLOG_FRAGMENT_CACHE_TIMEOUT', DEFAULT_FRAGMENT_CACHE_TIMEOUT)
+
+
+def _tag_key(tag):
+    return f'blog:cache-tag:{hashlib.md5(tag.encode()).hexdigest()}'
+
+
+def tag_versions(tags):
+    keys = {tag: _tag_key(tag) for tag in tags}
+    stored = cache.get_many(keys.values())
+    return [stored.get(keys[tag], 0) for tag in tags]
+
+
+def invalidate_tags(*tags):
+    """Bump the version of every tag so pages depending on them are missed."""
+    for tag in tags:
+        key = _tag_key(tag)
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+
+
+def category_tag(slug):
+    return f'category:{slug}'
+
+
+def post_tag(slug):
+    return f'post:{slug}'
+
+
+def page_cache_key(request, tags):
+    raw = '|'.join([request.get_full_path(), *map(str, tag_versions(tags))])
+    return f'blog:page:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def is_cacheable_request(request):
+    # Anything tied to a session (logged-in users, pending flash messages)
+    # is rendered per user and must never be shared.
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+    )
+
+
+def cache_anonymous_page(tags, on_hit=None):
+    """
+    Cache a view's response for anonymous visitors.
+
+    ``tags(**view_kwargs)`` returns the tags the page depends on. ``on_hit``
+    is called as ``on_hit(request, response, **view_kwargs)`` whenever the
+    cached copy is served, for work that must still happen per request.
+    """
+
+    def lookup(request, kwargs):
+        """Return ``(key, cached response)``; no key means the page must not be cached."""
+        if page_cache_timeout() <= 0 or not is_cacheable_request(request):
+            return None, None
+        key = page_cache_key(request, tags(**kwargs))
+        response = cache.get(key)
+        if response is not None and on_hit is not None:
+            on_hit(request, response, **kwargs)
+        return key, response
+
+    def store(key, response):
+        patch_vary_headers(response, ['Cookie'])
+        if key is not None and response.status_code == 200 and not response.cookies:
+            cache.set(key, response, page_cache_timeout())
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                key, response = await sync_to_async(lookup)(request, kwargs)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    await sync_to_async(store)(key, response)
+                return response
+
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            key, response = lookup(request, kwargs)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                store(key, response)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_post_cards(post_ids):
+    cache.delete_many([
+        make_template_fragment_key(fragment, [post_id])
+        for post_id in post_ids
+        for fragment in POST_CARD_FRAGMENTS
+    ])
+
+
+def invalidate_related_fragments(post_ids):
+    cache.delete_many([
+        make_template_fragment_key('related_posts', [post_id])
+        for post_id in post_ids
+    ])
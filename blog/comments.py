@@ -0,0 +1,77 @@
+"""
+Threaded comments.
+
+Pages are made of top-level comments (threads), cursor-paginated newest
+first. All replies of a page's threads are fetched in a single query via
+``Comment.root`` and attached to their parents in one pass, so rendering a
+page costs two queries however deep or wide the threads are.
+"""
+from .models import Comment
+from .pagination import CursorPaginator
+
+COMMENTS_PER_PAGE = 20
+COMMENT_ORDERING = ('-created_at', '-id')
+
+
+def build_comment_tree(comments):
+    """
+    Attach each comment to its parent's ``children`` list and return the
+    top-level ones, in the order given. Replies whose parent is not in
+    ``comments`` (e.g. unapproved) are dropped with it.
+    """
+    by_id = {}
+    for comment in comments:
+        comment.children = []
+        by_id[comment.pk] = comment
+
+    roots = []
+    for comment in comments:
+        if comment.parent_id is None:
+            roots.append(comment)
+        elif comment.parent_id in by_id:
+            by_id[comment.parent_id].children.append(comment)
+    return roots
+
+
+def approved_comments(post_id):
+    return Comment.objects.filter(post_id=post_id, is_approved=True).select_related('author')
+
+
+def _thread_paginator(post_id, per_page):
+    return CursorPaginator(
+        approved_comments(post_id).filter(parent__isnull=True),
+        per_page,
+        ordering=COMMENT_ORDERING,
+    )
+
+
+def _replies(post_id, threads):
+    return approved_comments(post_id).filter(root__in=threads).order_by('created_at', 'id')
+
+
+def get_comment_page(post_id, cursor=None, per_page=COMMENTS_PER_PAGE):
+    """A ``CursorPage`` of threads, each with its replies attached."""
+    page = _thread_paginator(post_id, per_page).get_page(cursor)
+    if page.object_list:
+        # Threads first, so replies find their roots
+        build_comment_tree([*page.object_list, *_replies(post_id, page.object_list)])
+    return page
+
+
+async def aget_comment_page(post_id, cursor=None, per_page=COMMENTS_PER_PAGE):
+    page = await _thread_paginator(post_id, per_page).aget_page(cursor)
+    if page.object_list:
+        replies = [reply async for reply in _replies(post_id, page.object_list)]
+        build_comment_tree([*page.object_list, *replies])
+    return page
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.pk,
+        'parent': comment.parent_id,
+        'author': comment.author.username,
+        'content': comment.content,
+        'created_at': comment.created_at.isoformat(),
+        'replies': [serialize_comment(child) for child in comment.children],
+    }
@@ -0,0 +1,94 @@
+"""
+Conditional GET for anonymous pages.
+
+A page's validators come from one cheap query returning the newest
+``updated_at`` behind it (an index-only lookup) combined with the versions
+of its page cache tags, which signals bump for changes ``updated_at``
+cannot see (deletions, tag and category edits). Clients and CDNs holding a
+matching ``ETag`` or a recent enough ``If-Modified-Since`` get a 304
+without the view or its templates running.
+
+``Last-Modified`` is only sent where ``updated_at`` sees every change:
+deleting, unpublishing or renaming a post leaves the newest ``updated_at``
+of a listing as it was, so listings are revalidated by ``ETag`` alone.
+
+Apply it inside ``cache_anonymous_page``: cached copies keep the
+validators, and ``ConditionalGetMiddleware`` answers them with a 304
+without any query.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .cache import is_cacheable_request, tag_versions
+
+
+def make_etag(request, updated_at, tags):
+    raw = '|'.join([request.get_full_path(), updated_at.isoformat(), *map(str, tag_versions(tags))])
+    # Weak: the same page may be served with different encodings
+    return f'W/"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+
+def conditional_page(latest, tags, on_not_modified=None, last_modified=True):
+    """
+    Answer conditional GETs of a view from validators instead of rendering.
+
+    ``latest(**view_kwargs)`` returns a row (a dict) whose ``updated_at`` is
+    the newest change behind the page, or ``None`` to let the view run
+    (e.g. to 404). ``tags(**view_kwargs)`` are the page cache tags the page
+    depends on. ``on_not_modified(request, row, **view_kwargs)`` runs for
+    every 304, for work that must still happen per request. Pass
+    ``last_modified=False`` for pages changes can leave ``updated_at``
+    behind, such as listings.
+    """
+
+    def validate(request, kwargs):
+        """Return ``(validators, 304 response or None)``."""
+        if not is_cacheable_request(request):
+            return None, None
+        row = latest(**kwargs)
+        if row is None or row['updated_at'] is None:
+            return None, None
+        validators = {'ETag': make_etag(request, row['updated_at'], tags(**kwargs))}
+        if last_modified:
+            validators['Last-Modified'] = http_date(row['updated_at'].timestamp())
+        response = get_conditional_response(
+            request,
+            etag=validators['ETag'],
+            last_modified=int(row['updated_at'].timestamp()) if last_modified else None,
+        )
+        if response is not None and response.status_code == 304 and on_not_modified is not None:
+            on_not_modified(request, row, **kwargs)
+        return validators, response
+
+    def finish(response, validators):
+        if validators is not None and response.status_code in (200, 304):
+            for header, value in validators.items():
+                response.headers.setdefault(header, value)
+        patch_vary_headers(response, ['Cookie'])
+        return response
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                validators, response = await sync_to_async(validate)(request, kwargs)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return finish(response, validators)
+
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            validators, response = validate(request, kwargs)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return finish(response, validators)
+
+        return wrapper
+
+    return decorator
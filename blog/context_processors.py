@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cache import fragment_cache_timeout
+from .navigation import get_nav_categories
+
+
+def cache_settings(request):
+    """Expose the fragment cache timeout to {% cache %} tags in templates."""
+    return {'fragment_cache_timeout': fragment_cache_timeout()}
+
+
+def navigation(request):
+    """The navbar's categories, looked up only if the template renders them."""
+    return {'nav_categories': SimpleLazyObject(get_nav_categories)}
@@ -0,0 +1,58 @@
+"""
+Denormalized counters: ``Post.comment_count``, ``Tag.post_count`` and
+``Category.published_post_count``.
+
+Signals adjust them with ``F()`` updates as rows change; the ``recount``
+management command rebuilds them from scratch with set-based updates.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Category, Comment, Post, Tag
+from .navigation import invalidate_nav_categories
+
+
+def _count_subquery(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('*'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def adjust(model, pk, field, delta):
+    if pk is not None and delta:
+        model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+
+
+def recount_comments(post_ids=None):
+    posts = Post.objects.all() if post_ids is None else Post.objects.filter(pk__in=post_ids)
+    return posts.update(
+        comment_count=_count_subquery(Comment.objects.filter(is_approved=True), 'post_id')
+    )
+
+
+def recount_tags(tag_ids=None):
+    tags = Tag.objects.all() if tag_ids is None else Tag.objects.filter(pk__in=tag_ids)
+    return tags.update(post_count=_count_subquery(Post.tags.through.objects.all(), 'tag_id'))
+
+
+def recount_categories(category_ids=None):
+    categories = Category.objects.all() if category_ids is None else Category.objects.filter(pk__in=category_ids)
+    updated = categories.update(
+        published_post_count=_count_subquery(
+            Post.objects.filter(status=Post.Status.PUBLISHED), 'category_id'
+        )
+    )
+    invalidate_nav_categories()
+    return updated
+
+
+def published_category_id(status, category_id):
+    return category_id if status == Post.Status.PUBLISHED else None
@@ -0,0 +1,166 @@
+"""
+Prune stylesheets down to the classes the site uses.
+
+``used_classes`` collects the class names written in the templates and in
+the ``'class'`` attributes of form widgets; ``prune_css`` drops every style
+rule whose selectors all need a class outside that set. Template
+expressions inside a class attribute (``alert-{{ message.tags }}``) keep
+every class with the same prefix, and ``JS_CLASSES`` lists the classes
+Bootstrap's JavaScript adds at runtime.
+"""
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+
+JS_CLASSES = {
+    'active', 'collapse', 'collapsing', 'collapse-horizontal', 'disabled', 'dropdown-menu-end',
+    'dropdown-menu-start', 'dropend', 'dropstart', 'dropup', 'fade', 'hiding', 'modal-backdrop',
+    'modal-open', 'modal-static', 'offcanvas-backdrop', 'show', 'showing', 'was-validated',
+}
+
+# At-rules whose blocks hold style rules that can be pruned one by one
+NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container')
+
+_CLASS_ATTR_RE = re.compile(r'''class\s*=\s*"([^"]*)"|['"]class['"]\s*:\s*['"]([^'"]*)['"]''')
+_TEMPLATE_VAR_RE = re.compile(r'\{\{.*?\}\}')
+_TEMPLATE_TAG_RE = re.compile(r'\{%.*?%\}')
+_SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+_PSEUDO_ARGS_RE = re.compile(r'\([^()]*\)')
+
+
+def class_names(source):
+    """Class names in ``source``; names continued by a template variable end with ``*``."""
+    names = set()
+    for match in _CLASS_ATTR_RE.finditer(source):
+        value = match.group(1) if match.group(1) is not None else match.group(2)
+        value = _TEMPLATE_TAG_RE.sub(' ', _TEMPLATE_VAR_RE.sub('*', value))
+        names.update(name for name in value.split() if name != '*')
+    return names
+
+
+def source_files():
+    """Templates and Python modules of the project's apps and template dirs."""
+    roots = [Path(directory) for backend in settings.TEMPLATES for directory in backend.get('DIRS', [])]
+    roots += [
+        Path(config.path) for config in apps.get_app_configs()
+        if Path(config.path).is_relative_to(settings.BASE_DIR)
+    ]
+    for root in roots:
+        yield from root.rglob('*.html')
+        yield from root.rglob('*.py')
+
+
+def used_classes(paths=None):
+    names = set(JS_CLASSES)
+    for path in paths if paths is not None else source_files():
+        names |= class_names(Path(path).read_text(encoding='utf-8'))
+    return names
+
+
+class _Matcher:
+
+    def __init__(self, names):
+        self.names = {name for name in names if not name.endswith('*')}
+        self.prefixes = tuple(name[:-1] for name in names if name.endswith('*'))
+
+    def __call__(self, name):
+        return name in self.names or (self.prefixes and name.startswith(self.prefixes))
+
+
+def _skip_string(css, i):
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def _find(css, i, stops):
+    """Index of the first of ``stops`` at nesting depth 0, outside strings and comments."""
+    depth = 0
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if css.startswith('/*', i):
+            i = css.index('*/', i + 2) + 2
+            continue
+        if char in stops and depth == 0:
+            return i
+        if char in '{([':
+            depth += 1
+        elif char in '})]':
+            depth -= 1
+        i += 1
+    return len(css)
+
+
+def _split_selectors(prelude):
+    selectors, start = [], 0
+    while start <= len(prelude):
+        end = _find(prelude, start, ',')
+        selectors.append(prelude[start:end])
+        start = end + 1
+    return selectors
+
+
+def _selector_classes(selector):
+    # Classes inside :not()/:is()/... do not have to be present for a match
+    while True:
+        stripped = _PSEUDO_ARGS_RE.sub('', selector)
+        if stripped == selector:
+            break
+        selector = stripped
+    selector = re.sub(r'\[[^\]]*\]', '', selector)
+    return _SELECTOR_CLASS_RE.findall(selector)
+
+
+def _prune_block(css, matcher):
+    out = []
+    i = 0
+    while i < len(css):
+        if css[i].isspace():
+            i += 1
+            continue
+        if css.startswith('/*', i):
+            end = css.index('*/', i + 2) + 2
+            if css.startswith('/*!', i):
+                # License comments stay
+                out.append(css[i:end])
+            i = end
+            continue
+
+        stop = _find(css, i, '{;}')
+        prelude = css[i:stop].strip()
+        if stop >= len(css) or css[stop] != '{':
+            # Statement at-rule (@charset, @import ...) or stray text
+            if prelude:
+                out.append(prelude + ';')
+            i = stop + 1
+            continue
+
+        end = _find(css, stop + 1, '}')
+        body = css[stop + 1:end]
+        i = end + 1
+        if prelude.startswith(NESTED_AT_RULES):
+            inner = _prune_block(body, matcher)
+            if inner:
+                out.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            out.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [
+                selector for selector in _split_selectors(prelude)
+                if all(matcher(name) for name in _selector_classes(selector))
+            ]
+            if selectors:
+                out.append(f'{",".join(selector.strip() for selector in selectors)}{{{body}}}')
+    return ''.join(out)
+
+
+def prune_css(css, names):
+    """``css`` without the rules that cannot match an element using only ``names``."""
+    return _prune_block(css, _Matcher(names))
@@ -0,0 +1,38 @@
+"""
+Connection usage counters for the stats endpoint.
+
+``connection_created`` fires whenever Django opens a new database
+connection (not when it reuses a persistent or pooled one), so the
+``opened`` count per alias shows how well connections are being reused.
+"""
+import threading
+from collections import Counter
+
+from django.db import connections
+
+_opened = Counter()
+_lock = threading.Lock()
+
+
+def record_connection(alias):
+    with _lock:
+        _opened[alias] += 1
+
+
+def connection_stats():
+    """Per-alias connection settings, counters and, if pooled, pool statistics."""
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        pool = getattr(connection, 'pool', None)
+        stats[alias] = {
+            'vendor': connection.vendor,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'pooled': pool is not None,
+            'opened': _opened[alias],
+            # The calling thread's connection only; others are not visible
+            'open_in_thread': connection.connection is not None,
+            'pool': pool.get_stats() if pool is not None else None,
+        }
+    return stats
@@ -2,8 +2,10 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from django.contrib.auth.password_validation import validate_password
+from django.db import transaction
 
 from .models import Post, Category, Tag, User , Comment
+from .tagging import parse_tag_names, resolve_tags
 
 
 class PostForm(forms.ModelForm):
@@ -13,19 +15,45 @@ class PostForm(forms.ModelForm):
 
     class Meta:
         model = Post
-        fields = ['title', 'excerpt', 'content', 'category', 'tags', 'status', 'is_featured', 'allow_comments']
+        fields = ['title', 'excerpt', 'content', 'content_format', 'category', 'tags', 'status', 'published_at', 'is_featured', 'allow_comments']
         widgets = {
             'title': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Enter post title'}),
             'excerpt': forms.Textarea(attrs={'class': 'form-control', 'rows': 3, 'placeholder': 'Short summary'}),
             'content': forms.Textarea(
                 attrs={'class': 'form-control', 'rows': 10, 'placeholder': 'Write your post content'}),
+            'content_format': forms.Select(attrs={'class': 'form-select'}),
             'category': forms.Select(attrs={'class': 'form-control'}),
             'tags': forms.SelectMultiple(attrs={'class': 'form-control'}),
             'status': forms.Select(attrs={'class': 'form-control'}),
+            'published_at': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'},
+                                                format='%Y-%m-%dT%H:%M'),
             'is_featured': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'allow_comments': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
 
+    def clean_new_tags(self):
+        return parse_tag_names(self.cleaned_data.get('new_tags'))
+
+    def save(self, commit=True):
+        """Save the post once, with its new category and all tags attached in bulk."""
+        post = super().save(commit=False)
+
+        new_category = self.cleaned_data.get('new_category')
+        if new_category:
+            post.category, _ = Category.objects.get_or_create(name=new_category)
+
+        if commit:
+            with transaction.atomic():
+                post.save()
+                self._save_m2m()
+        return post
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        new_tags = resolve_tags(self.cleaned_data.get('new_tags'))
+        if new_tags:
+            self.instance.tags.add(*new_tags)
+
 
 class RegisterForm(forms.ModelForm):
     password = forms.CharField(
@@ -111,4 +139,13 @@ class CommentForm(forms.ModelForm):
 
     class Meta:
         model = Comment
-        fields = ['content']
+        fields = ['content', 'parent']
+        widgets = {'parent': forms.HiddenInput}
+
+    def __init__(self, *args, post=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Replies must stay within the post being commented on
+        parents = Comment.objects.filter(is_approved=True)
+        if post is not None:
+            parents = parents.filter(post=post)
+        self.fields['parent'].queryset = parents
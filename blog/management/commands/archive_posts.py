@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.archive import DEFAULT_BATCH_SIZE, archivable_posts, archive_batch, restore_batch
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Move the content of archived posts (and, with --older-than, of posts '
+        'published long ago) out of the hot post table into PostArchive, or '
+        'bring it back with --restore. Works in batches of short transactions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, metavar='DAYS',
+                            help='Also archive posts published more than DAYS days ago')
+        parser.add_argument('--restore', action='store_true', help='Restore archived content instead')
+        parser.add_argument('--slug', action='append', dest='slugs', default=[],
+                            help='Only these posts (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            if options['older_than'] is not None:
+                raise CommandError('--older-than only applies when archiving.')
+            queryset, process, verb = Post.objects.all(), restore_batch, 'restored'
+        else:
+            queryset, process, verb = archivable_posts(options['older_than']), archive_batch, 'archived'
+        if options['slugs']:
+            queryset = queryset.filter(slug__in=options['slugs'])
+
+        total = 0
+        last_pk = 0
+        while pks := process(queryset, last_pk, options['batch_size']):
+            total += len(pks)
+            last_pk = pks[-1]
+            self.stdout.write(f'{total} posts {verb}')
+
+        self.stdout.write(self.style.SUCCESS(f'Done: {total} posts {verb}'))
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+HOST = '127.0.0.1'
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the ASGI and WSGI handlers in-process with the same concurrent '
+        'GET requests and compare requests/sec, p50 and p99 per path. The page '
+        'cache is off unless --page-cache is given, so the views themselves '
+        'are measured.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', nargs='+', default=['/', '/posts/', '/search/?search=django'])
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--page-cache', action='store_true')
+
+    def handle(self, *args, **options):
+        # One JSON line per request would drown the results
+        logging.getLogger('blog.profiling').setLevel(logging.WARNING)
+        overrides = {} if options['page_cache'] else {'BLOG_PAGE_CACHE_TIMEOUT': 0}
+
+        with override_settings(**overrides):
+            wsgi, asgi = WSGIHandler(), ASGIHandler()
+            for path in options['paths']:
+                for name, run in (('WSGI', self.run_wsgi), ('ASGI', self.run_asgi)):
+                    handler = wsgi if name == 'WSGI' else asgi
+                    elapsed, results = run(handler, path, options['requests'], options['concurrency'])
+                    self.report(name, path, elapsed, results)
+
+    def report(self, name, path, elapsed, results):
+        timings = sorted(duration for status, duration in results if status == 200)
+        errors = len(results) - len(timings)
+        if not timings:
+            self.stdout.write(f'{name} {path:<28} | all {errors} requests failed')
+            return
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f'{name} {path:<28} | {len(results) / elapsed:8.1f} req/s | '
+            f'p50 {statistics.median(timings):7.2f} ms | p99 {p99:7.2f} ms | {errors} errors'
+        )
+
+    @staticmethod
+    def run_wsgi(handler, path, requests, concurrency):
+        url = urlsplit(path)
+
+        def fetch(_):
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': url.path,
+                'QUERY_STRING': url.query,
+                'SERVER_NAME': HOST,
+                'SERVER_PORT': '80',
+                'HTTP_HOST': HOST,
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': BytesIO(),
+                'wsgi.errors': BytesIO(),
+            }
+            status = []
+            start = time.perf_counter()
+            response = handler(environ, lambda code, headers: status.append(int(code.split()[0])))
+            b''.join(response)
+            response.close()
+            return status[0], (time.perf_counter() - start) * 1000
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            start = time.perf_counter()
+            results = list(pool.map(fetch, range(requests)))
+        return time.perf_counter() - start, results
+
+    @staticmethod
+    def run_asgi(handler, path, requests, concurrency):
+        url = urlsplit(path)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': url.path,
+            'raw_path': url.path.encode(),
+            'query_string': url.query.encode(),
+            'root_path': '',
+            'headers': [(b'host', HOST.encode())],
+            'client': (HOST, 50000),
+            'server': (HOST, 80),
+        }
+
+        async def fetch(limit):
+            async with limit:
+                request_sent = False
+                status = []
+
+                async def receive():
+                    nonlocal request_sent
+                    if not request_sent:
+                        request_sent = True
+                        return {'type': 'http.request', 'body': b'', 'more_body': False}
+                    # The client never disconnects; Django cancels this when done
+                    await asyncio.Future()
+
+                async def send(message):
+                    if message['type'] == 'http.response.start':
+                        status.append(message['status'])
+
+                start = time.perf_counter()
+                await handler(dict(scope), receive, send)
+                return status[0], (time.perf_counter() - start) * 1000
+
+        async def main():
+            limit = asyncio.Semaphore(concurrency)
+            start = time.perf_counter()
+            results = await asyncio.gather(*(fetch(limit) for _ in range(requests)))
+            return time.perf_counter() - start, results
+
+        return asyncio.run(main())
@@ -0,0 +1,68 @@
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, F
+from django.db.models.functions import Length
+
+from blog.management.fixtures import ROLLED_BACK_NOTE, rolled_back_posts
+from blog.models import Post
+
+# Average length of a fixture word, with its separator
+BYTES_PER_WORD = 7
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the latency and peak Python memory of loading a listing page '
+        'as whole Post rows and as Post.objects.for_listing() rows, with '
+        'posts of --content-kb KB. '
+    ) + ROLLED_BACK_NOTE
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--content-kb', type=int, default=50)
+        parser.add_argument('--page-sizes', nargs='+', type=int, default=[9, 100])
+        parser.add_argument('--runs', type=int, default=10)
+
+    def handle(self, *args, **options):
+        with rolled_back_posts(
+            options['posts'], batch_size=200,
+            content_words=options['content_kb'] * 1024 // BYTES_PER_WORD,
+        ):
+            # Same size as the rendered HTML of plain text
+            Post.objects.update(content_html=F('content'))
+            size = Post.objects.aggregate(size=Avg(Length('content')))['size']
+            self.stdout.write(f'{options["posts"]} posts, {size / 1024:.1f} KB of content each')
+
+            published = Post.objects.filter(status=Post.Status.PUBLISHED).order_by('-created_at', '-id')
+            variants = {
+                'whole rows': published.select_related('author', 'category'),
+                'for_listing': published.for_listing(),
+            }
+            for page_size in options['page_sizes']:
+                for name, queryset in variants.items():
+                    latency, memory = self.measure(options['runs'], lambda: list(queryset[:page_size]))
+                    self.stdout.write(
+                        f'{page_size:>5} posts | {name:<12} | {latency:8.2f} ms | peak {memory / 1024:10.1f} KB'
+                    )
+
+    @staticmethod
+    def measure(runs, fetch):
+        """Median latency in ms, and the peak of traced allocations in bytes while fetching."""
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fetch()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        # Traced separately: tracing slows allocations down
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            fetch()
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+        return statistics.median(timings), peak
@@ -0,0 +1,56 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+
+from blog.management.fixtures import ROLLED_BACK_NOTE, rolled_back_posts
+from blog.models import Post
+from blog.pagination import CursorPaginator
+
+PER_PAGE = 9
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare OFFSET pagination with keyset (cursor) pagination of /posts/ '
+        'at increasing page depths. '
+    ) + ROLLED_BACK_NOTE
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--pages', nargs='+', type=int, default=[1, 10, 100, 1000, 5000])
+        parser.add_argument('--runs', type=int, default=10)
+
+    def handle(self, *args, **options):
+        with rolled_back_posts(options['posts']):
+            queryset = Post.objects.filter(
+                status=Post.Status.PUBLISHED
+            ).select_related('author', 'category')
+            cursor_paginator = CursorPaginator(queryset, PER_PAGE, ordering=('-created_at', '-id'))
+
+            for page in options['pages']:
+                offset = self.time(options['runs'], lambda: list(
+                    Paginator(queryset.order_by('-created_at', '-id'), PER_PAGE).get_page(page)
+                ))
+                cursor = self.cursor_before_page(queryset, cursor_paginator, page)
+                keyset = self.time(options['runs'], lambda: list(cursor_paginator.get_page(cursor)))
+                self.stdout.write(
+                    f'page {page:>6} | OFFSET {offset:8.2f} ms | cursor {keyset:8.2f} ms'
+                )
+
+    @staticmethod
+    def cursor_before_page(queryset, paginator, page):
+        if page <= 1:
+            return None
+        last = queryset.order_by('-created_at', '-id')[(page - 1) * PER_PAGE - 1]
+        return paginator.cursor_for(last, 'next')
+
+    @staticmethod
+    def time(runs, fetch):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fetch()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,60 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from blog.management.fixtures import benchmark_author, create_posts
+from blog.models import Post
+from blog.scheduling import DEFAULT_BATCH_SIZE, promote_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure scheduled publishing throughput: schedule --posts posts that '
+        'are all due, publish them with --workers concurrent workers and check '
+        'each was published exactly once. The posts are kept: run it against '
+        'a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        author = benchmark_author()
+        if Post.objects.filter(author=author).exists() or Post.objects.filter(status=Post.Status.SCHEDULED).exists():
+            raise CommandError('Benchmark or scheduled posts exist already; use a fresh scratch database.')
+
+        # Workers run in their own connections, so the posts are committed
+        create_posts(author, options['posts'], status=Post.Status.SCHEDULED,
+                     published_at=timezone.now() - timedelta(minutes=1))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(
+                lambda _: self.work(options['batch_size']), range(options['workers'])
+            ))
+        elapsed = time.perf_counter() - start
+
+        promoted = [pk for worker in results for pk in worker]
+        published = Post.objects.filter(author=author, status=Post.Status.PUBLISHED).count()
+        for number, worker in enumerate(results, 1):
+            self.stdout.write(f'worker {number}: {len(worker)} posts')
+        self.stdout.write(
+            f'{len(promoted)} posts in {elapsed:.2f} s ({len(promoted) / elapsed:,.0f} posts/s), '
+            f'{len(promoted) - len(set(promoted))} published twice, '
+            f'{options["posts"] - published} left unpublished'
+        )
+
+    @staticmethod
+    def work(batch_size):
+        promoted = []
+        try:
+            while batch := promote_due_posts(batch_size):
+                promoted += batch
+        finally:
+            connections.close_all()
+        return promoted
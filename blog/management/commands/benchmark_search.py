@@ -0,0 +1,65 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from blog.management.fixtures import ROLLED_BACK_NOTE, WORDS, create_posts, rolled_back_posts
+from blog.models import Post
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare search latency of the full-text backend against the old LIKE '
+        'filters. '
+    ) + ROLLED_BACK_NOTE
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        backend = get_search_backend()
+        self.stdout.write(f'Backend: {type(backend).__name__}')
+
+        with rolled_back_posts() as author:
+            created = 0
+            for size in sorted(options['sizes']):
+                create_posts(author, size - created, created, rng, options['batch_size'])
+                created = size
+                backend.rebuild()
+
+                like = self.time_queries(options['runs'], rng, self.like_search)
+                full_text = self.time_queries(
+                    options['runs'], rng, lambda qs, q: backend.search(qs, q)
+                )
+                self.stdout.write(
+                    f'{size:>9} posts | LIKE median {like[0]:8.2f} ms p95 {like[1]:8.2f} ms'
+                    f' | full-text median {full_text[0]:8.2f} ms p95 {full_text[1]:8.2f} ms'
+                )
+        backend.rebuild()
+
+    @staticmethod
+    def like_search(queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(excerpt__icontains=query) |
+            Q(category__name__icontains=query) |
+            Q(author__username__icontains=query)
+        )
+
+    @staticmethod
+    def time_queries(runs, rng, search):
+        timings = []
+        published = Post.objects.filter(status=Post.Status.PUBLISHED)
+        for _ in range(runs):
+            query = rng.choice(WORDS)
+            start = time.perf_counter()
+            list(search(published, query)[:9])
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
@@ -0,0 +1,42 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.transfer import FORMATS, post_to_record, write_records
+
+
+class Command(BaseCommand):
+    help = 'Stream every post to a JSON Lines or CSV file (or stdout).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help='Output file, or - for stdout')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Defaults to the file extension, else jsonl')
+        parser.add_argument('--status', choices=Post.Status.values)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+
+        posts = Post.objects.select_related('author', 'category', 'archive').prefetch_related('tags').order_by('pk')
+        if options['status']:
+            posts = posts.filter(status=options['status'])
+        records = map(post_to_record, posts.iterator(chunk_size=options['chunk_size']))
+
+        stream = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        # Progress goes to stderr so it never mixes with records on stdout
+        start = time.perf_counter()
+        written = 0
+        try:
+            for written, _ in enumerate(write_records(records, stream, fmt), 1):
+                if written % options['chunk_size'] == 0:
+                    self.stderr.write(f'{written} posts exported')
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        elapsed = time.perf_counter() - start
+        self.stderr.write(f'Done: {written} posts exported in {elapsed:.1f}s')
@@ -0,0 +1,59 @@
+import random
+import sys
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.management.fixtures import WORDS
+from blog.models import Post
+from blog.transfer import FORMATS, write_records
+
+
+class Command(BaseCommand):
+    help = 'Write a synthetic import_posts fixture, e.g. for import throughput benchmarks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help='Output file, or - for stdout')
+        parser.add_argument('--count', type=int, default=100_000)
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Defaults to the file extension, else jsonl')
+        parser.add_argument('--authors', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--content-words', type=int, default=300)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        stream = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        try:
+            for _ in write_records(self.records(options), stream, fmt):
+                pass
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+    @staticmethod
+    def records(options):
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        for i in range(options['count']):
+            created_at = now - timedelta(minutes=options['count'] - i)
+            yield {
+                'title': ' '.join(rng.choices(WORDS, k=6)).capitalize(),
+                'slug': f'fixture-post-{i}',
+                'excerpt': ' '.join(rng.choices(WORDS, k=20)),
+                'content': ' '.join(rng.choices(WORDS, k=options['content_words'])),
+                'status': Post.Status.PUBLISHED if rng.random() < 0.9 else Post.Status.DRAFT,
+                'is_featured': rng.random() < 0.05,
+                'allow_comments': True,
+                'read_time': rng.randint(1, 15),
+                'views_count': rng.randint(0, 5000),
+                'author': f'author{rng.randrange(options["authors"])}',
+                'category': f'Category {rng.randrange(options["categories"])}',
+                'tags': sorted({f'tag{rng.randrange(options["tags"])}' for _ in range(3)}),
+                'created_at': created_at.isoformat(),
+                'published_at': '',
+            }
@@ -0,0 +1,50 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.cache import invalidate_tags
+from blog.stats import invalidate_homepage_stats
+from blog.transfer import FORMATS, PostImporter, RecordError, read_records
+
+
+class Command(BaseCommand):
+    help = 'Stream posts from a JSON Lines or CSV file (or stdin) into the database in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Input file, or - for stdin')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Defaults to the file extension, else jsonl')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--on-conflict', choices=PostImporter.CONFLICT_POLICIES, default='skip',
+                            help='What to do with records whose slug already exists')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        importer = PostImporter(on_conflict=options['on_conflict'])
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        start = time.perf_counter()
+        try:
+            for stats in importer.import_records(read_records(stream, fmt), options['batch_size']):
+                self.stdout.write(self.summary(stats, start))
+        except RecordError as exc:
+            raise CommandError(f'Import stopped: {exc}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            invalidate_homepage_stats()
+            invalidate_tags('posts')
+
+        self.stdout.write(self.style.SUCCESS('Done: ' + self.summary(importer.stats, start)))
+
+    @staticmethod
+    def summary(stats, start):
+        elapsed = time.perf_counter() - start
+        processed = stats['created'] + stats['updated'] + stats['skipped']
+        rate = processed / elapsed * 60 if elapsed else 0
+        return (
+            f"{stats['created']} created ({stats['renamed']} renamed), {stats['updated']} updated, "
+            f"{stats['skipped']} skipped in {elapsed:.1f}s ({rate:,.0f} posts/min)"
+        )
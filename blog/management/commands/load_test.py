@@ -0,0 +1,55 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire concurrent GET requests at a running server and report '
+        'requests/sec and latency per path. Run it once against a server '
+        'started with DB_CONN_MAX_AGE=0 and again with persistent '
+        '(DB_CONN_MAX_AGE=60) or pooled (DB_POOL=True) connections to '
+        'compare connection handling.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--paths', nargs='+', default=['/about/', '/contact/', '/posts/'])
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=10)
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        for path in options['paths']:
+            url = base_url + path
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                start = time.perf_counter()
+                results = list(pool.map(self.fetch, [url] * options['requests']))
+                elapsed = time.perf_counter() - start
+
+            timings = sorted(duration for ok, duration in results if ok)
+            errors = len(results) - len(timings)
+            if not timings:
+                self.stdout.write(f'{path:<20} | all {errors} requests failed')
+                continue
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f'{path:<20} | {len(results) / elapsed:8.1f} req/s | '
+                f'p50 {statistics.median(timings):7.2f} ms | p95 {p95:7.2f} ms | '
+                f'{errors} errors'
+            )
+
+    @staticmethod
+    def fetch(url):
+        start = time.perf_counter()
+        try:
+            with urlopen(url, timeout=30) as response:
+                response.read()
+                ok = response.status == 200
+        except (URLError, OSError):
+            ok = False
+        return ok, (time.perf_counter() - start) * 1000
@@ -0,0 +1,47 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.scheduling import DEFAULT_BATCH_SIZE, promote_due_posts
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Publish scheduled posts once their publish date is due. Runs until '
+        'interrupted, polling every --interval seconds; any number of workers '
+        'can run side by side.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=30, help='Seconds between polls when nothing is due')
+        parser.add_argument('--once', action='store_true', help='Publish everything due now, then exit')
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    promoted = promote_due_posts(options['batch_size'])
+                except Exception:
+                    if options['once']:
+                        raise
+                    logger.exception('Failed to publish scheduled posts')
+                    promoted = []
+                total += len(promoted)
+                if promoted:
+                    self.stdout.write(f'Published {len(promoted)} scheduled posts')
+                if len(promoted) == options['batch_size']:
+                    # More may be due: no pause
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Done: {total} posts published'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.related import RELATED_POSTS_LIMIT, rebuild_related_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute precomputed related posts. By default only posts whose tags, '
+        'category or status changed since the last run are rebuilt.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild every post')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--limit', type=int, default=RELATED_POSTS_LIMIT,
+                            help='Number of related posts to keep per post')
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.only(
+            'pk', 'slug', 'category_id', 'status', 'published_at', 'created_at'
+        ).order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(related_stale=True)
+
+        total = 0
+        last_pk = 0
+        while True:
+            # Walk by primary key: rebuilt posts drop out of the stale filter
+            batch = list(queryset.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            total += rebuild_related_posts(batch, options['limit'])
+            last_pk = batch[-1].pk
+            self.stdout.write(f'Rebuilt {total} posts')
+
+        self.stdout.write(self.style.SUCCESS(f'Done: {total} posts rebuilt'))
@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.authors import ensure_profiles, recount_authors
+from blog.counters import recount_categories, recount_comments, recount_tags
+
+
+class Command(BaseCommand):
+    help = 'Repair drift in the denormalized comment, tag, category and author counters.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            posts = recount_comments()
+            tags = recount_tags()
+            categories = recount_categories()
+            ensure_profiles(User.objects.values_list('pk', flat=True))
+            authors = recount_authors()
+        self.stdout.write(self.style.SUCCESS(
+            f'Recounted {posts} posts, {tags} tags, {categories} categories and {authors} authors'
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_post_cards, invalidate_tags, post_tag
+from blog.models import Post
+from blog.rendering import RENDERED_FIELDS, RENDERER_VERSION, render_post
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-render post content (HTML, summary and read time). By default only '
+        'posts rendered by an older renderer version are processed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render every post')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        # Archived posts are re-rendered once restored
+        queryset = Post.objects.filter(content_archived=False).only(
+            'pk', 'slug', 'content', 'excerpt', 'content_format'
+        ).order_by('pk')
+        if not options['all']:
+            queryset = queryset.exclude(renderer_version=RENDERER_VERSION)
+
+        total = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            # bulk_update skips Post.save() and its signals: only derived columns change
+            total += Post.objects.bulk_update([render_post(post) for post in batch], RENDERED_FIELDS)
+            invalidate_tags('posts', *(post_tag(post.slug) for post in batch))
+            invalidate_post_cards([post.pk for post in batch])
+            last_pk = batch[-1].pk
+            self.stdout.write(f'Rendered {total} posts')
+
+        self.stdout.write(self.style.SUCCESS(f'Done: {total} posts rendered with version {RENDERER_VERSION}'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.bulk import claimable_jobs, run_job
+from blog.models import BulkJob
+
+
+class Command(BaseCommand):
+    help = (
+        'Run pending bulk admin jobs and resume those whose worker stopped '
+        '(e.g. after a restart), from the last chunk they finished.'
+    )
+
+    def handle(self, *args, **options):
+        ran = 0
+        for job in BulkJob.objects.filter(claimable_jobs()).order_by('created_at'):
+            if not run_job(job):
+                # Claimed by another worker in the meantime
+                continue
+            job.refresh_from_db()
+            ran += 1
+            self.stdout.write(f'Job {job.pk}: {job} {job.get_status_display().lower()}')
+        self.stdout.write(self.style.SUCCESS(f'Done: {ran} job(s) run'))
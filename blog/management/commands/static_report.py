@@ -0,0 +1,86 @@
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import get_template
+
+from blog.staticfiles import ENCODINGS
+
+EXTENDS_RE = re.compile(r'''\{%\s*extends\s+['"]([^'"]+)['"]\s*%\}''')
+STATIC_RE = re.compile(r'''\{%\s*static\s+['"]([^'"]+)['"]\s*%\}''')
+PAGES_DIR = Path('blog', 'templates', 'blog')
+
+
+class Command(BaseCommand):
+    help = (
+        'Report, per page template, the bytes of static assets a first visit '
+        'downloads before and after the production pipeline (CSS pruning, '
+        'gzip and brotli). Run collectstatic first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('templates', nargs='*', help='Page templates (default: every page in blog/)')
+
+    def handle(self, *args, **options):
+        manifest = getattr(staticfiles_storage, 'hashed_files', None)
+        if not manifest:
+            raise CommandError('No staticfiles manifest found; run collectstatic first.')
+
+        templates = options['templates'] or self.page_templates()
+        assets = {name: self.measure(name, manifest) for name in self.all_assets(templates)}
+        for name, (source, pruned, encoded) in assets.items():
+            self.stdout.write(
+                f'{name:<32} source {source:>8} | collected {pruned:>8} | '
+                + ' | '.join(f'{token} {size:>7}' for token, size in encoded.items())
+            )
+        self.stdout.write('')
+
+        for template in templates:
+            names = self.static_names(template)
+            if not names:
+                continue
+            before = sum(assets[name][0] for name in names)
+            after = sum(min([assets[name][1], *assets[name][2].values()]) for name in names)
+            saved = before - after
+            self.stdout.write(
+                f'{template:<32} {before:>8} -> {after:>8} bytes | '
+                f'saved {saved:>8} ({saved / before:.0%})'
+            )
+
+    @staticmethod
+    def page_templates():
+        return sorted(
+            f'blog/{path.name}' for path in Path(settings.BASE_DIR, PAGES_DIR).glob('*.html')
+            if EXTENDS_RE.search(path.read_text(encoding='utf-8'))
+        )
+
+    def all_assets(self, templates):
+        return sorted({name for template in templates for name in self.static_names(template)})
+
+    def static_names(self, template):
+        """Static files referenced by ``template`` and the templates it extends."""
+        names = []
+        while template:
+            source = get_template(template).template.source
+            names += STATIC_RE.findall(source)
+            parent = EXTENDS_RE.search(source)
+            template = parent.group(1) if parent else None
+        return list(dict.fromkeys(names))
+
+    @staticmethod
+    def measure(name, manifest):
+        """``(source bytes, collected bytes, {encoding: bytes})`` for one asset."""
+        source = finders.find(name)
+        if source is None or name not in manifest:
+            raise CommandError(f'{name} is not a collected static file.')
+        collected = staticfiles_storage.path(manifest[name])
+        encoded = {
+            token: os.path.getsize(collected + suffix)
+            for token, suffix in ENCODINGS
+            if os.path.exists(collected + suffix)
+        }
+        return os.path.getsize(source), os.path.getsize(collected), encoded
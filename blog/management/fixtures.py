@@ -0,0 +1,60 @@
+"""Synthetic posts for the benchmark commands."""
+import random
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from blog.models import Post
+
+WORDS = (
+    'django python search index query database postgres cache template view '
+    'model migration signal form admin static server request response user '
+    'design business health career lifestyle technology travel music science'
+).split()
+
+# Appended to the help of the commands that seed through rolled_back_posts()
+ROLLED_BACK_NOTE = (
+    'Posts are generated inside a transaction that is rolled back, but run it '
+    'against a scratch database.'
+)
+
+
+def benchmark_author(username='benchmark'):
+    author, _ = User.objects.get_or_create(username=username)
+    return author
+
+
+def create_posts(author, count, offset=0, rng=None, batch_size=5000, content_words=300,
+                 status=Post.Status.PUBLISHED, published_at=None):
+    """Bulk insert ``count`` posts (published by default) with slugs ``benchmark-<offset + i>``."""
+    rng = rng or random.Random(42)
+    batch = []
+    for i in range(offset, offset + count):
+        batch.append(Post(
+            title=' '.join(rng.choices(WORDS, k=6)),
+            slug=f'benchmark-{i}',
+            excerpt=' '.join(rng.choices(WORDS, k=20)),
+            content=' '.join(rng.choices(WORDS, k=content_words)),
+            author=author,
+            status=status,
+            published_at=published_at,
+        ))
+        if len(batch) >= batch_size:
+            Post.objects.bulk_create(batch)
+            batch = []
+    Post.objects.bulk_create(batch)
+
+
+@contextmanager
+def rolled_back_posts(count=0, **kwargs):
+    """
+    Yield the benchmark author after creating ``count`` posts with it, then roll
+    back those posts and everything else written inside the block.
+    """
+    with transaction.atomic():
+        author = benchmark_author()
+        if count:
+            create_posts(author, count, **kwargs)
+        yield author
+        transaction.set_rollback(True)
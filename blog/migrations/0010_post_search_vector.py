@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:06
+
+import blog.models
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def fill_search_vectors(apps, schema_editor):
+    # to_tsvector only exists on PostgreSQL; other databases leave the column
+    # empty and fall back to the in-process inverted index in blog.search.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "UPDATE blog_post SET search_vector = "
+        "setweight(to_tsvector(coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector(coalesce(excerpt, '')), 'B') || "
+        "setweight(to_tsvector(coalesce(content, '')), 'C')"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0009_alter_post_content"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="post",
+            index=blog.models.SearchVectorIndex(
+                fields=["search_vector"], name="blog_post_search_vector_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:15
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_of(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("*"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    Category = apps.get_model("blog", "Category")
+    Comment = apps.get_model("blog", "Comment")
+    Post = apps.get_model("blog", "Post")
+    Tag = apps.get_model("blog", "Tag")
+
+    Post.objects.update(
+        comment_count=count_of(Comment.objects.filter(is_approved=True), "post_id")
+    )
+    Tag.objects.update(post_count=count_of(Post.tags.through.objects.all(), "tag_id"))
+    Category.objects.update(
+        published_post_count=count_of(
+            Post.objects.filter(status="published"), "category_id"
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0011_related_posts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="published_post_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="post_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
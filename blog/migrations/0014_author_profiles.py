@@ -0,0 +1,147 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:53
+
+import blog.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils.text import slugify
+
+# Room kept at the end of the slug for "-<n>"
+SUFFIX_ROOM = 8
+
+
+def profile_slugs(AuthorProfile, usernames):
+    """
+    Slugs for the new profiles, as blog.slugs allocated them when this
+    migration was written. The table is empty, so they only need to be
+    unique among themselves.
+    """
+    max_length = AuthorProfile._meta.get_field("slug").max_length
+    taken = set()
+    slugs = []
+    for username in usernames:
+        base = slugify(username, allow_unicode=True)[: max_length - SUFFIX_ROOM]
+        base = base.strip("-") or "authorprofile"
+        slug, suffix = base, 1
+        while slug in taken:
+            suffix += 1
+            slug = f"{base}-{suffix}"
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def backfill_profiles(apps, schema_editor):
+    AuthorProfile = apps.get_model("blog", "AuthorProfile")
+    Post = apps.get_model("blog", "Post")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+
+    users = list(User.objects.order_by("pk").values_list("pk", "username"))
+    slugs = profile_slugs(AuthorProfile, [username for _, username in users])
+    AuthorProfile.objects.bulk_create(
+        [AuthorProfile(user_id=pk, slug=slug) for (pk, _), slug in zip(users, slugs)],
+        batch_size=1000,
+    )
+
+    published = (
+        Post.objects.filter(status="published", author_id=OuterRef("user_id"))
+        .order_by()
+        .values("author_id")
+    )
+    AuthorProfile.objects.update(
+        published_post_count=Coalesce(
+            Subquery(
+                published.annotate(total=Count("*")).values("total"),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        ),
+        total_views=Coalesce(
+            Subquery(
+                Post.objects.filter(author_id=OuterRef("user_id"))
+                .order_by()
+                .values("author_id")
+                .annotate(total=Sum("views_count"))
+                .values("total")
+            ),
+            Value(0),
+        ),
+        latest_published_at=Subquery(
+            published.annotate(latest=Max("published_at")).values("latest")
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0013_threaded_comments"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthorProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "slug",
+                    models.SlugField(
+                        allow_unicode=True,
+                        help_text="URL-friendly version of the username",
+                        max_length=150,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "published_post_count",
+                    models.PositiveIntegerField(default=0, editable=False),
+                ),
+                (
+                    "total_views",
+                    models.PositiveBigIntegerField(default=0, editable=False),
+                ),
+                (
+                    "latest_published_at",
+                    models.DateTimeField(blank=True, editable=False, null=True),
+                ),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="author_profile",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-published_post_count", "-total_views"],
+                "indexes": [
+                    models.Index(
+                        fields=["-published_post_count", "-total_views"],
+                        name="blog_author_posts_idx",
+                    ),
+                    models.Index(fields=["-total_views"], name="blog_author_views_idx"),
+                ],
+            },
+            bases=(blog.models.UniqueSlugMixin, models.Model),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "status", "-created_at"],
+                name="blog_post_author_listing_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_profiles, migrations.RunPython.noop),
+    ]
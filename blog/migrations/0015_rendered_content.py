@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:04
+
+import html
+import math
+import re
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+# Version 1 of blog.rendering, frozen: existing posts are all plain text
+RENDERER_VERSION = 1
+WORDS_PER_MINUTE = 200
+SUMMARY_WORDS = 30
+RENDERED_FIELDS = ("content_html", "summary", "read_time", "renderer_version")
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def render_plain_post(post):
+    post.content_html = linebreaksbr(post.content, autoescape=True)
+    text = " ".join(html.unescape(_TAG_RE.sub(" ", post.content_html)).split())
+    post.summary = Truncator(post.excerpt.strip() or text).words(SUMMARY_WORDS)
+    post.read_time = max(1, math.ceil(len(text.split()) / WORDS_PER_MINUTE))
+    post.renderer_version = RENDERER_VERSION
+    return post
+
+
+def render_existing_posts(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    posts = Post.objects.only("pk", "content", "excerpt").order_by("pk")
+    last_pk = 0
+    while batch := list(posts.filter(pk__gt=last_pk)[:1000]):
+        Post.objects.bulk_update(
+            [render_plain_post(post) for post in batch], RENDERED_FIELDS
+        )
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0014_author_profiles"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="content_format",
+            field=models.CharField(
+                choices=[("plain", "Plain text"), ("markdown", "Markdown")],
+                default="plain",
+                help_text="How the content is written",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="content_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="renderer_version",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="summary",
+            field=models.TextField(
+                blank=True,
+                editable=False,
+                help_text="The excerpt, or the start of the content when there is none",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="read_time",
+            field=models.IntegerField(
+                default=1,
+                editable=False,
+                help_text="Estimated time to read the post (in minutes)",
+            ),
+        ),
+        # Existing posts were written as plain text; new ones default to Markdown
+        migrations.AlterField(
+            model_name="post",
+            name="content_format",
+            field=models.CharField(
+                choices=[("plain", "Plain text"), ("markdown", "Markdown")],
+                default="markdown",
+                help_text="How the content is written",
+                max_length=10,
+            ),
+        ),
+        migrations.RunPython(render_existing_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0018_scheduled_publishing"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostArchive",
+            fields=[
+                (
+                    "post",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="archive",
+                        serialize=False,
+                        to="blog.post",
+                    ),
+                ),
+                ("content", models.TextField()),
+                ("content_html", models.TextField(blank=True)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Archived post content",
+                "verbose_name_plural": "Archived post content",
+            },
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="content_archived",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0019_post_archive"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="comment",
+            name="is_approved",
+            field=models.BooleanField(
+                default=True, help_text="Approve comment for display"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:17
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fail_unfinished_jobs(apps, schema_editor):
+    # Their pickled selections are not read back; the action has to be rerun
+    BulkJob = apps.get_model("blog", "BulkJob")
+    BulkJob.objects.filter(status__in=["pending", "running"]).update(
+        status="failed",
+        error="Stopped by an upgrade: run the action again.",
+        updated_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0020_comment_is_approved_default"),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_unfinished_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="bulkjob",
+            name="selection",
+        ),
+        migrations.AddField(
+            model_name="bulkjob",
+            name="post_ids",
+            field=models.JSONField(default=list, editable=False),
+        ),
+    ]
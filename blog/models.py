@@ -1,10 +1,79 @@
-from django.db import models
+import random
+import time
+
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import User
-from django.utils.text import slugify
+from django.core.exceptions import ValidationError
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 
+from .rendering import RENDER_INPUTS, RENDERED_FIELDS, RENDERER_VERSION, render_post
+from .slugs import allocate_slug
+
+
+class SearchVectorIndex(GinIndex):
+    """GIN index on PostgreSQL; a plain index elsewhere, where ``search_vector`` stays empty."""
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+        return models.Index.create_sql(self, model, schema_editor, using=using, **kwargs)
+
+
+class LoadedValuesMixin:
+    """Remember field values as loaded from the database, for change detection."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
-class Category(models.Model):
+    def loaded_value(self, field_name):
+        """The value ``field_name`` had in the database, or ``None`` for new rows."""
+        value = getattr(self, '_loaded_values', {}).get(field_name)
+        return None if value is models.DEFERRED else value
+
+    def reset_loaded_values(self, *field_names):
+        loaded = self.__dict__.setdefault('_loaded_values', {})
+        deferred = self.get_deferred_fields()
+        for field_name in field_names:
+            # Reading a deferred field would load it
+            loaded[field_name] = models.DEFERRED if field_name in deferred else getattr(self, field_name)
+
+
+class UniqueSlugMixin:
+    """Fill an empty ``slug`` from ``slug_source`` with a collision-free value."""
+    slug_source = 'name'
+    # Longest pause in seconds between retries, so writers that lost the same
+    # slug do not all pick the next one at once
+    slug_retry_backoff = 0.05
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        attempt = 0
+        while True:
+            self.slug = allocate_slug(type(self), getattr(self, self.slug_source), exclude_pk=self.pk)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # Another writer took the same slug between allocation and
+                # insert. Every loss is a row that writer committed, so
+                # retrying always makes progress, however many writers
+                # compete; any other integrity error is raised.
+                taken = type(self)._default_manager.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                if not taken:
+                    self.slug = ''
+                    raise
+            attempt += 1
+            time.sleep(random.uniform(0, min(self.slug_retry_backoff, 0.005 * attempt)))
+
+
+class Category(UniqueSlugMixin, models.Model):
     """Blog post categories for organization."""
     name = models.CharField(
         max_length=100,
@@ -25,6 +94,9 @@ class Category(models.Model):
 
     icon = models.CharField(max_length=50, default='default-icon')
 
+    # Denormalized, maintained by blog.counters
+    published_post_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name = 'Category'
         verbose_name_plural = 'Categories'
@@ -33,13 +105,9 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name, allow_unicode=True)
-        super().save(*args, **kwargs)
 
 
-class Tag(models.Model):
+class Tag(UniqueSlugMixin, models.Model):
     """Flexible tags for posts."""
     name = models.CharField(
         max_length=50,
@@ -55,26 +123,52 @@ class Tag(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Denormalized, maintained by blog.counters
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ['name']
 
     def __str__(self):
         return self.name
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name, allow_unicode=True)
-        super().save(*args, **kwargs)
 
 
-class Post(models.Model):
+class PostQuerySet(models.QuerySet):
+    # What post cards, listing tables and related posts show; never the
+    # content, its rendered HTML or the search vector
+    LISTING_FIELDS = (
+        'title', 'slug', 'summary', 'read_time', 'status', 'is_featured', 'views_count', 'comment_count',
+        'created_at', 'published_at', 'author', 'author__username', 'category', 'category__name',
+        'category__slug',
+    )
+
+    def for_listing(self):
+        """Narrow rows for listings, with their author and category."""
+        return self.select_related('author', 'category').only(*self.LISTING_FIELDS)
+
+    def for_detail(self):
+        """Everything the post page shows, except the search vector."""
+        return self.select_related('author__author_profile', 'category').prefetch_related('tags').defer(
+            'search_vector'
+        )
+
+
+class Post(UniqueSlugMixin, LoadedValuesMixin, models.Model):
     """Main blog post model."""
+    slug_source = 'title'
 
     class Status(models.TextChoices):
         DRAFT = 'draft', 'Draft'
         PUBLISHED = 'published', 'Published'
+        # Published by publish_scheduled_posts once published_at is due
+        SCHEDULED = 'scheduled', 'Scheduled'
         ARCHIVED = 'archived', 'Archived'
 
+    class ContentFormat(models.TextChoices):
+        PLAIN = 'plain', 'Plain text'
+        MARKDOWN = 'markdown', 'Markdown'
+
     # Basic fields
     title = models.CharField(
         max_length=200,
@@ -93,11 +187,28 @@ class Post(models.Model):
     content = models.TextField(
         help_text='Main content of the post'
     )
+    content_format = models.CharField(
+        max_length=10,
+        choices=ContentFormat.choices,
+        default=ContentFormat.MARKDOWN,
+        help_text='How the content is written'
+    )
 
+    # Rendered from content/excerpt on save by blog.rendering
+    content_html = models.TextField(blank=True, editable=False)
+    summary = models.TextField(
+        blank=True,
+        editable=False,
+        help_text='The excerpt, or the start of the content when there is none'
+    )
     read_time = models.IntegerField(
-        default=5,
+        default=1,
+        editable=False,
         help_text='Estimated time to read the post (in minutes)'
     )
+    renderer_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    # content and content_html live in PostArchive; see blog.archive
+    content_archived = models.BooleanField(default=False, editable=False)
 
 
 
@@ -142,6 +253,8 @@ class Post(models.Model):
         default=0,
         help_text='Number of views'
     )
+    # Approved comments, maintained by blog.counters
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(
@@ -150,31 +263,133 @@ class Post(models.Model):
         help_text='Date and time when published'
     )
 
+    # Weighted title/excerpt/content vector, GIN indexed on PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Set whenever tags/category may have changed; cleared by rebuild_related_posts
+    related_stale = models.BooleanField(default=True, editable=False)
+
+    # Columns only written through queryset updates
+    DERIVED_FIELDS = ('views_count', 'comment_count', 'search_vector')
+
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status', '-created_at']),
             models.Index(fields=['-published_at']),
+            # Due scheduled posts, in publishing order
+            models.Index(fields=['status', 'published_at'], name='blog_post_schedule_idx'),
+            models.Index(fields=['author', 'status', '-created_at'], name='blog_post_author_listing_idx'),
+            # Conditional GET validators of the listings: newest updated_at, index-only
+            models.Index(fields=['status', 'updated_at'], name='blog_post_status_updated_idx'),
+            models.Index(fields=['category', 'status', 'updated_at'], name='blog_post_category_updated_idx'),
+            models.Index(fields=['author', 'status', 'updated_at'], name='blog_post_author_updated_idx'),
+            models.Index(
+                fields=['related_stale'],
+                condition=models.Q(related_stale=True),
+                name='blog_post_related_stale_idx',
+            ),
+            SearchVectorIndex(fields=['search_vector'], name='blog_post_search_vector_gin'),
         ]
 
     def __str__(self):
         return self.title
 
+    def clean(self):
+        if self.status == self.Status.SCHEDULED and not self.published_at:
+            raise ValidationError({'published_at': 'Scheduled posts need a publish date.'})
+
     def save(self, *args, **kwargs):
-        # Auto-generate slug if not provided
-        if not self.slug:
-            self.slug = slugify(self.title, allow_unicode=True)
+        # Fields left out by only()/defer() are neither loaded nor written
+        deferred = self.get_deferred_fields()
 
         # Set published_at when status changes to published
-        if self.status == self.Status.PUBLISHED and not self.published_at:
-            self.published_at = timezone.now()
+        if not deferred & {'status', 'published_at'}:
+            if self.status == self.Status.PUBLISHED and not self.published_at:
+                self.published_at = timezone.now()
+
+        # Category, status or publish date changes can reorder related posts
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.related_stale = True
+        elif {'category', 'status', 'published_at'}.intersection(update_fields):
+            self.related_stale = True
+            kwargs['update_fields'] = {*update_fields, 'related_stale'}
+
+        # Writing the content of an archived post brings it back to the hot table
+        writes_content = 'content' not in deferred if update_fields is None else 'content' in update_fields
+        unarchive = writes_content and self.content_archived and (
+            self.__dict__.get('_archived_content_loaded') or self.loaded_value('content') != self.content
+        )
+        if unarchive:
+            self.content_archived = False
+            if update_fields is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'content_archived'}
+
+        if self.needs_render(update_fields):
+            render_post(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], *RENDERED_FIELDS}
+
+        # Counters are maintained with F() updates elsewhere; never write back
+        # the possibly stale values this instance was loaded with.
+        if update_fields is None and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DERIVED_FIELDS
+                # auto_now fields are stamped, not loaded
+                and (field.attname not in deferred or getattr(field, 'auto_now', False))
+            ]
 
         super().save(*args, **kwargs)
+        self.reset_loaded_values(*RENDER_INPUTS)
+        if unarchive:
+            PostArchive.objects.filter(post=self).delete()
+
+    def needs_render(self, update_fields=None):
+        if update_fields is None and not self._state.adding and self.get_deferred_fields().intersection(
+            [*RENDER_INPUTS, 'renderer_version']
+        ):
+            # Not loaded, so not changed; rendering would have to fetch them
+            return False
+        if self.content_archived:
+            # The content to render from is in the archive
+            return False
+        if update_fields is not None:
+            return bool(set(RENDER_INPUTS).intersection(update_fields))
+        return (
+            self._state.adding
+            or self.renderer_version != RENDERER_VERSION
+            or any(self.loaded_value(field) != getattr(self, field) for field in RENDER_INPUTS)
+        )
+
+
+
+
+class PostArchive(models.Model):
+    """The heavy columns of an archived post, out of the hot ``blog_post`` table; see ``blog.archive``."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='archive'
+    )
+    content = models.TextField()
+    content_html = models.TextField(blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        verbose_name = 'Archived post content'
+        verbose_name_plural = 'Archived post content'
 
+    def __str__(self):
+        return f'Archived content of {self.post_id}'
 
 
-class Comment(models.Model):
+class Comment(LoadedValuesMixin, models.Model):
     """User comments on blog posts."""
     post = models.ForeignKey(
         Post,
@@ -186,6 +401,23 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments'
     )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='replies',
+        help_text='Comment this is a reply to'
+    )
+    # Top-level comment of the thread, so a page of threads loads in one query
+    root = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='thread_comments'
+    )
     content = models.TextField(
         help_text='Comment content'
     )
@@ -199,8 +431,122 @@ class Comment(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['post', '-created_at']),
+            models.Index(fields=['post', 'is_approved', '-created_at']),
         ]
 
     def __str__(self):
-        return f'Comment by {self.author.username} on {self.post.title}'
\ No newline at end of file
+        return f'Comment by {self.author.username} on {self.post.title}'
+
+    def save(self, *args, **kwargs):
+        if self.parent_id and not self.root_id:
+            self.root_id = self.parent.root_id or self.parent_id
+        super().save(*args, **kwargs)
+
+
+class RelatedPost(models.Model):
+    """Precomputed top-K related posts, rebuilt by ``rebuild_related_posts``."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_links'
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_backlinks'
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'rank'], name='unique_related_post_rank'),
+        ]
+
+    def __str__(self):
+        return f'{self.post} -> {self.related} ({self.score:.2f})'
+
+
+class AuthorProfile(UniqueSlugMixin, models.Model):
+    """Per-author statistics, kept up to date by signals; see ``blog.authors``."""
+    slug_source = 'username'
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='author_profile'
+    )
+    slug = models.SlugField(
+        max_length=150,
+        unique=True,
+        allow_unicode=True,
+        help_text='URL-friendly version of the username'
+    )
+    published_post_count = models.PositiveIntegerField(default=0, editable=False)
+    total_views = models.PositiveBigIntegerField(default=0, editable=False)
+    latest_published_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ['-published_post_count', '-total_views']
+        indexes = [
+            models.Index(fields=['-published_post_count', '-total_views'], name='blog_author_posts_idx'),
+            models.Index(fields=['-total_views'], name='blog_author_views_idx'),
+        ]
+
+    def __str__(self):
+        return self.username
+
+    @property
+    def username(self):
+        return self.user.username
+
+
+class BulkJob(models.Model):
+    """A bulk admin action on posts run in the background; see ``blog.bulk``."""
+
+    class Operation(models.TextChoices):
+        PUBLISH = 'publish', 'Publish'
+        DRAFT = 'draft', 'Set to draft'
+        RESET_VIEWS = 'reset_views', 'Reset view count'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    operation = models.CharField(max_length=20, choices=Operation.choices)
+    # Primary keys of the selected posts, ascending, frozen when the job starts
+    post_ids = models.JSONField(default=list, editable=False)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    # Resume point: every selected post up to this key is done
+    last_pk = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bulk_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Heartbeat of the worker, saved after every chunk
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='blog_bulkjob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_operation_display()} ({self.processed}/{self.total})'
+
+    @property
+    def progress(self):
+        """Share of the selection processed, from 0 to 100."""
+        return 100 if not self.total else min(100, round(100 * self.processed / self.total))
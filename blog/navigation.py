@@ -0,0 +1,49 @@
+"""
+The category list shown in every page's navbar.
+
+The list is small and changes rarely, so each process keeps it in memory
+and rendering the navbar costs no query. Whether the in-memory copy is
+still current is decided by a version token in the shared cache: signals
+(and ``recount_categories``) replace the token when categories or post
+counts change, and every process rebuilds its copy on its next read.
+"""
+from collections import namedtuple
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from .models import Category
+
+NAV_VERSION_KEY = 'blog:nav-categories:version'
+
+NavCategory = namedtuple('NavCategory', ['name', 'slug', 'published_post_count'])
+
+# (version token, categories) as last built by this process
+_nav_cache = (None, [])
+
+
+def _current_version():
+    version = cache.get(NAV_VERSION_KEY)
+    if version is None:
+        # Evicted or never set: start a new version nobody has built yet
+        cache.add(NAV_VERSION_KEY, uuid4().hex, None)
+        version = cache.get(NAV_VERSION_KEY)
+    return version
+
+
+def get_nav_categories():
+    global _nav_cache
+    version = _current_version()
+    cached_version, categories = _nav_cache
+    if version is None or version != cached_version:
+        categories = [
+            NavCategory(*row)
+            for row in Category.objects.order_by('name').values_list('name', 'slug', 'published_post_count')
+        ]
+        # One tuple assignment, so concurrent readers never see a half-built entry
+        _nav_cache = (version, categories)
+    return categories
+
+
+def invalidate_nav_categories():
+    cache.set(NAV_VERSION_KEY, uuid4().hex, None)
@@ -0,0 +1,214 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+COUNT_CACHE_TIMEOUT = 60 * 5
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def count_cache_key(prefix, value):
+    """Cache key for a cached total, safe for any user-supplied ``value``."""
+    digest = hashlib.md5(value.lower().encode()).hexdigest()
+    return f'blog:count:{prefix}:{digest}'
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps({
+        'd': direction,
+        'v': [value.isoformat() if isinstance(value, datetime) else value for value in values],
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction, values = payload['d'], payload['v']
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+        raise InvalidCursor(cursor)
+    if direction not in ('next', 'prev') or not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values, direction
+
+
+class CursorPage:
+    """One page of a ``CursorPaginator``; behaves like a list of objects in templates."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.has_next_page = has_next
+        self.has_previous_page = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.has_next_page
+
+    def has_previous(self):
+        return self.has_previous_page
+
+    def has_other_pages(self):
+        return self.has_next_page or self.has_previous_page
+
+    @property
+    def next_cursor(self):
+        if not self.has_next_page:
+            return None
+        return self.paginator.cursor_for(self.object_list[-1], 'next')
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous_page:
+            return None
+        return self.paginator.cursor_for(self.object_list[0], 'prev')
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: pages are selected with ``WHERE (a, b) < (x, y)``
+    instead of OFFSET, so page 5000 costs the same as page 1.
+
+    ``ordering`` must end with a unique field (usually ``-id``) and should
+    match an index. The total count is only computed when asked for and,
+    given ``count_cache_key``, cached.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id'),
+                 count_cache_key=None, count_timeout=COUNT_CACHE_TIMEOUT):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.count_cache_key = count_cache_key
+        self.count_timeout = count_timeout
+        self._count = None
+
+    @property
+    def fields(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    @property
+    def count(self):
+        if self._count is None:
+            if self.count_cache_key:
+                self._count = cache.get_or_set(
+                    self.count_cache_key, self.queryset.count, self.count_timeout
+                )
+            else:
+                self._count = self.queryset.count()
+        return self._count
+
+    def cursor_for(self, obj, direction):
+        return encode_cursor([getattr(obj, field) for field in self.fields], direction)
+
+    async def acount(self):
+        if self._count is None:
+            count = None
+            if self.count_cache_key:
+                count = await cache.aget(self.count_cache_key)
+            if count is None:
+                count = await self.queryset.acount()
+                if self.count_cache_key:
+                    await cache.aset(self.count_cache_key, count, self.count_timeout)
+            self._count = count
+        return self._count
+
+    def get_page(self, cursor=None):
+        """Return the page after/before ``cursor``; a bad cursor gives the first page."""
+        queryset, values, reverse = self._page_query(cursor)
+        return self._make_page(list(queryset), values, reverse)
+
+    async def aget_page(self, cursor=None):
+        queryset, values, reverse = self._page_query(cursor)
+        return self._make_page([row async for row in queryset], values, reverse)
+
+    def _page_query(self, cursor):
+        values, direction = None, 'next'
+        if cursor:
+            try:
+                values, direction = decode_cursor(cursor)
+                values = self._clean_values(values)
+            except InvalidCursor:
+                values, direction = None, 'next'
+
+        reverse = direction == 'prev'
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, reverse))
+        queryset = queryset.order_by(*self._ordering(reverse))
+        return queryset[:self.per_page + 1], values, reverse
+
+    def _clean_values(self, values):
+        """``values`` converted to the types of the ordering fields; ``InvalidCursor`` if they do not fit."""
+        if len(values) != len(self.ordering):
+            raise InvalidCursor(values)
+        cleaned = []
+        for name, value in zip(self.fields, values):
+            try:
+                value = self._output_field(name).to_python(value)
+            except (ValidationError, ValueError, TypeError):
+                raise InvalidCursor(values)
+            if value is None or isinstance(value, (dict, list)):
+                raise InvalidCursor(values)
+            if isinstance(value, datetime) and settings.USE_TZ and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            cleaned.append(value)
+        return cleaned
+
+    def _output_field(self, name):
+        # Ordering may use annotations, e.g. the search rank
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def _make_page(self, rows, values, reverse):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if reverse:
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True, has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more, has_previous=values is not None)
+
+    def _ordering(self, reverse):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    def _keyset_filter(self, values, reverse):
+        # (a, b) after (x, y)  ==  a > x OR (a = x AND b > y), per direction.
+        # The extra a >= x bound lets the database turn it into an index range.
+        ordering = self._ordering(reverse)
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        first = ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': values[0]}) & condition
@@ -0,0 +1,241 @@
+"""
+Per-request profiling and query budgets.
+
+``QueryProfileMiddleware`` records, for every request, the number of
+queries, the time spent in the database, queries repeated with the same
+shape (the usual signature of an N+1), template render time and,
+optionally, peak Python allocation. The numbers are sent back in a
+``Server-Timing`` header and logged as one JSON line on the
+``blog.profiling`` logger.
+
+Views declare how many queries they may run with ``@query_budget``. A
+request that goes over is logged as a warning, and raises
+``QueryBudgetExceeded`` when ``BLOG_ENFORCE_QUERY_BUDGETS`` is on (the
+default under ``manage.py test``), so regressions fail the test suite.
+"""
+import json
+import logging
+import re
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+_current_profile = ContextVar('blog_request_profile', default=None)
+
+# Literals and IN lists are replaced so queries that only differ in their
+# parameters share a fingerprint.
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:[^()]*)\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(sql):
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class RequestProfile:
+
+    def __init__(self):
+        self.queries = []
+        self.template_time = 0.0
+        self.trace_memory = False
+        self.peak_memory = None
+        self.started = time.perf_counter()
+        self.duration = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper()
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    @property
+    def db_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self):
+        """Fingerprints executed more than once, with their counts."""
+        counts = Counter(fingerprint(sql) for sql, _ in self.queries)
+        return {sql: count for sql, count in counts.items() if count > 1}
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+    def server_timing(self):
+        duplicates = sum(count - 1 for count in self.duplicates().values())
+        metrics = [
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.query_count} queries, {duplicates} duplicate"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'total;dur={self.duration * 1000:.1f}',
+        ]
+        if self.peak_memory is not None:
+            metrics.append(f'mem;desc="peak {self.peak_memory / 1024:.0f}KiB"')
+        return ', '.join(metrics)
+
+    def as_dict(self):
+        return {
+            'queries': self.query_count,
+            'db_ms': round(self.db_time * 1000, 2),
+            'template_ms': round(self.template_time * 1000, 2),
+            'total_ms': round(self.duration * 1000, 2),
+            'peak_kib': None if self.peak_memory is None else round(self.peak_memory / 1024, 1),
+            'duplicates': self.duplicates(),
+        }
+
+
+def current_profile():
+    """The profile of the request being handled, if any."""
+    return _current_profile.get()
+
+
+def query_budget(max_queries, max_duplicates=None):
+    """
+    Declare the most queries (and repeated query shapes) a view may run.
+
+    Works on function views and on class-based views.
+    """
+    def decorator(view_func):
+        view_func.query_budget = (max_queries, max_duplicates)
+        return view_func
+    return decorator
+
+
+def check_budget(view_name, budget, profile):
+    max_queries, max_duplicates = budget
+    problems = []
+    if profile.query_count > max_queries:
+        problems.append(f'{profile.query_count} queries (budget {max_queries})')
+    duplicates = profile.duplicates()
+    if max_duplicates is not None and len(duplicates) > max_duplicates:
+        problems.append(f'{len(duplicates)} repeated query shapes (budget {max_duplicates})')
+    if not problems:
+        return
+
+    message = f'{view_name} ran {" and ".join(problems)}'
+    if getattr(settings, 'BLOG_ENFORCE_QUERY_BUDGETS', False):
+        raise QueryBudgetExceeded('\n  '.join([message, *duplicates]))
+    logger.warning(message)
+
+
+class QueryProfileMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        profile, token = self.start(request)
+        try:
+            with self.wrap_connections(profile):
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile, token = self.start(request)
+        try:
+            # Connections belong to the thread the async ORM runs queries on
+            stack = await sync_to_async(self.wrap_connections)(profile)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            _current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    @staticmethod
+    def wrap_connections(profile):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+        return stack
+
+    @staticmethod
+    def start(request):
+        profile = RequestProfile()
+        request.profile = profile
+        if getattr(settings, 'BLOG_PROFILE_ALLOCATIONS', False):
+            # Process-wide, so concurrent requests inflate each other's peak
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            profile.trace_memory = True
+        return profile, _current_profile.set(profile)
+
+    @staticmethod
+    def finish(request, response, profile):
+        if profile.trace_memory:
+            profile.peak_memory = tracemalloc.get_traced_memory()[1]
+        profile.finish()
+
+        response['Server-Timing'] = profile.server_timing()
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'view': getattr(request, 'profiled_view', None),
+            **profile.as_dict(),
+        }))
+
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None:
+            check_budget(request.profiled_view, budget, profile)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', view_func)
+        request.profiled_view = f'{view_class.__module__}.{view_class.__qualname__}'
+        request.query_budget = getattr(view_class, 'query_budget', None)
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile = current_profile()
+            if profile is not None:
+                profile.template_time += time.perf_counter() - start
+
+
+class ProfilingDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing each top-level render."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,121 @@
+"""
+Related-posts engine.
+
+Candidates are scored by shared tags, same category and recency; the top
+``RELATED_POSTS_LIMIT`` per post are stored in ``RelatedPost`` so the
+detail page reads them with a single indexed lookup.
+"""
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .cache import invalidate_related_fragments, invalidate_tags, post_tag
+from .models import Post, RelatedPost
+
+RELATED_POSTS_LIMIT = 3
+
+SHARED_TAG_WEIGHT = 2.0
+SAME_CATEGORY_WEIGHT = 1.0
+RECENCY_WEIGHT = 1.0
+RECENCY_HALF_LIFE_DAYS = 30
+
+# Upper bound on candidates pulled from each source per post
+CANDIDATE_POOL = 200
+
+
+def recency_score(post, now):
+    published = post.published_at or post.created_at
+    age_days = max((now - published).total_seconds() / 86400, 0)
+    return 1 / (1 + age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+def score_candidates(post, limit=RELATED_POSTS_LIMIT):
+    """Return ``[(score, candidate), ...]`` for the best ``limit`` candidates."""
+    published = Post.objects.filter(status=Post.Status.PUBLISHED).exclude(pk=post.pk)
+
+    shared_tags = dict(
+        published.filter(tags__in=post.tags.all())
+        .values('pk')
+        .annotate(shared=Count('pk'))
+        .order_by('-shared')
+        .values_list('pk', 'shared')[:CANDIDATE_POOL]
+    )
+    same_category = set()
+    if post.category_id:
+        same_category = set(
+            published.filter(category_id=post.category_id)
+            .order_by('-published_at')
+            .values_list('pk', flat=True)[:CANDIDATE_POOL]
+        )
+
+    candidates = Post.objects.filter(
+        pk__in=shared_tags.keys() | same_category
+    ).only('pk', 'category_id', 'published_at', 'created_at')
+
+    now = timezone.now()
+    scored = []
+    for candidate in candidates:
+        score = (
+            SHARED_TAG_WEIGHT * shared_tags.get(candidate.pk, 0)
+            + SAME_CATEGORY_WEIGHT * (candidate.pk in same_category)
+            + RECENCY_WEIGHT * recency_score(candidate, now)
+        )
+        scored.append((score, candidate))
+    scored.sort(key=lambda item: (-item[0], -item[1].pk))
+    return scored[:limit]
+
+
+def rebuild_related_posts(posts, limit=RELATED_POSTS_LIMIT):
+    """Recompute and store the neighbours of ``posts``; returns how many were rebuilt."""
+    posts = list(posts)
+    rows = []
+    for post in posts:
+        rows.extend(
+            RelatedPost(post=post, related=candidate, rank=rank, score=score)
+            for rank, (score, candidate) in enumerate(score_candidates(post, limit))
+        )
+
+    post_ids = [post.pk for post in posts]
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=post_ids).delete()
+        RelatedPost.objects.bulk_create(rows)
+        Post.objects.filter(pk__in=post_ids).update(related_stale=False)
+
+    invalidate_tags(*(post_tag(post.slug) for post in posts))
+    invalidate_related_fragments(post_ids)
+    return len(posts)
+
+
+def invalidate_neighbour_pages(post_ids):
+    """Drop the cached detail pages and related-posts fragments of posts listing ``post_ids``."""
+    neighbours = set(RelatedPost.objects.filter(related_id__in=post_ids).values_list('post_id', 'post__slug'))
+    if neighbours:
+        invalidate_tags(*(post_tag(slug) for _, slug in neighbours))
+        invalidate_related_fragments([pk for pk, _ in neighbours])
+
+
+def get_related_posts(post, limit=RELATED_POSTS_LIMIT):
+    """
+    Published neighbours of ``post`` in rank order.
+
+    Posts that were never indexed fall back to the newest posts in the
+    same category until the rebuild command catches up.
+    """
+    related = list(
+        Post.objects.filter(
+            related_backlinks__post=post,
+            status=Post.Status.PUBLISHED,
+        ).for_listing().order_by('related_backlinks__rank')[:limit]
+    )
+    if related or not post.related_stale:
+        return related
+    return list(
+        Post.objects.filter(
+            category=post.category,
+            status=Post.Status.PUBLISHED,
+        ).exclude(id=post.id).for_listing().order_by('-published_at')[:limit]
+    )
+
+
+def mark_related_stale(post_ids):
+    Post.objects.filter(pk__in=post_ids).update(related_stale=True)
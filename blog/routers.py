@@ -0,0 +1,105 @@
+"""
+Read-replica routing.
+
+Reads are sent to the replica named by ``BLOG_READ_REPLICA`` only inside
+views decorated with ``@read_from_replica``; everything else, and every
+write, uses ``default``. After a client sends a write request (any
+non-GET/HEAD/OPTIONS), ``ReplicaPinningMiddleware`` sets a short-lived
+cookie that keeps its reads on the primary, so users see their own
+changes despite replication lag.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'blog_primary'
+DEFAULT_PIN_SECONDS = 10
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_alias = ContextVar('blog_read_alias', default=None)
+
+
+def replica_alias():
+    return getattr(settings, 'BLOG_READ_REPLICA', None)
+
+
+def pin_seconds():
+    return getattr(settings, 'BLOG_REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+
+
+def is_pinned(request):
+    return PIN_COOKIE in request.COOKIES
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+def _replica_for(request):
+    alias = replica_alias()
+    if alias is None or is_pinned(request):
+        return None
+    return alias
+
+
+def read_from_replica(view_func):
+    """Serve the view's reads from the replica unless the client is pinned to the primary."""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            # sync_to_async copies the context, so ORM calls see the alias
+            token = _read_alias.set(_replica_for(request))
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        token = _read_alias.set(_replica_for(request))
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+    return wrapper
+
+
+class ReplicaPinningMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    @staticmethod
+    def pin(request, response):
+        if request.method not in SAFE_METHODS and replica_alias() is not None:
+            response.set_cookie(PIN_COOKIE, '1', max_age=pin_seconds(), httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,40 @@
+"""
+Scheduled publishing.
+
+A scheduled post has ``status='scheduled'`` and the ``published_at`` it
+goes live at. Listings only ever show ``status='published'``, so a post
+is invisible until ``promote_due_posts`` flips it, with no per-row date
+check. The ``publish_scheduled_posts`` worker calls it in a loop; each
+batch locks its due rows with ``FOR UPDATE SKIP LOCKED`` (on PostgreSQL),
+so several workers share the backlog without waiting on each other or
+publishing a post twice.
+"""
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .bulk import ROW_FIELDS, refresh_rows, update_rows
+from .models import BulkJob, Post
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def due_posts(now=None):
+    # Served by the (status, published_at) index
+    return Post.objects.filter(
+        status=Post.Status.SCHEDULED, published_at__lte=now or timezone.now()
+    ).order_by('published_at', 'pk')
+
+
+def promote_due_posts(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Publish up to ``batch_size`` due posts; returns their primary keys."""
+    with transaction.atomic():
+        locked = due_posts(now)
+        if connections[router.db_for_write(Post)].features.has_select_for_update_skip_locked:
+            locked = locked.select_for_update(skip_locked=True, of=('self',))
+        rows = list(locked.values(*ROW_FIELDS)[:batch_size])
+        if rows:
+            # Publishing keeps the scheduled published_at
+            update_rows(BulkJob.Operation.PUBLISH, rows)
+    if rows:
+        refresh_rows(BulkJob.Operation.PUBLISH, rows)
+    return [row['pk'] for row in rows]
@@ -0,0 +1,178 @@
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+# Fields that feed the search index, with their PostgreSQL weight.
+SEARCH_FIELDS = (
+    ('title', 'A'),
+    ('excerpt', 'B'),
+    ('content', 'C'),
+)
+
+# Every backend annotates results with ``rank``; this ordering is also the
+# keyset used to paginate them.
+SEARCH_ORDERING = ('-rank', '-id')
+
+# Same defaults PostgreSQL uses for ts_rank: D, C, B, A.
+WEIGHT_VALUES = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+
+def post_search_vector():
+    vector = None
+    for field, weight in SEARCH_FIELDS:
+        part = SearchVector(field, weight=weight)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+class PostgresSearchBackend:
+    """Ranked full-text search over ``Post.search_vector`` (GIN indexed)."""
+
+    def search(self, queryset, query):
+        search_query = SearchQuery(query, search_type='websearch')
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by(*SEARCH_ORDERING)
+
+    # Archived posts keep the vector computed while their content was here
+    def index_posts(self, post_ids):
+        Post.objects.filter(id__in=post_ids, content_archived=False).update(search_vector=post_search_vector())
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def rebuild(self):
+        Post.objects.filter(content_archived=False).update(search_vector=post_search_vector())
+
+
+class InvertedIndexSearchBackend:
+    """
+    Pure-Python inverted index used when the database has no full-text search.
+
+    The index lives in process memory and is built lazily on the first
+    search, so it is meant for SQLite development and test runs.
+    """
+
+    token_re = re.compile(r'\w+', re.UNICODE)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._documents = {}
+
+    def no_results(self, queryset):
+        return queryset.annotate(rank=Value(0.0, output_field=FloatField())).none()
+
+    def tokenize(self, text):
+        return self.token_re.findall((text or '').lower())
+
+    def search(self, queryset, query):
+        tokens = set(self.tokenize(query))
+        if not tokens:
+            return self.no_results(queryset)
+
+        with self._lock:
+            self._ensure_index()
+            scores = None
+            for token in tokens:
+                postings = self._index.get(token, {})
+                if scores is None:
+                    scores = dict(postings)
+                else:
+                    scores = {
+                        post_id: score + postings[post_id]
+                        for post_id, score in scores.items()
+                        if post_id in postings
+                    }
+
+        if not scores:
+            return self.no_results(queryset)
+        rank = Case(
+            *[When(id=post_id, then=Value(score)) for post_id, score in scores.items()],
+            output_field=FloatField(),
+        )
+        return queryset.filter(id__in=list(scores)).annotate(rank=rank).order_by(*SEARCH_ORDERING)
+
+    def index_posts(self, post_ids):
+        with self._lock:
+            if self._index is None:
+                return
+            for row in self._rows(Post.objects.filter(id__in=post_ids)):
+                self._remove(row['id'])
+                self._add(row)
+
+    def remove_posts(self, post_ids):
+        with self._lock:
+            if self._index is None:
+                return
+            for post_id in post_ids:
+                self._remove(post_id)
+
+    def rebuild(self):
+        with self._lock:
+            self._index = None
+
+    def _ensure_index(self):
+        if self._index is not None:
+            return
+        self._index = defaultdict(dict)
+        self._documents = {}
+        for row in self._rows(Post.objects.all()):
+            self._add(row)
+
+    @staticmethod
+    def _rows(posts):
+        fields = [field for field, _ in SEARCH_FIELDS]
+        for row in posts.values('id', *fields, 'archive__content').iterator(chunk_size=2000):
+            # Archived posts are indexed from their archived content
+            archived = row.pop('archive__content')
+            if archived is not None:
+                row['content'] = archived
+            yield row
+
+    def _add(self, row):
+        weights = defaultdict(float)
+        for field, weight in SEARCH_FIELDS:
+            for token in self.tokenize(row[field]):
+                weights[token] += WEIGHT_VALUES[weight]
+        for token, weight in weights.items():
+            self._index[token][row['id']] = weight
+        self._documents[row['id']] = list(weights)
+
+    def _remove(self, post_id):
+        for token in self._documents.pop(post_id, ()):
+            postings = self._index.get(token)
+            if postings is not None:
+                postings.pop(post_id, None)
+                if not postings:
+                    del self._index[token]
+
+
+_backend = None
+
+
+def get_search_backend():
+    """
+    Return the configured search backend.
+
+    ``BLOG_SEARCH_BACKEND`` may name a backend class; otherwise PostgreSQL
+    uses full-text search and every other database the inverted index.
+    """
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+        if backend_path:
+            _backend = import_string(backend_path)()
+        elif connection.vendor == 'postgresql':
+            _backend = PostgresSearchBackend()
+        else:
+            _backend = InvertedIndexSearchBackend()
+    return _backend
@@ -0,0 +1,220 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .authors import adjust_author, refresh_latest_published
+from .cache import category_tag, invalidate_post_cards, invalidate_tags, post_tag
+from .counters import adjust, published_category_id, recount_tags
+from .db_stats import record_connection
+from .models import AuthorProfile, Post, Category, Comment, Tag
+from .navigation import invalidate_nav_categories
+from .related import invalidate_neighbour_pages, mark_related_stale
+from .search import SEARCH_FIELDS, get_search_backend
+from .stats import invalidate_homepage_stats
+
+
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=Category)
+def clear_homepage_stats(sender, **kwargs):
+    invalidate_homepage_stats()
+
+
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=Category)
+def clear_nav_categories(sender, **kwargs):
+    # Saving a post may publish, unpublish or recategorize it
+    invalidate_nav_categories()
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    searchable = {field for field, _ in SEARCH_FIELDS}
+    if update_fields is not None and not searchable.intersection(update_fields):
+        return
+    get_search_backend().index_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove_posts([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    tags = ['posts', post_tag(instance.slug)]
+    if instance.category_id:
+        tags.append(category_tag(instance.category.slug))
+    invalidate_tags(*tags)
+    invalidate_post_cards([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+def invalidate_neighbour_post_pages(sender, instance, created, **kwargs):
+    # Posts listing this one print its title and link; deletions are
+    # handled in pre_delete, while the links still exist
+    if not created:
+        invalidate_neighbour_pages([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment_post_page(sender, instance, **kwargs):
+    # updated_at feeds the detail page's ETag/Last-Modified
+    post = Post.objects.filter(pk=instance.post_id)
+    post.update(updated_at=timezone.now())
+    slug = post.values_list('slug', flat=True).first()
+    if slug:
+        invalidate_tags(post_tag(slug))
+
+
+@receiver([post_save, pre_delete], sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    # Listings and detail pages print the category name; pre_delete runs
+    # while posts still point at the category.
+    posts = list(Post.objects.filter(category=instance).values_list('pk', 'slug'))
+    invalidate_tags('posts', category_tag(instance.slug), *(post_tag(slug) for _, slug in posts))
+    invalidate_post_cards([pk for pk, _ in posts])
+
+
+@receiver([post_save, pre_delete], sender=Tag)
+def invalidate_tag_pages(sender, instance, **kwargs):
+    slugs = Post.objects.filter(tags=instance).values_list('slug', flat=True)
+    invalidate_tags(*(post_tag(slug) for slug in slugs))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_tag_pages(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_tags(post_tag(instance.slug))
+    elif pk_set:
+        slugs = Post.objects.filter(pk__in=pk_set).values_list('slug', flat=True)
+        invalidate_tags(*(post_tag(slug) for slug in slugs))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def mark_tagged_posts_stale(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        instance.related_stale = True
+        mark_related_stale([instance.pk])
+    elif pk_set:
+        mark_related_stale(pk_set)
+
+
+@receiver(pre_delete, sender=Post)
+def mark_neighbours_stale(sender, instance, **kwargs):
+    # Posts listing this one lose a neighbour when its rows cascade away
+    mark_related_stale(
+        instance.related_backlinks.values_list('post_id', flat=True)
+    )
+    invalidate_neighbour_pages([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def create_author_profile(sender, instance, created, raw=False, using=None, **kwargs):
+    if created and not raw:
+        AuthorProfile.objects.using(using).create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    # One receiver, so every counter compares against the values loaded
+    # before this save, whatever order receivers run in
+    update_author_stats(instance, created)
+    count_published_post(instance, created)
+    instance.reset_loaded_values('author_id', 'published_at', 'status', 'category_id')
+
+
+def update_author_stats(instance, created):
+    old_author = None if created else instance.loaded_value('author_id')
+    old_published = int(not created and instance.loaded_value('status') == Post.Status.PUBLISHED)
+    published = int(instance.status == Post.Status.PUBLISHED)
+
+    author_changed = old_author != instance.author_id
+    if author_changed:
+        adjust_author(old_author, posts=-old_published, views=-instance.views_count)
+        adjust_author(instance.author_id, posts=published, views=instance.views_count)
+    elif old_published != published:
+        adjust_author(instance.author_id, posts=published - old_published)
+
+    date_changed = published and instance.loaded_value('published_at') != instance.published_at
+    if (author_changed and (old_published or published)) or old_published != published or date_changed:
+        refresh_latest_published({old_author, instance.author_id} - {None})
+
+
+@receiver(post_delete, sender=Post)
+def uncount_author_post(sender, instance, **kwargs):
+    adjust_author(
+        instance.author_id,
+        posts=-int(instance.status == Post.Status.PUBLISHED),
+        views=-instance.views_count,
+    )
+    if instance.status == Post.Status.PUBLISHED:
+        refresh_latest_published([instance.author_id])
+
+
+def count_published_post(instance, created):
+    old = None if created else published_category_id(
+        instance.loaded_value('status'), instance.loaded_value('category_id')
+    )
+    new = published_category_id(instance.status, instance.category_id)
+    if old != new:
+        adjust(Category, old, 'published_post_count', -1)
+        adjust(Category, new, 'published_post_count', 1)
+
+
+@receiver(pre_delete, sender=Post)
+def uncount_deleted_post(sender, instance, **kwargs):
+    # The tag through rows are removed without an m2m_changed signal
+    Tag.objects.filter(posts=instance).update(post_count=F('post_count') - 1)
+    adjust(
+        Category,
+        published_category_id(instance.status, instance.category_id),
+        'published_post_count', -1,
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    old = None
+    if not created and instance.loaded_value('is_approved'):
+        old = instance.loaded_value('post_id')
+    new = instance.post_id if instance.is_approved else None
+    if old != new:
+        adjust(Post, old, 'comment_count', -1)
+        adjust(Post, new, 'comment_count', 1)
+    instance.reset_loaded_values('is_approved', 'post_id')
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    if instance.is_approved:
+        adjust(Post, instance.post_id, 'comment_count', -1)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_tagged_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and not reverse:
+        instance._cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+    elif action == 'post_add' and pk_set:
+        # Django only reports links that were actually created
+        if reverse:
+            adjust(Tag, instance.pk, 'post_count', len(pk_set))
+        else:
+            Tag.objects.filter(pk__in=pk_set).update(post_count=F('post_count') + 1)
+    elif action in ('post_remove', 'post_clear'):
+        # pk_set may name links that never existed, so recount instead
+        if reverse:
+            recount_tags([instance.pk])
+        else:
+            recount_tags(pk_set or instance.__dict__.pop('_cleared_tag_ids', []))
+
+
+@receiver(connection_created)
+def count_new_connection(sender, connection, **kwargs):
+    record_connection(connection.alias)
@@ -0,0 +1,76 @@
+"""
+Unique slug allocation.
+
+A colliding slug gets the next free numeric suffix (``title``,
+``title-2``, ``title-3`` ...). The taken slugs are read with one prefix
+query, which the unique slug index (and its ``LIKE`` index on PostgreSQL)
+answers without scanning, keeping only numeric suffixes; concurrent
+writers that still pick the same slug are resolved by retrying on
+``IntegrityError`` in ``UniqueSlugMixin``.
+"""
+import re
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Room kept at the end of the slug for "-<n>"
+SUFFIX_ROOM = 8
+
+# Prefix conditions per query; keeps SQLite under its expression depth limit
+PREFIX_QUERY_CHUNK = 200
+
+
+def slug_base(model, text):
+    max_length = model._meta.get_field('slug').max_length
+    base = slugify(text or '', allow_unicode=True)[:max_length - SUFFIX_ROOM].strip('-')
+    return base or model._meta.model_name
+
+
+def _taken_slugs(model, bases, exclude_pk=None):
+    taken = set()
+    bases = list(bases)
+    for start in range(0, len(bases), PREFIX_QUERY_CHUNK):
+        condition = Q()
+        for base in bases[start:start + PREFIX_QUERY_CHUNK]:
+            # The prefix lets the index narrow the rows; the pattern keeps
+            # only numeric suffixes, not longer slugs sharing the prefix
+            condition |= Q(slug=base) | Q(
+                slug__startswith=f'{base}-', slug__regex=rf'^{re.escape(base)}-\d+$'
+            )
+        queryset = model._default_manager.filter(condition)
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        taken.update(queryset.values_list('slug', flat=True))
+    return taken
+
+
+def _next_free(base, taken):
+    if base not in taken:
+        return base
+    suffix = re.compile(rf'^{re.escape(base)}-(\d+)$')
+    used = [int(match.group(1)) for slug in taken if (match := suffix.match(slug))]
+    return f'{base}-{max(used, default=1) + 1}'
+
+
+def allocate_slug(model, text, exclude_pk=None):
+    """Return a slug for ``text`` that no other ``model`` row uses."""
+    base = slug_base(model, text)
+    return _next_free(base, _taken_slugs(model, [base], exclude_pk))
+
+
+def allocate_slugs(model, texts, reserved=()):
+    """
+    Allocate slugs for many new rows at once, e.g. an import batch.
+
+    Slugs are unique against the table, within ``texts`` and against
+    ``reserved`` (slugs about to be inserted by the caller); one prefix
+    query is issued per ``PREFIX_QUERY_CHUNK`` distinct bases.
+    """
+    bases = [slug_base(model, text) for text in texts]
+    taken = _taken_slugs(model, set(bases)) | set(reserved)
+    slugs = []
+    for base in bases:
+        slug = _next_free(base, taken)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
@@ -0,0 +1,10 @@
+'use strict';
+{
+    // Reload the changelist when an AutocompleteFilter choice changes
+    django.jQuery(document).on('change', 'select.blog-autocomplete-filter', function() {
+        const value = this.value;
+        window.location.search = value
+            ? this.dataset.selectUrl.replace(this.dataset.placeholderValue, encodeURIComponent(value))
+            : this.dataset.clearUrl;
+    });
+}
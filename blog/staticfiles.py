@@ -0,0 +1,125 @@
+"""
+Production static files.
+
+``collectstatic`` with ``CompressedManifestStaticFilesStorage`` prunes the
+stylesheets listed in ``BLOG_PRUNE_CSS`` to the classes the templates use,
+gives every file a content-hashed name and writes ``.gz`` and ``.br``
+copies next to the text assets. ``serve`` hands those files out with the
+best encoding the client accepts; hashed names never change content, so
+they are cached for a year as immutable.
+"""
+import gzip
+import mimetypes
+import os
+
+import brotli
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from .css import prune_css, used_classes
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.html', '.xml')
+# Encodings in order of preference: (Accept-Encoding token, file suffix)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+
+def compress(content):
+    """``{suffix: compressed bytes}`` for the encodings that make ``content`` smaller."""
+    variants = {
+        '.gz': gzip.compress(content, compresslevel=9, mtime=0),
+        '.br': brotli.compress(content, quality=11),
+    }
+    return {suffix: data for suffix, data in variants.items() if len(data) < len(content)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # Only CSS references are rewritten: the vendor JS bundles point at
+    # source maps that are not shipped
+    patterns = tuple(
+        (glob, rules) for glob, rules in ManifestStaticFilesStorage.patterns if glob == '*.css'
+    )
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = self.prune(paths)
+
+        hashed_names = {}
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if isinstance(hashed_name, str):
+                hashed_names[name] = hashed_name
+            yield name, hashed_name, processed
+
+        if not dry_run:
+            for name in hashed_names.values():
+                if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                    self.write_compressed(name)
+
+    def prune(self, paths):
+        """Replace the collected copies of ``BLOG_PRUNE_CSS``; returns ``paths`` pointing at them."""
+        prune = [name for name in getattr(settings, 'BLOG_PRUNE_CSS', []) if name in paths]
+        if not prune:
+            return paths
+        names = used_classes()
+        paths = dict(paths)
+        for name in prune:
+            # Always prune the source: the collected copy may be pruned already
+            storage, path = paths[name]
+            with storage.open(path) as source:
+                css = source.read().decode('utf-8')
+            self.delete(name)
+            self._save(name, ContentFile(prune_css(css, names).encode('utf-8')))
+            # Hashing reads the files from ``paths``
+            paths[name] = (self, name)
+        return paths
+
+    def write_compressed(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        for suffix, data in compress(content).items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(data))
+
+
+def _accepted_encodings(request):
+    header = request.headers.get('Accept-Encoding', '')
+    tokens = {part.split(';')[0].strip().lower() for part in header.split(',')}
+    return [(token, suffix) for token, suffix in ENCODINGS if token in tokens]
+
+
+def is_hashed(name):
+    # The manifest maps original names to hashed ones
+    return name in getattr(staticfiles_storage, 'hashed_files', {}).values()
+
+
+@require_safe
+def serve(request, path):
+    """Serve a collected file from ``STATIC_ROOT``, pre-compressed when possible."""
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    encoding = None
+    for token, suffix in _accepted_encodings(request):
+        if os.path.isfile(fullpath + suffix):
+            encoding, fullpath = token, fullpath + suffix
+            break
+
+    content_type, _ = mimetypes.guess_type(path)
+    response = FileResponse(open(fullpath, 'rb'), content_type=content_type or 'application/octet-stream')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if is_hashed(path) else REVALIDATE_CACHE_CONTROL
+    return response
@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Post, Category
+
+HOMEPAGE_STATS_KEY = 'blog:homepage_stats'
+HOMEPAGE_STATS_TIMEOUT = 60 * 15
+FEATURED_TOPICS_LIMIT = 6
+
+
+def get_homepage_stats():
+    """
+    Return the homepage statistics snapshot.
+
+    The numbers come from database aggregates and the denormalized
+    category counters instead of loading every published post, and the
+    result is cached until a post changes.
+    """
+    stats = cache.get(HOMEPAGE_STATS_KEY)
+    if stats is None:
+        stats = Post.objects.filter(
+            status=Post.Status.PUBLISHED
+        ).aggregate(
+            total_posts=Count('id'),
+            total_authors=Count('author', distinct=True),
+        )
+        stats['featured_topics'] = list(
+            Category.objects.filter(
+                published_post_count__gt=0
+            ).values('name', 'slug')[:FEATURED_TOPICS_LIMIT]
+        )
+        cache.set(HOMEPAGE_STATS_KEY, stats, HOMEPAGE_STATS_TIMEOUT)
+    return stats
+
+
+def invalidate_homepage_stats():
+    cache.delete(HOMEPAGE_STATS_KEY)
@@ -0,0 +1,51 @@
+"""Set-based resolution of tags (and categories) by name."""
+from .models import Tag
+from .slugs import allocate_slugs
+
+TAG_NAME_MAX_LENGTH = Tag._meta.get_field('name').max_length
+
+
+def parse_tag_names(raw):
+    """Split comma separated input into stripped, de-duplicated tag names."""
+    names = {}
+    for name in (raw or '').split(','):
+        name = ' '.join(name.split())[:TAG_NAME_MAX_LENGTH]
+        if name:
+            names.setdefault(name, None)
+    return list(names)
+
+
+def resolve_by_name(model, names):
+    """
+    Return ``model`` rows (``Tag`` or ``Category``) for ``names``, creating
+    the missing ones.
+
+    Existing rows are fetched with one ``IN`` query and missing ones inserted
+    with a single ``bulk_create`` using bulk-allocated slugs; concurrent
+    creators are absorbed by ``ignore_conflicts``.
+    """
+    if not names:
+        return []
+
+    rows = {row.name: row for row in model.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in rows]
+    if missing:
+        model.objects.bulk_create(
+            [
+                model(name=name, slug=slug)
+                for name, slug in zip(missing, allocate_slugs(model, missing))
+            ],
+            ignore_conflicts=True,
+        )
+        rows.update((row.name, row) for row in model.objects.filter(name__in=missing))
+
+        # Rows lost to a concurrent creator that took the same slug
+        for name in missing:
+            if name not in rows:
+                rows[name], _ = model.objects.get_or_create(name=name)
+
+    return [rows[name] for name in names]
+
+
+def resolve_tags(names):
+    return resolve_by_name(Tag, names)
@@ -1,3 +1,1766 @@
-from django.test import TestCase
+from io import StringIO
+import json
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock, skipIf, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.db import DatabaseError, connection, connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import bulk
+from . import slugs as slugs_module
+from . import view_counter as view_counter_module
+from .authors import recount_authors
+from .changelist import EstimatedCountPaginator
+from .comments import get_comment_page
+from .css import class_names, prune_css
+from .models import AuthorProfile, BulkJob, Post, PostArchive, Category, Comment, Tag
+from .navigation import get_nav_categories
+from .pagination import CursorPaginator, encode_cursor
+from .profiling import QueryBudgetExceeded, QueryProfileMiddleware, fingerprint, query_budget
+from .related import get_related_posts, rebuild_related_posts
+from .rendering import RENDERER_VERSION
+from .routers import PIN_COOKIE, ReplicaRouter, read_from_replica
+from .scheduling import due_posts, promote_due_posts
+from .search import get_search_backend
+from .slugs import allocate_slug, allocate_slugs
+from .staticfiles import serve as serve_static
+from .tagging import parse_tag_names
+from .view_counter import ViewCounter
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class HomeViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Technology')
+
+    def create_posts(self, count, author):
+        start = Post.objects.count()
+        for i in range(start, start + count):
+            Post.objects.create(
+                title=f'Post {i}',
+                content='Content',
+                author=author,
+                category=self.category,
+                status=Post.Status.PUBLISHED,
+                is_featured=True,
+            )
+
+    def test_home_stats_use_aggregates(self):
+        alice = User.objects.create_user('alice', password='pass')
+        bob = User.objects.create_user('bob', password='pass')
+        self.create_posts(3, alice)
+        self.create_posts(2, bob)
+
+        response = self.client.get(reverse('blog:home'))
+
+        self.assertEqual(response.context['total_posts'], 5)
+        self.assertEqual(response.context['total_authors'], 2)
+        self.assertEqual(response.context['featured_topics'], [{'name': 'Technology', 'slug': 'technology'}])
+
+    def test_home_query_count_is_constant(self):
+        alice = User.objects.create_user('alice', password='pass')
+        self.create_posts(1, alice)
+        cache.clear()
+        get_nav_categories()
+        with self.assertNumQueries(3):
+            self.client.get(reverse('blog:home'))
+
+        self.create_posts(30, User.objects.create_user('bob', password='pass'))
+        cache.clear()
+        get_nav_categories()
+        with self.assertNumQueries(3):
+            self.client.get(reverse('blog:home'))
+
+    def test_home_stats_are_invalidated_on_post_changes(self):
+        alice = User.objects.create_user('alice', password='pass')
+        self.create_posts(1, alice)
+        self.client.get(reverse('blog:home'))
+
+        with self.assertNumQueries(1):
+            self.client.get(reverse('blog:home'))
+
+        self.create_posts(1, alice)
+        response = self.client.get(reverse('blog:home'))
+        self.assertEqual(response.context['total_posts'], 2)
+
+        Post.objects.first().delete()
+        response = self.client.get(reverse('blog:home'))
+        self.assertEqual(response.context['total_posts'], 1)
+
+
+class ViewCounterTests(TestCase):
+
+    def setUp(self):
+        author = User.objects.create_user('alice', password='pass')
+        self.post = Post.objects.create(
+            title='Counted', content='Content', author=author,
+            status=Post.Status.PUBLISHED,
+        )
+        self.other = Post.objects.create(
+            title='Other', content='Content', author=author,
+            status=Post.Status.PUBLISHED,
+        )
+
+    @override_settings(BLOG_VIEW_COUNT_FLUSH_INTERVAL=60)
+    def test_concurrent_views_are_counted_exactly(self):
+        counter = ViewCounter()
+        counter._ensure_worker = lambda: None
+
+        def view_many():
+            for _ in range(50):
+                counter.record(self.post.pk)
+                counter.record(self.other.pk)
+
+        threads = [threading.Thread(target=view_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Both posts share the same increment, so one UPDATE of the posts
+        # and one of their author cover them
+        with self.assertNumQueries(2):
+            self.assertEqual(counter.flush(), 800)
+
+        self.post.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.post.views_count, 400)
+        self.assertEqual(self.other.views_count, 400)
+        self.assertEqual(AuthorProfile.objects.get(user=self.post.author).total_views, 800)
+
+        with self.assertNumQueries(0):
+            counter.flush()
+
+    @override_settings(BLOG_VIEW_COUNT_FLUSH_INTERVAL=0)
+    def test_post_detail_records_view(self):
+        self.client.get(reverse('blog:post_detail', args=[self.post.slug]))
+        self.client.get(reverse('blog:post_detail', args=[self.post.slug]))
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 2)
+
+
+# Writes commit group by group, as they do outside a test transaction
+class ViewCounterFlushFailureTests(TransactionTestCase):
+
+    @override_settings(BLOG_VIEW_COUNT_FLUSH_INTERVAL=60)
+    def test_failed_flush_keeps_unwritten_groups(self):
+        author = User.objects.create_user('alice', password='pass')
+        posts = [
+            Post.objects.create(title=title, content='Content', author=author, status=Post.Status.PUBLISHED)
+            for title in ['First', 'Second', 'Third']
+        ]
+        counter = ViewCounter()
+        counter._ensure_worker = lambda: None
+        # Three increment sizes, so three groups written in turn
+        for views, post in enumerate(posts, 1):
+            for _ in range(views):
+                counter.record(post.pk)
+
+        add_views = view_counter_module.add_views
+        failures = iter([None, DatabaseError('deadlock')])
+
+        def fail_second(post_ids, count):
+            error = next(failures, None)
+            if error:
+                raise error
+            add_views(post_ids, count)
+
+        with mock.patch.object(view_counter_module, 'add_views', fail_second):
+            with self.assertRaises(DatabaseError):
+                counter.flush()
+
+        # The first group was written, the failed and the later ones wait
+        self.assertEqual([counter.pending(post.pk) for post in posts], [0, 2, 3])
+
+        self.assertEqual(counter.flush(), 5)
+        self.assertEqual(
+            list(Post.objects.order_by('pk').values_list('views_count', flat=True)), [1, 2, 3]
+        )
+        self.assertEqual(AuthorProfile.objects.get(user=author).total_views, 6)
+
+
+class NavigationTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+        self.category = Category.objects.create(name='Technology')
+        Post.objects.create(
+            title='First', content='Content', author=self.author,
+            category=self.category, status=Post.Status.PUBLISHED,
+        )
+
+    def test_navbar_costs_no_queries_when_warm(self):
+        self.client.get(reverse('blog:about'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('blog:about'))
+        self.assertContains(response, reverse('blog:category_posts', args=['technology']))
+        self.assertEqual(response.context['nav_categories'], [('Technology', 'technology', 1)])
+
+    def test_category_and_post_changes_rebuild_the_list(self):
+        get_nav_categories()
+        Category.objects.create(name='Design')
+        self.assertEqual([category.slug for category in get_nav_categories()], ['design', 'technology'])
+
+        Post.objects.create(
+            title='Second', content='Content', author=self.author,
+            category=self.category, status=Post.Status.PUBLISHED,
+        )
+        self.assertEqual(get_nav_categories()[1].published_post_count, 2)
+
+    def test_category_pages_are_routed_by_slug(self):
+        response = self.client.get(reverse('blog:category_posts', args=['technology']))
+        self.assertContains(response, 'First')
+
+        response = self.client.get('/category/Technology/')
+        self.assertRedirects(response, reverse('blog:category_posts', args=['technology']), status_code=301)
+        self.assertEqual(self.client.get('/category/missing/').status_code, 404)
+
+
+class RenderingTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+
+    def create_post(self, content, **kwargs):
+        return Post.objects.create(title='Rendered', content=content, author=self.author, **kwargs)
+
+    def test_markdown_is_rendered_and_sanitized_on_save(self):
+        post = self.create_post('# Heading\n\n**bold** <script>alert(1)</script> [link](http://example.com)')
+
+        self.assertIn('<h1>Heading</h1>', post.content_html)
+        self.assertIn('<strong>bold</strong>', post.content_html)
+        self.assertIn('rel="noopener noreferrer nofollow"', post.content_html)
+        self.assertNotIn('<script', post.content_html)
+        self.assertEqual(post.summary, 'Heading bold link')
+        self.assertEqual(post.renderer_version, RENDERER_VERSION)
+
+    def test_plain_text_is_escaped_and_read_time_computed(self):
+        content = '<b>hi</b>\n' + 'word ' * 450
+        post = self.create_post(content, content_format=Post.ContentFormat.PLAIN, excerpt='Short summary')
+
+        self.assertTrue(post.content_html.startswith('&lt;b&gt;hi&lt;/b&gt;<br>'))
+        self.assertEqual(post.summary, 'Short summary')
+        self.assertEqual(post.read_time, 3)
+
+    def test_only_content_changes_render_again(self):
+        post = self.create_post('First')
+        post.status = Post.Status.PUBLISHED
+        with mock.patch('blog.models.render_post') as render:
+            post.save()
+            post.save(update_fields=['status'])
+        render.assert_not_called()
+
+        post.content = 'Second'
+        post.save(update_fields=['content'])
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, '<p>Second</p>')
+
+    def test_rerender_command_updates_outdated_posts(self):
+        post = self.create_post('Content')
+        Post.objects.filter(pk=post.pk).update(content_html='', renderer_version=0)
+
+        call_command('rerender_posts', stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, '<p>Content</p>')
+        self.assertEqual(post.renderer_version, RENDERER_VERSION)
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class ArchiveTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+        self.old = Post.objects.create(
+            title='Old news', content='**Old** body', excerpt='Old summary', author=self.author,
+            status=Post.Status.PUBLISHED, published_at=timezone.now() - timedelta(days=400),
+        )
+        self.archived = Post.objects.create(
+            title='Retired', content='Retired body', author=self.author, status=Post.Status.ARCHIVED,
+        )
+        self.recent = Post.objects.create(
+            title='Fresh', content='Fresh body', author=self.author, status=Post.Status.PUBLISHED,
+        )
+
+    def archive(self, *args):
+        call_command('archive_posts', *args, stdout=StringIO())
+        for post in (self.old, self.archived, self.recent):
+            post.refresh_from_db()
+
+    def test_archiving_moves_heavy_columns_out_of_the_post_table(self):
+        self.archive()
+        self.assertEqual((self.archived.content, self.archived.content_html), ('', ''))
+        self.assertTrue(self.archived.content_archived)
+        self.assertFalse(self.old.content_archived)
+
+        self.archive('--older-than', '365')
+        self.assertTrue(self.old.content_archived)
+        self.assertFalse(self.recent.content_archived)
+        self.assertEqual(PostArchive.objects.get(post=self.old).content_html, '<p><strong>Old</strong> body</p>')
+        # Listings keep what they show on the narrow row
+        self.assertContains(self.client.get(reverse('blog:posts')), 'Old summary')
+
+    def test_detail_loads_archived_content_lazily(self):
+        url = reverse('blog:post_detail', args=[self.old.slug])
+        self.archive('--older-than', '365')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, '<strong>Old</strong> body')
+        self.assertEqual(sum('"blog_postarchive"' in query['sql'] for query in queries), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('blog:post_detail', args=[self.recent.slug]))
+        self.assertFalse(any('"blog_postarchive"' in query['sql'] for query in queries))
+
+    def test_restore_brings_content_back(self):
+        self.archive('--older-than', '365')
+        call_command('archive_posts', '--restore', '--slug', self.old.slug, stdout=StringIO())
+
+        self.old.refresh_from_db()
+        self.assertEqual(self.old.content, '**Old** body')
+        self.assertFalse(self.old.content_archived)
+        self.assertEqual(list(PostArchive.objects.values_list('post_id', flat=True)), [self.archived.pk])
+
+    def test_editing_an_archived_post_restores_it(self):
+        self.archive()
+        self.client.force_login(self.author)
+        url = reverse('blog:post-update', args=[self.archived.slug])
+        self.assertContains(self.client.get(url), 'Retired body')
+
+        self.client.post(url, {
+            'title': 'Retired', 'content': 'Retired body, edited', 'content_format': 'markdown',
+            'status': 'archived',
+        })
+        self.archived.refresh_from_db()
+        self.assertFalse(self.archived.content_archived)
+        self.assertEqual(self.archived.content_html, '<p>Retired body, edited</p>')
+        self.assertFalse(PostArchive.objects.exists())
+
+    def test_export_and_search_use_archived_content(self):
+        self.archive()
+        out = StringIO()
+        with mock.patch('sys.stdout', out):
+            call_command('export_posts', stderr=StringIO())
+        records = {record['slug']: record for record in map(json.loads, out.getvalue().splitlines())}
+        self.assertEqual(records[self.archived.slug]['content'], 'Retired body')
+
+        backend = get_search_backend()
+        backend.rebuild()
+        self.assertIn(self.archived, backend.search(Post.objects.all(), 'retired body'))
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class ListingProjectionTests(TestCase):
+    HEAVY_COLUMN_RE = re.compile(r'"blog_post"\."(content|content_html|search_vector)"')
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+        category = Category.objects.create(name='Python')
+        for status in (Post.Status.PUBLISHED, Post.Status.DRAFT):
+            Post.objects.create(
+                title=f'A {status} post', content='word ' * 1000, author=self.author,
+                category=category, status=status, is_featured=True,
+            )
+
+    def test_listings_never_load_heavy_columns(self):
+        self.client.force_login(self.author)
+        urls = [
+            reverse('blog:home'),
+            reverse('blog:posts'),
+            reverse('blog:category_posts', args=['python']),
+            reverse('blog:search_posts') + '?search=post',
+            reverse('blog:author_posts', args=[self.author.author_profile.slug]),
+            reverse('blog:my_posts'),
+            reverse('blog:draft_posts'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                # Warm up, e.g. the in-memory search index reads all content once
+                self.client.get(url)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertContains(response, 'A published post' if 'draft' not in url else 'A draft post')
+                heavy = [query['sql'] for query in queries if self.HEAVY_COLUMN_RE.search(query['sql'])]
+                self.assertEqual(heavy, [])
+
+    def test_detail_loads_the_content(self):
+        post = Post.objects.for_detail().get(status=Post.Status.PUBLISHED)
+        self.assertEqual(post.get_deferred_fields(), {'search_vector'})
+        with self.assertNumQueries(0):
+            self.assertTrue(post.content_html)
+
+    def test_saving_a_listing_row_leaves_deferred_fields_alone(self):
+        post = Post.objects.for_listing().get(status=Post.Status.PUBLISHED)
+        before = Post.objects.values('content_html', 'updated_at').get(pk=post.pk)
+        post.title = 'Renamed'
+
+        with CaptureQueriesContext(connection) as queries, mock.patch('blog.models.render_post') as render:
+            post.save()
+        render.assert_not_called()
+        # What touching a deferred field costs: one query per field
+        field_loads = [
+            query['sql'] for query in queries
+            if re.match(r'SELECT "blog_post"\."id", "blog_post"\."\w+" FROM "blog_post" WHERE', query['sql'])
+        ]
+        self.assertEqual(field_loads, [])
+        self.assertTrue({'content', 'content_html', 'excerpt'} <= post.get_deferred_fields())
+
+        after = Post.objects.values('title', 'content_html', 'updated_at').get(pk=post.pk)
+        self.assertEqual(after['title'], 'Renamed')
+        self.assertEqual(after['content_html'], before['content_html'])
+        self.assertGreater(after['updated_at'], before['updated_at'])
+
+    def test_benchmark_compares_both_projections(self):
+        out = StringIO()
+        call_command('benchmark_listing', '--posts', '3', '--content-kb', '1', '--page-sizes', '2',
+                     '--runs', '1', stdout=out)
+        self.assertIn('whole rows', out.getvalue())
+        self.assertIn('for_listing', out.getvalue())
+        self.assertEqual(Post.objects.count(), 2)
+
+
+class StaticPipelineTests(TestCase):
+
+    def test_prune_css_keeps_rules_for_used_classes(self):
+        css = (
+            '/*! license */.btn{color:red}.unused{color:blue}.btn:not(.unused){margin:0}'
+            '.alert-success{padding:1px}body,.unused p{margin:0}'
+            '@media (min-width:576px){.unused{display:none}.btn{display:block}}'
+            '@media print{.unused{display:none}}/*# sourceMappingURL=x.map */'
+        )
+        names = class_names('<a class="btn alert-{{ message.tags }}{% if x %} active{% endif %}">')
+
+        self.assertEqual(names, {'btn', 'alert-*', 'active'})
+        self.assertEqual(
+            prune_css(css, names),
+            '/*! license */.btn{color:red}.btn:not(.unused){margin:0}.alert-success{padding:1px}'
+            'body{margin:0}@media (min-width:576px){.btn{display:block}}',
+        )
+
+    def test_collectstatic_prunes_hashes_and_compresses(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            STATIC_ROOT=root,
+            STORAGES={**settings.STORAGES, 'staticfiles': {
+                'BACKEND': 'blog.staticfiles.CompressedManifestStaticFilesStorage',
+            }},
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            hashed = staticfiles_storage.hashed_files['css/bootstrap.min.css']
+            source_size = os.path.getsize(finders.find('css/bootstrap.min.css'))
+            self.assertLess(staticfiles_storage.size(hashed), source_size / 2)
+
+            request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip, br')
+            response = serve_static(request, hashed)
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+            self.assertIn('Accept-Encoding', response['Vary'])
+            response.close()
+
+            response = serve_static(RequestFactory().get('/'), 'css/bootstrap.min.css')
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertIn('must-revalidate', response['Cache-Control'])
+            response.close()
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        get_search_backend().rebuild()
+        self.author = User.objects.create_user('alice', password='pass')
+
+    def create_post(self, title, excerpt='', content='Content', status=Post.Status.PUBLISHED):
+        return Post.objects.create(
+            title=title, excerpt=excerpt, content=content,
+            author=self.author, status=status,
+        )
+
+    def search(self, query):
+        response = self.client.get(reverse('blog:search_posts'), {'search': query})
+        return [post.title for post in response.context['posts']]
+
+    def test_results_are_ranked_by_field_weight(self):
+        self.create_post('Cooking', content='A note about django')
+        self.create_post('Gardening', excerpt='Django in the garden')
+        self.create_post('Django tips')
+
+        self.assertEqual(self.search('django'), ['Django tips', 'Gardening', 'Cooking'])
+
+    def test_all_terms_must_match(self):
+        self.create_post('Django search', content='postgres')
+        self.create_post('Django forms')
+
+        self.assertEqual(self.search('django postgres'), ['Django search'])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.create_post('Unrelated')
+        self.assertEqual(self.search('python'), [])
+
+        post = self.create_post('Python basics')
+        self.assertEqual(self.search('python'), ['Python basics'])
+
+        post.title = 'Rust basics'
+        post.save()
+        self.assertEqual(self.search('python'), [])
+
+        post.delete()
+        self.assertEqual(self.search('rust'), [])
+
+    def test_drafts_are_not_returned(self):
+        self.create_post('Django draft', status=Post.Status.DRAFT)
+
+        self.assertEqual(self.search('django'), [])
+
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        author = User.objects.create_user('alice', password='pass')
+        for i in range(20):
+            Post.objects.create(
+                title=f'Post {i}', content='Content', author=author,
+                status=Post.Status.PUBLISHED,
+            )
+        self.queryset = Post.objects.filter(status=Post.Status.PUBLISHED)
+        cache.clear()
+        self.expected = list(self.queryset.order_by('-created_at', '-id'))
+
+    def test_walks_forward_and_back_without_gaps(self):
+        paginator = CursorPaginator(self.queryset, 6)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+
+        self.assertEqual([len(page) for page in pages], [6, 6, 6, 2])
+        self.assertEqual([post for page in pages for post in page], self.expected)
+        self.assertFalse(pages[0].has_previous())
+
+        previous = paginator.get_page(pages[-1].previous_cursor)
+        self.assertEqual(list(previous), list(pages[-2]))
+        first = paginator.get_page(pages[1].previous_cursor)
+        self.assertEqual(list(first), list(pages[0]))
+        self.assertFalse(first.has_previous())
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        paginator = CursorPaginator(self.queryset, 6)
+
+        self.assertEqual(list(paginator.get_page('not-a-cursor')), self.expected[:6])
+
+    def test_forged_cursor_values_fall_back_to_first_page(self):
+        category = Category.objects.create(name='Technology')
+        self.queryset.update(category=category)
+        post = self.expected[0]
+        Comment.objects.create(post=post, author=post.author, content='First', is_approved=True)
+        urls = [
+            (reverse('blog:posts'), 'cursor'),
+            (reverse('blog:search_posts') + '?search=Post', 'cursor'),
+            (reverse('blog:category_posts', args=[category.slug]), 'cursor'),
+            (reverse('blog:author_posts', args=[post.author.author_profile.slug]), 'cursor'),
+            (reverse('blog:post_detail', args=[post.slug]), 'comments'),
+            (reverse('blog:post_comments', args=[post.slug]), 'cursor'),
+        ]
+        forged = [
+            ['garbage', 1], [{'a': 1}, 1], [None, None],
+            ['2020-01-01T00:00:00', 'x'], [[1], 1], ['2020-01-01T00:00:00'],
+        ]
+        for values in forged:
+            cursor = encode_cursor(values, 'next')
+            for url, parameter in urls:
+                with self.subTest(values=values, url=url):
+                    response = self.client.get(url, {parameter: cursor})
+                    self.assertEqual(response.status_code, 200)
+
+        paginator = CursorPaginator(self.queryset, 6)
+        page = paginator.get_page(encode_cursor(['garbage', 1], 'next'))
+        self.assertEqual(list(page), self.expected[:6])
+        self.assertFalse(page.has_previous())
+
+    def test_naive_datetime_cursor_is_read_as_aware(self):
+        paginator = CursorPaginator(self.queryset, 6)
+        boundary = self.expected[5]
+        naive = timezone.make_naive(boundary.created_at).isoformat()
+
+        page = paginator.get_page(encode_cursor([naive, boundary.pk], 'next'))
+        self.assertEqual(list(page), self.expected[6:12])
+
+    def test_deep_pages_cost_the_same_queries(self):
+        response = self.client.get(reverse('blog:posts'))
+        cursor = response.context['posts'].next_cursor
+
+        # Conditional GET validator and the page
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('blog:posts'), {'cursor': cursor})
+        self.assertEqual(list(response.context['posts']), self.expected[9:18])
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=300, BLOG_VIEW_COUNT_FLUSH_INTERVAL=0)
+class PageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('alice', password='pass')
+        self.category = Category.objects.create(name='Technology')
+        self.post = Post.objects.create(
+            title='First', content='Content', author=self.author,
+            category=self.category, status=Post.Status.PUBLISHED,
+        )
+        self.other = Post.objects.create(
+            title='Second', content='Content', author=self.author,
+            category=self.category, status=Post.Status.PUBLISHED,
+        )
+
+    def test_anonymous_listing_is_served_from_cache(self):
+        response = self.client.get(reverse('blog:posts'))
+        self.assertIn('Cookie', response['Vary'])
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('blog:posts'))
+
+    def test_post_changes_invalidate_listings(self):
+        self.client.get(reverse('blog:category_posts', args=['technology']))
+
+        Post.objects.create(
+            title='Third', content='Content', author=self.author,
+            category=self.category, status=Post.Status.PUBLISHED,
+        )
+        response = self.client.get(reverse('blog:category_posts', args=['technology']))
+        self.assertContains(response, 'Third')
+
+    def test_comment_only_invalidates_its_post(self):
+        first = reverse('blog:post_detail', args=[self.post.slug])
+        second = reverse('blog:post_detail', args=[self.other.slug])
+        self.client.get(first)
+        self.client.get(second)
+
+        Comment.objects.create(post=self.post, author=self.author, content='Nice post')
+
+        self.assertContains(self.client.get(first), 'Nice post')
+        with self.assertNumQueries(2):
+            # Only the view counter flush (post and author totals) touches the database
+            self.client.get(second)
+
+    def test_cached_detail_still_counts_views(self):
+        for _ in range(3):
+            self.client.get(reverse('blog:post_detail', args=[self.post.slug]))
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 3)
+
+    def test_logged_in_users_bypass_cache(self):
+        self.client.get(reverse('blog:posts'))
+        self.client.force_login(self.author)
+
+        response = self.client.get(reverse('blog:posts'))
+        self.assertContains(response, reverse('blog:my_posts'))
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0, BLOG_VIEW_COUNT_FLUSH_INTERVAL=0)
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('alice', password='pass')
+        self.category = Category.objects.create(name='Technology')
+        self.post = Post.objects.create(
+            title='First', content='Content', author=self.author,
+            category=self.category, status=Post.Status.PUBLISHED,
+        )
+        self.urls = [
+            reverse('blog:post_detail', args=[self.post.slug]),
+            reverse('blog:posts'),
+            reverse('blog:category_posts', args=['technology']),
+            reverse('blog:author_posts', args=['alice']),
+        ]
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def validator_queries(self, url, etag):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        return [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+
+    def test_unchanged_pages_answer_304_from_one_query(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                selects = self.validator_queries(url, response['ETag'])
+                self.assertEqual(len(selects), 1)
+
+        response = self.client.get(self.urls[0])
+        response = self.client.get(self.urls[0], HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_deleted_post_is_not_hidden_by_if_modified_since(self):
+        Post.objects.create(
+            title='Second', content='Content', author=self.author,
+            category=self.category, status=Post.Status.PUBLISHED,
+        )
+        responses = [self.client.get(url) for url in self.urls[1:]]
+        for response in responses:
+            self.assertFalse(response.has_header('Last-Modified'))
+
+        # The newest updated_at of every listing stays the same
+        self.post.delete()
+        for url, response in zip(self.urls[1:], responses):
+            with self.subTest(url=url):
+                since = http_date(timezone.now().timestamp())
+                self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+                self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def post_plan(self, url):
+        [sql] = self.validator_queries(url, self.client.get(url)['ETag'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall() if 'blog_post ' in row[-1]]
+
+    @skipUnless(connection.vendor == 'sqlite', 'reads the SQLite query plan')
+    def test_validator_queries_are_index_only(self):
+        # The detail page reads one row through the unique slug index
+        [step] = self.post_plan(self.urls[0])
+        self.assertIn('(slug=?)', step)
+
+        for url in self.urls[1:]:
+            with self.subTest(url=url):
+                plan = self.post_plan(url)
+                self.assertTrue(plan)
+                self.assertTrue(all('COVERING INDEX' in step for step in plan), plan)
+
+    def test_changes_bust_the_validators(self):
+        responses = [self.client.get(url) for url in self.urls]
+
+        Post.objects.create(
+            title='Second', content='Content', author=self.author,
+            category=self.category, status=Post.Status.PUBLISHED,
+        )
+        for url, response in zip(self.urls[1:], responses[1:]):
+            self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+        Comment.objects.create(post=self.post, author=self.author, content='Nice')
+        self.assertEqual(self.revalidate(self.urls[0], responses[0]).status_code, 200)
+
+    def test_not_modified_detail_still_counts_a_view(self):
+        response = self.client.get(self.urls[0])
+        self.assertEqual(self.revalidate(self.urls[0], response).status_code, 304)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 2)
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=300)
+    def test_cached_pages_answer_304_without_queries(self):
+        response = self.client.get(self.urls[1])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.revalidate(self.urls[1], response).status_code, 304)
+
+
+class PostAdminChangelistTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', password='pass')
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:blog_post_changelist')
+        self.tags = [Tag.objects.create(name=f'tag-{i}') for i in range(3)]
+
+    def create_posts(self, count):
+        for i in range(count):
+            author = User.objects.create(username=f'author-{Post.objects.count()}')
+            post = Post.objects.create(
+                title=f'Post {i}', content='Content', author=author,
+                category=Category.objects.get_or_create(name=f'Category {i % 3}')[0],
+            )
+            post.tags.set(self.tags)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return queries
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.create_posts(2)
+        self.assertEqual(len(self.count_queries(self.url)), 6)
+        self.create_posts(13)
+
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'tag-2', count=15)
+
+    def test_author_and_tag_filters_do_not_enumerate_tables(self):
+        self.create_posts(5)
+        author = User.objects.get(username='author-2')
+        url = f'{self.url}?author__id__exact={author.pk}&tags__id__exact={self.tags[0].pk}'
+
+        queries = [query['sql'] for query in self.count_queries(url)]
+        unbounded = [
+            sql for sql in queries
+            if ('FROM "auth_user"' in sql or 'FROM "blog_tag"' in sql) and 'WHERE' not in sql
+        ]
+        self.assertEqual(unbounded, [])
+        response = self.client.get(url)
+        self.assertContains(response, 'Post 2')
+        self.assertContains(response, 'blog-autocomplete-filter admin-autocomplete', count=2)
+
+    def test_paginator_counts_small_or_filtered_tables_exactly(self):
+        self.create_posts(3)
+        paginator = EstimatedCountPaginator(Post.objects.all(), 15)
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(EstimatedCountPaginator(Post.objects.filter(status='draft'), 15).count, 3)
+
+    @skipUnless(connection.vendor == 'postgresql', 'reads pg_class statistics')
+    def test_paginator_estimates_unfiltered_postgresql_tables(self):
+        self.create_posts(3)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE blog_post')
+        paginator = EstimatedCountPaginator(Post.objects.all(), 15)
+        self.assertEqual(paginator.estimated_count(), 3)
+        self.assertIsNone(EstimatedCountPaginator(Post.objects.filter(status='draft'), 15).estimated_count())
+
+
+@override_settings(BLOG_BULK_CHUNK_SIZE=2, BLOG_BULK_BACKGROUND_THRESHOLD=3)
+class BulkActionTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', password='pass')
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:blog_post_changelist')
+        self.category = Category.objects.create(name='Python')
+        self.author = User.objects.create(username='writer')
+
+    def create_posts(self, count):
+        return [
+            Post.objects.create(title=f'Post {i}', content='Content', author=self.author, category=self.category)
+            for i in range(count)
+        ]
+
+    def run_action(self, action, posts):
+        return self.client.post(self.url, {
+            'action': action, '_selected_action': [post.pk for post in posts],
+        }, follow=True)
+
+    def test_publish_sets_missing_dates_in_chunks(self):
+        posts = self.create_posts(3)
+        dated = timezone.now() - timedelta(days=7)
+        Post.objects.filter(pk=posts[0].pk).update(published_at=dated)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.run_action('make_published', posts)
+        self.assertContains(response, '3 post(s) were successfully published.')
+        updates = [query for query in queries if query['sql'].startswith('UPDATE "blog_post"')]
+        self.assertEqual(len(updates), 2)
+
+        published = {post.pk: post.published_at for post in Post.objects.filter(status='published')}
+        self.assertEqual(published[posts[0].pk], dated)
+        self.assertTrue(all(published.values()))
+        self.assertEqual(len(published), 3)
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.published_post_count, 3)
+        self.assertEqual(AuthorProfile.objects.get(user=self.author).published_post_count, 3)
+
+    def test_large_selection_runs_as_resumable_job(self):
+        posts = self.create_posts(5)
+        response = self.run_action('make_published', posts)
+        job = BulkJob.objects.get()
+        self.assertContains(response, 'follow the progress')
+        self.assertEqual((job.status, job.total, job.processed), (BulkJob.Status.PENDING, 5, 0))
+        self.assertFalse(Post.objects.filter(status='published').exists())
+
+        # A worker died after the first chunk
+        self.assertEqual(job.post_ids, [post.pk for post in posts])
+        bulk.process_chunk(job.operation, Post.objects.filter(pk__in=job.post_ids), size=2)
+        BulkJob.objects.filter(pk=job.pk).update(
+            status=BulkJob.Status.RUNNING, last_pk=posts[1].pk, processed=2,
+            updated_at=timezone.now() - bulk.STALE_AFTER * 2,
+        )
+        with mock.patch.object(bulk, 'process_chunk', wraps=bulk.process_chunk) as process_chunk:
+            call_command('run_bulk_jobs', stdout=StringIO())
+        self.assertEqual([call.args[2] for call in process_chunk.call_args_list], [posts[1].pk, posts[3].pk])
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.progress), (BulkJob.Status.DONE, 5, 100))
+        self.assertEqual(Post.objects.filter(status='published', published_at__isnull=False).count(), 5)
+        self.assertEqual(self.client.get(reverse('admin:blog_bulkjob_change', args=[job.pk])).status_code, 200)
+
+    def test_jobs_run_the_posts_selected_when_they_started(self):
+        posts = self.create_posts(5)
+        job = bulk.create_job(BulkJob.Operation.PUBLISH, Post.objects.all())
+        # A whole chunk deleted, and a post created, after the action
+        Post.objects.filter(pk__in=[posts[0].pk, posts[1].pk]).delete()
+        added = self.create_posts(1)[0]
+
+        self.assertTrue(bulk.run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (BulkJob.Status.DONE, 5))
+        self.assertEqual(Post.objects.filter(status='published').count(), 3)
+        added.refresh_from_db()
+        self.assertEqual(added.status, Post.Status.DRAFT)
+
+    def test_running_jobs_are_not_claimed_twice(self):
+        job = bulk.create_job(BulkJob.Operation.DRAFT, Post.objects.all())
+        self.assertTrue(bulk.claim(job))
+        self.assertFalse(bulk.claim(job))
+        self.assertFalse(bulk.run_job(job))
+
+
+class RelatedPostsTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+        self.tech = Category.objects.create(name='Technology')
+        self.design = Category.objects.create(name='Design')
+        self.django = Tag.objects.create(name='django')
+        self.python = Tag.objects.create(name='python')
+
+    def create_post(self, title, category=None, tags=()):
+        post = Post.objects.create(
+            title=title, content='Content', author=self.author,
+            category=category, status=Post.Status.PUBLISHED,
+        )
+        post.tags.add(*tags)
+        return post
+
+    def test_neighbours_are_ranked_by_tags_category_and_recency(self):
+        post = self.create_post('Main', self.tech, [self.django, self.python])
+        two_tags = self.create_post('Two tags', self.design, [self.django, self.python])
+        one_tag = self.create_post('One tag', self.design, [self.django])
+        same_category = self.create_post('Same category', self.tech)
+        self.create_post('Unrelated', self.design)
+
+        rebuild_related_posts([post])
+        post.refresh_from_db()
+
+        self.assertFalse(post.related_stale)
+        with self.assertNumQueries(1):
+            related = get_related_posts(post)
+        self.assertEqual(related, [two_tags, one_tag, same_category])
+
+    def test_tag_changes_mark_post_stale_for_the_command(self):
+        post = self.create_post('Main', self.tech)
+        other = self.create_post('Other', self.design, [self.python])
+        call_command('rebuild_related_posts', stdout=StringIO())
+        self.assertEqual(get_related_posts(post), [])
+
+        post.tags.add(self.python)
+        post.refresh_from_db()
+        self.assertTrue(post.related_stale)
+
+        call_command('rebuild_related_posts', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(get_related_posts(post), [other])
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=300, BLOG_VIEW_COUNT_FLUSH_INTERVAL=0)
+    def test_neighbour_changes_refresh_the_pages_listing_them(self):
+        cache.clear()
+        post = self.create_post('Main', self.tech, [self.django])
+        neighbour = self.create_post('Neighbour', self.tech, [self.django])
+        rebuild_related_posts([post])
+        url = reverse('blog:post_detail', args=[post.slug])
+        self.assertContains(self.client.get(url), 'Neighbour')
+
+        neighbour.title = 'Renamed neighbour'
+        neighbour.save()
+        self.assertContains(self.client.get(url), 'Renamed neighbour')
+
+        link = reverse('blog:post_detail', args=[neighbour.slug])
+        self.assertContains(self.client.get(url), link)
+        neighbour.delete()
+        self.assertNotContains(self.client.get(url), link)
+
+
+class CounterTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+        self.tech = Category.objects.create(name='Technology')
+        self.design = Category.objects.create(name='Design')
+        self.django = Tag.objects.create(name='django')
+        self.python = Tag.objects.create(name='python')
+        self.post = Post.objects.create(
+            title='Counted', content='Content', author=self.author,
+            category=self.tech, status=Post.Status.PUBLISHED,
+        )
+
+    def assertCounts(self, comments=None, tech=None, design=None, django=None, python=None):
+        expected = {
+            'comments': (comments, Post, self.post, 'comment_count'),
+            'tech': (tech, Category, self.tech, 'published_post_count'),
+            'design': (design, Category, self.design, 'published_post_count'),
+            'django': (django, Tag, self.django, 'post_count'),
+            'python': (python, Tag, self.python, 'post_count'),
+        }
+        for label, (value, model, obj, field) in expected.items():
+            if value is not None:
+                actual = model.objects.values_list(field, flat=True).get(pk=obj.pk)
+                self.assertEqual(actual, value, label)
+
+    def test_comment_count_follows_approval(self):
+        comment = Comment.objects.create(post=self.post, author=self.author, content='Hi')
+        Comment.objects.create(post=self.post, author=self.author, content='Hidden', is_approved=False)
+        self.assertCounts(comments=1)
+
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.is_approved = False
+        comment.save()
+        self.assertCounts(comments=0)
+
+        comment.is_approved = True
+        comment.save()
+        comment.delete()
+        self.assertCounts(comments=0)
+
+    def test_category_count_follows_status_and_category(self):
+        self.assertCounts(tech=1, design=0)
+
+        post = Post.objects.get(pk=self.post.pk)
+        post.category = self.design
+        post.save()
+        self.assertCounts(tech=0, design=1)
+
+        post.status = Post.Status.DRAFT
+        post.save()
+        self.assertCounts(tech=0, design=0)
+
+        post.status = Post.Status.PUBLISHED
+        post.save()
+        post.delete()
+        self.assertCounts(tech=0, design=0)
+
+    def test_tag_count_follows_m2m_changes(self):
+        self.post.tags.add(self.django, self.python)
+        self.post.tags.add(self.django)
+        self.assertCounts(django=1, python=1)
+
+        self.post.tags.remove(self.django, self.django)
+        self.assertCounts(django=0, python=1)
+
+        self.python.posts.add(Post.objects.create(title='Other', content='Content', author=self.author))
+        self.assertCounts(python=2)
+
+        self.post.tags.clear()
+        self.assertCounts(python=1)
+
+        Post.objects.get(title='Other').delete()
+        self.assertCounts(django=0, python=0)
+
+    def test_saving_a_post_keeps_concurrent_counter_updates(self):
+        post = Post.objects.get(pk=self.post.pk)
+        Comment.objects.create(post=self.post, author=self.author, content='Hi')
+
+        post.title = 'Renamed'
+        post.save()
+        self.assertCounts(comments=1)
+
+    def test_recount_repairs_drift(self):
+        self.post.tags.add(self.django)
+        Comment.objects.create(post=self.post, author=self.author, content='Hi')
+        Post.objects.update(comment_count=7)
+        Tag.objects.update(post_count=7)
+        Category.objects.update(published_post_count=7)
+
+        call_command('recount', stdout=StringIO())
+        self.assertCounts(comments=1, tech=1, design=0, django=1, python=0)
+
+
+class PostFormTagTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+        self.client.force_login(self.author)
+        Tag.objects.create(name='django')
+
+    def create_post(self, title, tags):
+        return self.client.post(reverse('blog:post-create'), {
+            'title': title,
+            'content': 'Content',
+            'content_format': Post.ContentFormat.MARKDOWN,
+            'status': Post.Status.PUBLISHED,
+            'new_category': 'Technology',
+            'new_tags': tags,
+        })
+
+    def test_tag_names_are_normalized_and_deduplicated(self):
+        self.assertEqual(
+            parse_tag_names(' django,  web   dev ,django,, '),
+            ['django', 'web dev'],
+        )
+
+    def test_create_attaches_new_and_existing_tags(self):
+        self.create_post('Tagged', 'django, python, python')
+
+        post = Post.objects.get(title='Tagged')
+        self.assertEqual(post.author, self.author)
+        self.assertEqual(post.category.name, 'Technology')
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['django', 'python'])
+        self.assertEqual(Tag.objects.get(name='django').post_count, 1)
+
+    def test_query_count_does_not_grow_with_tags(self):
+        self.create_post('Warm up', 'django')
+
+        with CaptureQueriesContext(connection) as few:
+            self.create_post('Few tags', ', '.join(f'few{i}' for i in range(2)))
+        with CaptureQueriesContext(connection) as many:
+            self.create_post('Many tags', ', '.join(f'many{i}' for i in range(20)))
+
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(Post.objects.get(title='Many tags').tags.count(), 20)
+
+    def test_update_uses_the_same_tag_path(self):
+        self.create_post('Tagged', 'django')
+        post = Post.objects.get(title='Tagged')
+
+        self.client.post(reverse('blog:post-update', args=[post.slug]), {
+            'title': 'Tagged',
+            'content': 'Content',
+            'content_format': Post.ContentFormat.MARKDOWN,
+            'status': Post.Status.PUBLISHED,
+            'tags': [post.tags.get().pk],
+            'new_tags': 'django, orm',
+        })
+
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['django', 'orm'])
+
+
+class ImportExportTests(TestCase):
+
+    def setUp(self):
+        get_search_backend().rebuild()
+
+    def write_fixture(self, lines):
+        path = os.path.join(self.tmpdir, 'posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write('\n'.join(json.dumps(line) for line in lines))
+        return path
+
+    def run(self, result=None):
+        with tempfile.TemporaryDirectory() as self.tmpdir:
+            return super().run(result)
+
+    def test_import_creates_posts_relations_and_counters(self):
+        path = self.write_fixture([
+            {'title': 'First', 'author': 'alice', 'category': 'Technology',
+             'tags': ['django', 'python'], 'status': 'published', 'content': 'About django',
+             'created_at': '2024-01-02T03:04:05+00:00'},
+            {'title': 'Second', 'author': 'bob', 'category': 'Technology', 'tags': ['django']},
+            {'title': 'First', 'author': 'alice'},
+        ])
+
+        call_command('import_posts', path, batch_size=2, stdout=StringIO())
+
+        first = Post.objects.get(slug='first')
+        self.assertEqual(first.author.username, 'alice')
+        self.assertEqual(first.created_at.year, 2024)
+        self.assertEqual(first.published_at, first.created_at)
+        self.assertEqual(sorted(first.tags.values_list('name', flat=True)), ['django', 'python'])
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Tag.objects.get(name='django').post_count, 2)
+        self.assertEqual(Category.objects.get(name='Technology').published_post_count, 1)
+        self.assertEqual(AuthorProfile.objects.get(slug='alice').published_post_count, 1)
+        self.assertEqual(self.search('django'), ['First'])
+
+    def test_imported_dates_leave_auto_now_add_alone(self):
+        field = Post._meta.get_field('created_at')
+        real_bulk_create = Post.objects.bulk_create
+
+        def bulk_create(*args, **kwargs):
+            self.assertTrue(field.auto_now_add)
+            return real_bulk_create(*args, **kwargs)
+
+        start = timezone.now()
+        with mock.patch.object(Post.objects, 'bulk_create', bulk_create):
+            call_command('import_posts', self.write_fixture([
+                {'title': 'Dated', 'author': 'alice', 'created_at': '2024-01-02T03:04:05+00:00'},
+                {'title': 'Undated', 'author': 'alice'},
+            ]), stdout=StringIO())
+
+        self.assertEqual(Post.objects.get(slug='dated').created_at.year, 2024)
+        self.assertGreaterEqual(Post.objects.get(slug='undated').created_at, start)
+
+    def test_invalid_values_stop_the_import(self):
+        for record in [
+            {'title': 'First', 'author': 'alice', 'views_count': 'many'},
+            {'title': 'First', 'author': 'alice', 'views_count': [1]},
+            {'title': 'First', 'author': 'alice', 'is_featured': 'maybe'},
+            {'title': 'First', 'author': 'alice', 'allow_comments': {'a': 1}},
+        ]:
+            with self.subTest(record=record):
+                with self.assertRaisesMessage(CommandError, 'Import stopped: invalid'):
+                    call_command('import_posts', self.write_fixture([record]), stdout=StringIO())
+        self.assertFalse(Post.objects.exists())
+
+    def test_update_policy_overwrites_existing_slugs(self):
+        call_command('import_posts', self.write_fixture([
+            {'title': 'First', 'author': 'alice', 'category': 'Technology',
+             'tags': ['django'], 'status': 'published'},
+        ]), stdout=StringIO())
+
+        call_command('import_posts', self.write_fixture([
+            {'title': 'First', 'author': 'alice', 'category': 'Design',
+             'tags': ['css'], 'status': 'published', 'excerpt': 'Updated'},
+        ]), on_conflict='update', stdout=StringIO())
+
+        post = Post.objects.get(slug='first')
+        self.assertEqual(post.excerpt, 'Updated')
+        self.assertEqual(list(post.tags.values_list('name', flat=True)), ['css'])
+        self.assertEqual(Tag.objects.get(name='django').post_count, 0)
+        self.assertEqual(Category.objects.get(name='Technology').published_post_count, 0)
+        self.assertEqual(Category.objects.get(name='Design').published_post_count, 1)
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=300, BLOG_VIEW_COUNT_FLUSH_INTERVAL=0)
+    def test_update_policy_refreshes_cached_pages(self):
+        cache.clear()
+        call_command('import_posts', self.write_fixture([
+            {'title': 'First', 'author': 'alice', 'status': 'published', 'content': 'Old body'},
+        ]), stdout=StringIO())
+        url = reverse('blog:post_detail', args=['first'])
+        response = self.client.get(url)
+        self.assertContains(response, 'Old body')
+
+        call_command('import_posts', self.write_fixture([
+            {'title': 'First', 'author': 'alice', 'status': 'published', 'content': 'New body'},
+        ]), on_conflict='update', stdout=StringIO())
+
+        self.assertNotEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        response = self.client.get(url)
+        self.assertContains(response, 'New body')
+        self.assertNotContains(response, 'Old body')
+
+    def test_csv_export_round_trips(self):
+        call_command('import_posts', self.write_fixture([
+            {'title': 'First', 'author': 'alice', 'category': 'Technology',
+             'tags': ['django', 'python'], 'status': 'published', 'is_featured': True},
+        ]), stdout=StringIO())
+        path = os.path.join(self.tmpdir, 'posts.csv')
+        call_command('export_posts', path, stderr=StringIO())
+        Post.objects.all().delete()
+
+        call_command('import_posts', path, stdout=StringIO())
+
+        post = Post.objects.get(slug='first')
+        self.assertTrue(post.is_featured)
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['django', 'python'])
+
+    def search(self, query):
+        response = self.client.get(reverse('blog:search_posts'), {'search': query})
+        return [post.title for post in response.context['posts']]
+
+
+class SlugAllocationTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+
+    def test_identical_titles_get_sequential_slugs(self):
+        slugs = [
+            Post.objects.create(title='Same Title', content='Content', author=self.author).slug
+            for _ in range(1000)
+        ]
+
+        self.assertEqual(len(set(slugs)), 1000)
+        self.assertEqual(slugs[:3], ['same-title', 'same-title-2', 'same-title-3'])
+        self.assertEqual(slugs[-1], 'same-title-1000')
+
+    def test_allocation_is_a_single_query(self):
+        Post.objects.create(title='Same Title', content='Content', author=self.author)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(allocate_slug(Post, 'Same Title'), 'same-title-2')
+
+    def test_longer_slugs_sharing_the_prefix_are_not_read(self):
+        for title in ['Same', 'Same 2', 'Same Title', 'Same Title 2', 'Same-2b']:
+            Post.objects.create(title=title, content='Content', author=self.author)
+
+        self.assertEqual(slugs_module._taken_slugs(Post, ['same']), {'same', 'same-2'})
+        self.assertEqual(allocate_slug(Post, 'Same'), 'same-3')
+
+    def test_lost_race_retries_with_a_fresh_slug(self):
+        Post.objects.create(title='Same Title', content='Content', author=self.author)
+
+        # Simulate a writer that allocated before the first insert committed
+        with mock.patch('blog.models.allocate_slug', side_effect=['same-title', 'same-title-2']):
+            post = Post.objects.create(title='Same Title', content='Content', author=self.author)
+
+        self.assertEqual(post.slug, 'same-title-2')
+
+    def test_retries_as_long_as_other_writers_take_the_slug(self):
+        taken = ['same-title'] + [f'same-title-{n}' for n in range(2, 10)]
+        for slug in taken:
+            Post.objects.create(title='Same Title', slug=slug, content='Content', author=self.author)
+
+        # Lost to a committed writer nine times in a row
+        with mock.patch('blog.models.allocate_slug', side_effect=[*taken, 'same-title-10']):
+            post = Post.objects.create(title='Same Title', content='Content', author=self.author)
+
+        self.assertEqual(post.slug, 'same-title-10')
+
+    def test_bulk_allocation_is_unique_within_the_batch(self):
+        Tag.objects.create(name='Django')
+
+        self.assertEqual(
+            allocate_slugs(Tag, ['Django', 'django', 'Python', 'DJANGO']),
+            ['django-2', 'django-3', 'python', 'django-4'],
+        )
+
+    def test_categories_and_tags_use_the_allocator(self):
+        Category.objects.create(name='C++')
+        Tag.objects.create(name='C#')
+
+        self.assertEqual(Category.objects.create(name='C').slug, 'c-2')
+        self.assertEqual(Tag.objects.create(name='C').slug, 'c-2')
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class ScheduledPublishingTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+        self.category = Category.objects.create(name='Python')
+        self.now = timezone.now()
+
+    def schedule(self, title, delay):
+        return Post.objects.create(
+            title=title, content='Content', author=self.author, category=self.category,
+            status=Post.Status.SCHEDULED, published_at=self.now + delay,
+        )
+
+    def test_due_posts_are_published_in_batches(self):
+        due = [self.schedule(f'Due {i}', -timedelta(minutes=i + 1)) for i in range(3)]
+        later = self.schedule('Later', timedelta(hours=1))
+        response = self.client.get(reverse('blog:posts'))
+        self.assertNotContains(response, 'Due 0')
+        self.assertEqual(Category.objects.get().published_post_count, 0)
+
+        # Oldest due first
+        self.assertEqual(promote_due_posts(batch_size=2), [due[2].pk, due[1].pk])
+        self.assertEqual(promote_due_posts(batch_size=2), [due[0].pk])
+        self.assertEqual(promote_due_posts(batch_size=2), [])
+
+        for post in due:
+            post.refresh_from_db()
+            self.assertEqual(post.status, Post.Status.PUBLISHED)
+            self.assertLess(post.published_at, self.now)
+        later.refresh_from_db()
+        self.assertEqual(later.status, Post.Status.SCHEDULED)
+        self.assertEqual(Category.objects.get().published_post_count, 3)
+        self.assertEqual(AuthorProfile.objects.get(user=self.author).published_post_count, 3)
+        response = self.client.get(reverse('blog:posts'))
+        self.assertContains(response, 'Due 0')
+        self.assertNotContains(response, 'Later')
+
+    def test_worker_publishes_what_is_due(self):
+        self.schedule('Due', -timedelta(seconds=1))
+        out = StringIO()
+        call_command('publish_scheduled_posts', '--once', stdout=out)
+        self.assertIn('Done: 1 posts published', out.getvalue())
+
+    def test_scheduling_needs_a_date(self):
+        self.client.force_login(self.author)
+        data = {'title': 'Soon', 'content': 'Content', 'content_format': 'plain', 'status': 'scheduled'}
+        response = self.client.post(reverse('blog:post-create'), data)
+        self.assertIn('published_at', response.context['form'].errors)
+
+        data['published_at'] = (self.now + timedelta(days=1)).strftime('%Y-%m-%dT%H:%M')
+        self.client.post(reverse('blog:post-create'), data)
+        self.assertEqual(Post.objects.get(title='Soon').status, Post.Status.SCHEDULED)
+
+    @skipUnless(connection.vendor == 'sqlite', 'reads the SQLite query plan')
+    def test_due_posts_are_found_through_the_schedule_index(self):
+        sql, params = due_posts().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('blog_post_schedule_idx', plan)
+
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite has no SKIP LOCKED and serializes writers')
+class ScheduledPublishingThroughputTests(TransactionTestCase):
+
+    def test_concurrent_workers_publish_100k_posts_once(self):
+        out = StringIO()
+        call_command('benchmark_scheduling', '--posts', '100000', '--workers', '4', stdout=out)
+        self.assertIn('100000 posts in', out.getvalue())
+        self.assertIn(', 0 published twice, 0 left unpublished', out.getvalue())
+        self.assertFalse(Post.objects.filter(status=Post.Status.SCHEDULED).exists())
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite serializes writers, so there is no race to test')
+class ConcurrentSlugAllocationTests(TransactionTestCase):
+
+    def test_concurrent_identical_titles(self):
+        author = User.objects.create_user('alice', password='pass')
+
+        def create(_):
+            try:
+                return Post.objects.create(title='Same Title', content='Content', author=author).slug
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            slugs = list(pool.map(create, range(1000)))
+
+        self.assertEqual(len(set(slugs)), 1000)
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0, BLOG_ENFORCE_QUERY_BUDGETS=True)
+class QueryProfileTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+
+    def run_view(self, view):
+        request = RequestFactory().get('/')
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = QueryProfileMiddleware(get_response)
+        return middleware(request)
+
+    def test_fingerprint_ignores_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 1 AND name = 'a''b' AND x IN (1, 2, 3)"),
+            fingerprint("SELECT * FROM t WHERE id = 42 AND name = 'c' AND x IN (7)"),
+        )
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('blog:posts'))
+
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries, 0 duplicate", tpl;dur=[\d.]+')
+
+    def test_over_budget_view_raises(self):
+        @query_budget(5, max_duplicates=0)
+        def n_plus_one(request):
+            for post in Post.objects.all():
+                post.author.username
+            return HttpResponse()
+
+        for i in range(3):
+            Post.objects.create(title=f'Post {i}', content='Content', author=self.author)
+
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'repeated query shapes'):
+            self.run_view(n_plus_one)
+
+    def test_within_budget_view_passes(self):
+        @query_budget(1)
+        def single_query(request):
+            list(Post.objects.all())
+            return HttpResponse()
+
+        self.assertEqual(self.run_view(single_query).status_code, 200)
+
+    def test_listings_stay_within_budget(self):
+        for i in range(12):
+            category = Category.objects.create(name=f'Category {i}')
+            post = Post.objects.create(
+                title=f'Post {i}', content='Content', author=self.author, category=category,
+                status=Post.Status.DRAFT if i % 2 else Post.Status.PUBLISHED,
+            )
+            commenter = User.objects.create_user(f'reader{i}', password='pass')
+            Comment.objects.create(post=post, author=commenter, content='Hi', is_approved=True)
+        Comment.objects.filter(post__status=Post.Status.DRAFT).update(post=post)
+
+        self.client.login(username='alice', password='pass')
+        for url in (reverse('blog:my_posts'), reverse('blog:draft_posts'),
+                    reverse('blog:post_detail', args=[post.slug])):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class ThreadedCommentTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('alice', password='pass')
+        self.post = Post.objects.create(
+            title='Threads', content='Content', author=self.author, status=Post.Status.PUBLISHED,
+        )
+
+    def comment(self, parent=None, **kwargs):
+        return Comment.objects.create(
+            post=self.post, author=self.author, content='Hi', parent=parent, **kwargs,
+        )
+
+    def test_page_builds_nested_tree_in_two_queries(self):
+        first = self.comment()
+        reply = self.comment(parent=first)
+        nested = self.comment(parent=reply)
+        second = self.comment()
+        hidden = self.comment(parent=second, is_approved=False)
+        self.comment(parent=hidden)
+
+        with self.assertNumQueries(2):
+            page = get_comment_page(self.post.pk)
+            threads = list(page)
+            authors = [c.author.username for c in threads[1].children[0].children]
+
+        self.assertEqual(threads, [second, first])
+        self.assertEqual(threads[0].children, [])
+        self.assertEqual(threads[1].children, [reply])
+        self.assertEqual(authors, ['alice'])
+        self.assertEqual(nested.root_id, first.pk)
+
+    def test_threads_are_cursor_paginated(self):
+        roots = [self.comment() for _ in range(5)]
+        for root in roots:
+            self.comment(parent=root)
+
+        first = get_comment_page(self.post.pk, per_page=3)
+        second = get_comment_page(self.post.pk, first.next_cursor, per_page=3)
+
+        self.assertEqual(list(first) + list(second), roots[::-1])
+        self.assertFalse(second.has_next())
+        self.assertTrue(all(len(root.children) == 1 for root in second))
+
+    def test_detail_page_and_json_endpoint_render_replies(self):
+        root = self.comment()
+        reply = self.comment(parent=root)
+
+        self.assertContains(self.client.get(reverse('blog:post_detail', args=[self.post.slug])),
+                            f'id="comment-{reply.pk}"')
+        data = self.client.get(reverse('blog:post_comments', args=[self.post.slug])).json()
+
+        self.assertIsNone(data['next_cursor'])
+        self.assertEqual(data['comments'][0]['id'], root.pk)
+        self.assertEqual(len(data['comments'][0]['replies']), 1)
+
+    def test_reply_to_another_posts_comment_is_rejected(self):
+        other = Post.objects.create(title='Other', content='Content', author=self.author)
+        foreign = Comment.objects.create(post=other, author=self.author, content='Hi')
+        self.client.login(username='alice', password='pass')
+
+        self.client.post(reverse('blog:add_comment', args=[self.post.slug]),
+                         {'content': 'Reply', 'parent': foreign.pk})
+        self.client.post(reverse('blog:add_comment', args=[other.slug]),
+                         {'content': 'Reply', 'parent': foreign.pk})
+
+        self.assertFalse(self.post.comments.exists())
+        self.assertEqual(foreign.replies.get().root_id, foreign.pk)
+
+
+class ConnectionStatsTests(TestCase):
+
+    def test_endpoint_is_staff_only(self):
+        User.objects.create_user('alice', password='pass')
+        self.client.login(username='alice', password='pass')
+
+        response = self.client.get(reverse('blog:connection_stats'))
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_reports_settings_and_new_connections(self):
+        User.objects.create_user('admin', password='pass', is_staff=True)
+        self.client.login(username='admin', password='pass')
+        before = self.client.get(reverse('blog:connection_stats')).json()['default']['opened']
+
+        connection_created.send(sender=connection.__class__, connection=connection)
+        stats = self.client.get(reverse('blog:connection_stats')).json()['default']
+
+        self.assertEqual(stats['opened'], before + 1)
+        self.assertEqual(stats['conn_max_age'], connection.settings_dict['CONN_MAX_AGE'])
+        self.assertFalse(stats['pooled'])
+        self.assertIsNone(stats['pool'])
+
+
+class ReplicaRouterTests(TestCase):
+
+    def read_alias(self, request):
+        return read_from_replica(lambda request: ReplicaRouter().db_for_read(Post))(request)
+
+    @override_settings(BLOG_READ_REPLICA='replica')
+    def test_only_decorated_reads_use_the_replica(self):
+        request = RequestFactory().get('/')
+
+        self.assertEqual(self.read_alias(request), 'replica')
+        self.assertIsNone(ReplicaRouter().db_for_read(Post))
+        self.assertEqual(ReplicaRouter().db_for_write(Post), 'default')
+
+    @override_settings(BLOG_READ_REPLICA='replica')
+    def test_pinned_clients_read_from_the_primary(self):
+        request = RequestFactory().get('/', HTTP_COOKIE=f'{PIN_COOKIE}=1')
+
+        self.assertIsNone(self.read_alias(request))
+
+    def test_no_replica_configured(self):
+        self.assertIsNone(self.read_alias(RequestFactory().get('/')))
+
+    @override_settings(BLOG_READ_REPLICA=None, BLOG_PAGE_CACHE_TIMEOUT=0)
+    def test_views_use_the_primary_without_a_replica(self):
+        author = User.objects.create(username='alice')
+        Post.objects.create(title='Primary Title', content='Content', author=author, status=Post.Status.PUBLISHED)
+
+        self.assertContains(self.client.get(reverse('blog:posts')), 'Primary Title')
+        response = self.client.post(reverse('blog:contact'), {
+            'name': 'Bob', 'email': 'bob@example.com', 'subject': 'Hi', 'message': 'Hello',
+        })
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+# The test settings provide a separate, empty "replica" database
+@override_settings(BLOG_READ_REPLICA='replica', BLOG_PAGE_CACHE_TIMEOUT=0)
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        # Same rows on both sides, different titles, to see where reads go
+        for alias, title in (('default', 'Primary Title'), ('replica', 'Replica Title')):
+            author = User(pk=1, username='alice')
+            author.save(using=alias)
+            Post(pk=1, title=title, slug='post', content='Content', author=author,
+                 status=Post.Status.PUBLISHED, is_featured=True).save(using=alias)
+
+    def test_read_views_use_the_replica(self):
+        self.assertContains(self.client.get(reverse('blog:home')), 'Replica Title')
+        self.assertContains(self.client.get(reverse('blog:posts')), 'Replica Title')
+        self.assertContains(self.client.get(reverse('blog:post_detail', args=['post'])), 'Replica Title')
+
+    def test_writes_go_to_primary_and_pin_the_client(self):
+        response = self.client.post(reverse('blog:contact'), {
+            'name': 'Bob', 'email': 'bob@example.com', 'subject': 'Hi', 'message': 'Hello',
+        })
+
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertContains(self.client.get(reverse('blog:posts')), 'Primary Title')
+
+    def test_new_posts_are_written_to_the_primary(self):
+        Post.objects.create(title='Fresh', content='Content', author_id=1)
+
+        self.assertTrue(Post.objects.using('default').filter(title='Fresh').exists())
+        self.assertFalse(Post.objects.using('replica').filter(title='Fresh').exists())
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class AsyncViewTests(TestCase):
+
+    def setUp(self):
+        author = User.objects.create_user('alice', password='pass')
+        category = Category.objects.create(name='Tech')
+        self.post = Post.objects.create(
+            title='Async Django', content='Served over ASGI', author=author,
+            category=category, status=Post.Status.PUBLISHED, is_featured=True,
+        )
+        Comment.objects.create(post=self.post, author=author, content='Nice one')
+
+    async def test_read_views_render_under_asgi(self):
+        client = AsyncClient()
+        for url, text in (
+            (reverse('blog:home'), 'Async Django'),
+            (reverse('blog:posts'), 'Async Django'),
+            (reverse('blog:post_detail', args=[self.post.slug]), 'Nice one'),
+            (reverse('blog:category_posts', args=['tech']), 'Async Django'),
+            (reverse('blog:search_posts') + '?search=asgi', 'Async Django'),
+        ):
+            with self.subTest(url=url):
+                response = await client.get(url)
+                self.assertContains(response, text)
+                self.assertNotIn('"0 queries', response['Server-Timing'])
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class AuthorProfileTests(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', password='pass')
+        self.bob = User.objects.create_user('bob', password='pass')
+
+    def create_post(self, title, author=None, **kwargs):
+        kwargs.setdefault('status', Post.Status.PUBLISHED)
+        return Post.objects.create(title=title, content='Content', author=author or self.alice, **kwargs)
+
+    def stats(self, user):
+        profile = AuthorProfile.objects.get(user=user)
+        return profile.published_post_count, profile.total_views, profile.latest_published_at
+
+    def assert_matches_recount(self):
+        before = {user: self.stats(user) for user in (self.alice, self.bob)}
+        recount_authors()
+        self.assertEqual(before, {user: self.stats(user) for user in (self.alice, self.bob)})
+
+    def test_profiles_get_unique_slugs(self):
+        other = User.objects.create_user('Alice', password='pass')
+
+        self.assertEqual(self.alice.author_profile.slug, 'alice')
+        self.assertEqual(other.author_profile.slug, 'alice-2')
+
+    def test_signals_keep_stats_in_sync(self):
+        first = self.create_post('First')
+        second = self.create_post('Second')
+        draft = self.create_post('Draft', status=Post.Status.DRAFT)
+        counter = ViewCounter()
+        for _ in range(7):
+            counter.record(first.pk)
+        counter.flush()
+        first.refresh_from_db()
+        self.assertEqual(self.stats(self.alice)[:2], (2, 7))
+        self.assertEqual(self.stats(self.alice)[2], second.published_at)
+
+        second.status = Post.Status.DRAFT
+        second.save()
+        self.assertEqual(self.stats(self.alice)[2], first.published_at)
+
+        first.author = self.bob
+        first.save()
+        draft.status = Post.Status.PUBLISHED
+        draft.save()
+        self.assertEqual(self.stats(self.bob)[:2], (1, 7))
+        self.assertEqual(self.stats(self.alice)[0], 1)
+        self.assert_matches_recount()
+
+        first.delete()
+        self.assertEqual(self.stats(self.bob), (0, 0, None))
+        self.assert_matches_recount()
+
+    def test_author_posts_by_slug_are_cursor_paginated(self):
+        for i in range(12):
+            self.create_post(f'Post {i}')
+        self.create_post('Bob post', author=self.bob)
+
+        url = reverse('blog:author_posts', args=['alice'])
+        first = self.client.get(url)
+        second = self.client.get(url, {'cursor': first.context['posts'].next_cursor})
+
+        self.assertEqual(first.context['total_posts'], 12)
+        self.assertEqual(len(first.context['posts']) + len(second.context['posts']), 12)
+        self.assertNotContains(first, 'Bob post')
+        self.assertEqual(self.client.get(reverse('blog:author_posts', args=['nobody'])).status_code, 404)
+
+    def test_old_name_based_author_urls_redirect_to_the_slug(self):
+        carol = User.objects.create_user('Carol Ann', password='pass')
+
+        response = self.client.get('/author/Carol-Ann/')
+        self.assertRedirects(
+            response, reverse('blog:author_posts', args=[carol.author_profile.slug]), status_code=301
+        )
+        response = self.client.get('/author/Bob/')
+        self.assertRedirects(response, reverse('blog:author_posts', args=['bob']), status_code=301)
+        self.assertEqual(self.client.get('/author/Nobody/').status_code, 404)
+
+    def test_leaderboard_reads_materialized_stats(self):
+        self.create_post('One')
+        popular = self.create_post('Two', author=self.bob)
+        self.create_post('Three')
+        Post.objects.filter(pk=popular.pk).update(views_count=50)
+        recount_authors()
+
+        by_posts = self.client.get(reverse('blog:authors')).context['authors']
+        by_views = self.client.get(reverse('blog:authors'), {'order': 'views'}).context['authors']
+
+        self.assertEqual([profile.username for profile in by_posts], ['alice', 'bob'])
+        self.assertEqual([profile.username for profile in by_views], ['bob', 'alice'])
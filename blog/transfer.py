@@ -0,0 +1,382 @@
+"""
+Streaming import/export of posts as JSON Lines or CSV.
+
+Records flow through generators (read -> normalize -> batch) so memory
+stays constant, and every batch is written with a handful of set-based
+queries: one lookup per related model, ``bulk_create`` for posts and the
+post-tag through table, and ``F()`` counter increments.
+"""
+import csv
+import json
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from .authors import ensure_profiles, recount_authors
+from .cache import category_tag, invalidate_post_cards, invalidate_tags, post_tag
+from .counters import recount_categories, recount_tags
+from .models import Category, Post, PostArchive, Tag
+from .related import invalidate_neighbour_pages
+from .rendering import RENDERED_FIELDS, render_post
+from .search import get_search_backend
+from .slugs import allocate_slugs
+from .tagging import parse_tag_names, resolve_by_name
+
+FORMATS = ('jsonl', 'csv')
+
+FIELDS = (
+    'title', 'slug', 'excerpt', 'content', 'content_format', 'status', 'is_featured', 'allow_comments',
+    'read_time', 'views_count', 'author', 'category', 'tags', 'created_at', 'published_at',
+)
+
+# Post columns copied from a record as-is when importing; read_time is
+# exported for reference but recomputed by rendering
+SCALAR_FIELDS = (
+    'title', 'excerpt', 'content', 'content_format', 'status', 'is_featured', 'allow_comments',
+    'views_count', 'published_at',
+)
+
+SLUG_MAX_LENGTH = Post._meta.get_field('slug').max_length
+
+
+class RecordError(ValueError):
+    """A record that cannot be imported."""
+
+
+def post_to_record(post):
+    return {
+        'title': post.title,
+        'slug': post.slug,
+        'excerpt': post.excerpt,
+        'content': post.archive.content if post.content_archived else post.content,
+        'content_format': post.content_format,
+        'status': post.status,
+        'is_featured': post.is_featured,
+        'allow_comments': post.allow_comments,
+        'read_time': post.read_time,
+        'views_count': post.views_count,
+        'author': post.author.username,
+        'category': post.category.name if post.category else '',
+        'tags': [tag.name for tag in post.tags.all()],
+        'created_at': post.created_at.isoformat(),
+        'published_at': post.published_at.isoformat() if post.published_at else '',
+    }
+
+
+def write_records(records, stream, fmt):
+    """Write ``records`` to ``stream``; yields after each record for progress reporting."""
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow({**record, 'tags': ', '.join(record['tags'])})
+            yield record
+    else:
+        for record in records:
+            stream.write(json.dumps(record, ensure_ascii=False))
+            stream.write('\n')
+            yield record
+
+
+def read_records(stream, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line_number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as exc:
+                    raise RecordError(f'line {line_number}: {exc}')
+
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+def _bool(value, default):
+    if value is None or value == '':
+        return default
+    if isinstance(value, str) and value.strip().lower() in TRUE_VALUES + FALSE_VALUES:
+        return value.strip().lower() in TRUE_VALUES
+    if isinstance(value, (bool, int)) and value in (0, 1):
+        return bool(value)
+    raise RecordError(f'invalid boolean {value!r}')
+
+
+def _int(value, default):
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RecordError(f'invalid integer {value!r}')
+
+
+def _datetime(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value) if isinstance(value, str) else value
+    if parsed is None:
+        raise RecordError(f'invalid datetime {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def normalize_record(record):
+    """Validate one raw record and convert it to Python values."""
+    title = (record.get('title') or '').strip()
+    author = (record.get('author') or '').strip()
+    if not title or not author:
+        raise RecordError('records need a title and an author')
+
+    status = record.get('status') or Post.Status.DRAFT
+    if status not in Post.Status.values:
+        raise RecordError(f'unknown status {status!r}')
+
+    content_format = record.get('content_format') or Post.ContentFormat.PLAIN
+    if content_format not in Post.ContentFormat.values:
+        raise RecordError(f'unknown content format {content_format!r}')
+
+    tags = record.get('tags') or []
+    if isinstance(tags, str):
+        tags = [tags]
+
+    published_at = _datetime(record.get('published_at'))
+    if status == Post.Status.SCHEDULED and not published_at:
+        raise RecordError('scheduled posts need a published_at')
+
+    return {
+        'title': title[:200],
+        'slug': slugify(record.get('slug') or title, allow_unicode=True)[:SLUG_MAX_LENGTH] or 'post',
+        'excerpt': record.get('excerpt') or '',
+        'content': record.get('content') or '',
+        'content_format': content_format,
+        'status': status,
+        'is_featured': _bool(record.get('is_featured'), False),
+        'allow_comments': _bool(record.get('allow_comments'), True),
+        'views_count': _int(record.get('views_count'), 0),
+        'author': author,
+        'category': (record.get('category') or '').strip(),
+        'tags': parse_tag_names(','.join(tags)),
+        'created_at': _datetime(record.get('created_at')),
+        'published_at': published_at,
+    }
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class PostImporter:
+    """
+    Import normalized records batch by batch.
+
+    ``on_conflict`` decides what happens to a record whose slug already
+    exists (in the database or earlier in the input): ``skip`` it,
+    ``update`` the existing post, or ``rename`` it to the next free slug.
+    """
+
+    CONFLICT_POLICIES = ('skip', 'update', 'rename')
+
+    def __init__(self, on_conflict='skip'):
+        if on_conflict not in self.CONFLICT_POLICIES:
+            raise ValueError(f'on_conflict must be one of {self.CONFLICT_POLICIES}')
+        self.on_conflict = on_conflict
+        self.unusable_password = make_password(None)
+        self.stats = Counter()
+        self.category_ids = set()
+
+    def import_records(self, records, batch_size=1000):
+        """Import an iterable of raw records; yields running stats after each batch."""
+        for batch in batched(map(normalize_record, records), batch_size):
+            with transaction.atomic():
+                updated, category_ids = self.import_batch(batch)
+            if updated:
+                # After the commit, so no request caches the old rows again
+                self._refresh_pages(updated, category_ids)
+            yield self.stats
+
+    def import_batch(self, batch):
+        if self.on_conflict == 'rename':
+            batch = self._rename(batch)
+        else:
+            batch = self._dedupe(batch)
+        authors = self._authors({record['author'] for record in batch})
+        categories = self._by_name(Category, {record['category'] for record in batch} - {''})
+        tags = self._by_name(Tag, {name for record in batch for name in record['tags']})
+
+        existing = dict(
+            Post.objects.filter(slug__in=[record['slug'] for record in batch]).values_list('slug', 'pk')
+        )
+        new_records = [record for record in batch if record['slug'] not in existing]
+        old_records = [record for record in batch if record['slug'] in existing]
+
+        created = self._create(new_records, authors, categories, tags)
+        self.stats['created'] += len(created)
+        updated, category_ids = [], set()
+        if self.on_conflict == 'update' and old_records:
+            updated, category_ids = self._update(old_records, existing, authors, categories, tags)
+            self.stats['updated'] += len(old_records)
+        else:
+            self.stats['skipped'] += len(old_records)
+
+        self.category_ids.update(category.pk for category in categories.values())
+        get_search_backend().index_posts([post.pk for post in created])
+        return updated, category_ids
+
+    @staticmethod
+    def _refresh_pages(posts, category_ids):
+        """Drop the cached pages and cards showing the updated ``posts``."""
+        category_slugs = Category.objects.filter(pk__in=category_ids).values_list('slug', flat=True)
+        invalidate_tags(
+            *(post_tag(post.slug) for post in posts),
+            *(category_tag(slug) for slug in category_slugs),
+        )
+        invalidate_post_cards([post.pk for post in posts])
+        invalidate_neighbour_pages([post.pk for post in posts])
+
+    def _dedupe(self, batch):
+        seen = {}
+        for record in batch:
+            if record['slug'] in seen:
+                self.stats['skipped'] += 1
+                if self.on_conflict == 'update':
+                    seen[record['slug']] = record
+            else:
+                seen[record['slug']] = record
+        return list(seen.values())
+
+    def _rename(self, batch):
+        existing = set(
+            Post.objects.filter(slug__in=[record['slug'] for record in batch]).values_list('slug', flat=True)
+        )
+        kept, conflicting = set(), []
+        for record in batch:
+            if record['slug'] in existing or record['slug'] in kept:
+                conflicting.append(record)
+            else:
+                kept.add(record['slug'])
+        slugs = allocate_slugs(Post, [record['slug'] for record in conflicting], reserved=kept)
+        for record, slug in zip(conflicting, slugs):
+            record['slug'] = slug
+        self.stats['renamed'] += len(conflicting)
+        return batch
+
+    def _authors(self, usernames):
+        users = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+        missing = usernames - users.keys()
+        if missing:
+            User.objects.bulk_create(
+                [User(username=name, password=self.unusable_password) for name in missing],
+                ignore_conflicts=True,
+            )
+            users.update(User.objects.filter(username__in=missing).values_list('username', 'pk'))
+            # bulk_create skipped the signal that creates profiles
+            ensure_profiles(users.values())
+        return users
+
+    @staticmethod
+    def _by_name(model, names):
+        return {row.name: row for row in resolve_by_name(model, sorted(names))}
+
+    def _build(self, record, authors, categories):
+        category = categories.get(record['category'])
+        post = Post(
+            slug=record['slug'],
+            author_id=authors[record['author']],
+            category_id=category.pk if category else None,
+            **{field: record[field] for field in SCALAR_FIELDS},
+        )
+        # Post.save() is bypassed, so apply its publish-date rule and rendering here
+        if post.status == Post.Status.PUBLISHED and not post.published_at:
+            post.published_at = record['created_at'] or timezone.now()
+        return render_post(post)
+
+    def _create(self, records, authors, categories, tags):
+        posts = Post.objects.bulk_create([self._build(record, authors, categories) for record in records])
+        # auto_now_add stamps the insert, so imported dates are written after it
+        dated = []
+        for post, record in zip(posts, records):
+            if record['created_at']:
+                post.created_at = record['created_at']
+                dated.append(post)
+        if dated:
+            Post.objects.bulk_update(dated, ['created_at'])
+
+        self._link_tags(posts, records, tags)
+
+        tag_counts = Counter(tags[name].pk for record in records for name in record['tags'])
+        self._increment(Tag, 'post_count', tag_counts)
+        self._increment(Category, 'published_post_count', Counter(
+            post.category_id for post in posts
+            if post.category_id and post.status == Post.Status.PUBLISHED
+        ))
+        recount_authors({post.author_id for post in posts})
+        return posts
+
+    def _update(self, records, existing, authors, categories, tags):
+        """Overwrite existing posts; returns them and the categories they left or joined."""
+        now = timezone.now()
+        posts = []
+        for record in records:
+            post = self._build(record, authors, categories)
+            post.pk = existing[record['slug']]
+            post.related_stale = True
+            # bulk_update skips auto_now; updated_at feeds the ETags
+            post.updated_at = now
+            posts.append(post)
+
+        old_categories = set(
+            Post.objects.filter(pk__in=[post.pk for post in posts]).values_list('category_id', flat=True)
+        )
+        old_authors = set(
+            Post.objects.filter(pk__in=[post.pk for post in posts]).values_list('author_id', flat=True)
+        )
+        old_tags = set(
+            Post.tags.through.objects.filter(post_id__in=[post.pk for post in posts]).values_list('tag_id', flat=True)
+        )
+        # The imported content replaces any archived copy
+        Post.objects.bulk_update(
+            posts,
+            [*SCALAR_FIELDS, *RENDERED_FIELDS, 'author', 'category', 'related_stale', 'content_archived', 'updated_at'],
+        )
+        PostArchive.objects.filter(post_id__in=[post.pk for post in posts]).delete()
+        Post.tags.through.objects.filter(post_id__in=[post.pk for post in posts]).delete()
+        self._link_tags(posts, records, tags)
+
+        recount_tags(old_tags | {tags[name].pk for record in records for name in record['tags']})
+        recount_categories((old_categories | {post.category_id for post in posts}) - {None})
+        recount_authors(old_authors | {post.author_id for post in posts})
+        get_search_backend().index_posts([post.pk for post in posts])
+        return posts, (old_categories | {post.category_id for post in posts}) - {None}
+
+    @staticmethod
+    def _link_tags(posts, records, tags):
+        through = Post.tags.through
+        through.objects.bulk_create(
+            [
+                through(post_id=post.pk, tag_id=tags[name].pk)
+                for post, record in zip(posts, records)
+                for name in record['tags']
+            ],
+            ignore_conflicts=True,
+        )
+
+    @staticmethod
+    def _increment(model, field, counts):
+        by_increment = defaultdict(list)
+        for pk, count in counts.items():
+            by_increment[count].append(pk)
+        for count, pks in by_increment.items():
+            model.objects.filter(pk__in=pks).update(**{field: F(field) + count})
@@ -25,9 +25,12 @@ urlpatterns = [
     path('post/create/', views.post_create, name='post-create'),
     path("post/<str:slug>/", views.post_detail, name="post_detail"),
 
-    path("category/<str:category_name>/", views.category_posts, name="category_posts"),
+    path("category/<str:slug>/", views.category_posts, name="category_posts"),
     path("search/", views.search_posts, name="search_posts"),
-    path("author/<str:author_name>/", views.author_posts, name="author_posts"),
+    path("author/<str:slug>/", views.author_posts, name="author_posts"),
+    path("authors/", views.authors, name="authors"),
     path("post/<slug:slug>/comment/", views.add_comment, name='add_comment'),
+    path("post/<slug:slug>/comments/", views.post_comments, name='post_comments'),
     path("comment/<int:comment_id>/delete/", views.delete_comment, name='delete_comment'),
+    path("stats/connections/", views.connection_stats, name='connection_stats'),
 ]
@@ -0,0 +1,107 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction, DatabaseError
+from django.db.models import F
+
+from .authors import add_views
+from .models import Post
+
+logger = logging.getLogger(__name__)
+DEFAULT_FLUSH_INTERVAL = 10
+
+
+def get_flush_interval():
+    """Maximum number of seconds a buffered view may wait before hitting the database."""
+    return getattr(settings, 'BLOG_VIEW_COUNT_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+
+
+class ViewCounter:
+    """
+    Write-behind buffer for ``Post.views_count``.
+
+    Views are counted in memory and written in batches with atomic
+    ``F('views_count') + n`` updates, so concurrent requests never lose
+    increments and a page view does not cost an UPDATE.
+    """
+
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def record(self, post_id):
+        with self._lock:
+            self._pending[post_id] += 1
+        if get_flush_interval() <= 0:
+            self.flush()
+        else:
+            self._ensure_worker()
+
+    def pending(self, post_id):
+        with self._lock:
+            return self._pending[post_id]
+
+    def flush(self):
+        """
+        Write every buffered increment: per distinct increment size, one
+        UPDATE of the posts and one of their authors' total views.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+
+        by_increment = defaultdict(list)
+        for post_id, count in pending.items():
+            by_increment[count].append(post_id)
+
+        groups = list(by_increment.items())
+        for index, (count, post_ids) in enumerate(groups):
+            try:
+                # Post and author totals move together
+                with transaction.atomic(savepoint=False):
+                    Post.objects.filter(id__in=post_ids).update(
+                        views_count=F('views_count') + count
+                    )
+                    add_views(post_ids, count)
+            except DatabaseError:
+                # Put this group and the unwritten ones back so the next flush retries them
+                with self._lock:
+                    for count, post_ids in groups[index:]:
+                        for post_id in post_ids:
+                            self._pending[post_id] += count
+                raise
+        return sum(pending.values())
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='blog-view-counter', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(max(get_flush_interval(), 1))
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush buffered view counts')
+            finally:
+                connections.close_all()
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.flush)
+
+
+def record_view(post):
+    """Count a view of ``post`` and reflect it on the instance being rendered."""
+    view_counter.record(post.pk)
+    post.views_count += view_counter.pending(post.pk)
@@ -1,43 +1,76 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
 from django.contrib.auth.views import LoginView as DjangoLoginView, LogoutView
-from django.shortcuts import render, redirect, get_object_or_404
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
+from django.db.models import Max, Q
+from django.http import Http404, JsonResponse
 from django.urls import reverse_lazy
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import ListView, CreateView
-from .models import Post, Category, Tag , Comment
-
+from .models import AuthorProfile, Post, Category, Tag , Comment
+
+from .archive import aload_archived_content, load_archived_content
+from .authors import LEADERBOARD_ORDERINGS, leaderboard
+from .cache import cache_anonymous_page, category_tag, post_tag
+from .comments import aget_comment_page, get_comment_page, serialize_comment
+from .conditional import conditional_page
+from .db_stats import connection_stats as get_connection_stats
 from .forms import PostForm, RegisterForm, CommentForm
+from .pagination import CursorPaginator, count_cache_key
+from .profiling import query_budget
+from .related import get_related_posts
+from .routers import read_from_replica
+from .search import SEARCH_ORDERING, get_search_backend
+from .stats import get_homepage_stats
+from .view_counter import record_view, view_counter
 
-from django.db.models import Q
 from datetime import datetime
 
 
 # Create your views here.
 
 
-def home(request):
-    posts = Post.objects.filter(
-        status=Post.Status.PUBLISHED
-    ).select_related('author', 'category').prefetch_related('tags')
+async def fetch(queryset):
+    """Evaluate a queryset with the async ORM."""
+    return [obj async for obj in queryset]
 
+
+# The read-heavy views (home, posts, post_detail, category_posts and
+# search_posts) are async: under ASGI they do not hold a worker thread while
+# waiting, and their independent lookups are awaited together. Templates may
+# still touch the database lazily, so they are rendered through sync_to_async.
+arender = sync_to_async(render)
+
+
+@query_budget(6, max_duplicates=0)
+@read_from_replica
+@cache_anonymous_page(tags=lambda: ['posts'])
+async def home(request):
     featured_posts = Post.objects.filter(
         status=Post.Status.PUBLISHED,
         is_featured=True
-    )[:4]
+    ).for_listing()[:4]
 
-    all_categories = [post.category.name for post in posts]
+    featured_posts, stats = await asyncio.gather(
+        fetch(featured_posts),
+        sync_to_async(get_homepage_stats)(),
+    )
 
-    unique_categories = list(set(all_categories))[:6]
     context = {
         'site_name': 'BlogHub',
         'tagline': 'Your Platform for Sharing Ideas',
-        'total_posts': len(posts),
-        'total_authors': len(set(post.author for post in posts)),
+        'total_posts': stats['total_posts'],
+        'total_authors': stats['total_authors'],
         'current_year': datetime.now().year,
-        'featured_topics': unique_categories,
+        'featured_topics': stats['featured_topics'],
         'features': [
             {'icon': '✍️', 'title': 'Easy Publishing',
              'description': 'Write and publish posts effortlessly'},
@@ -53,7 +86,7 @@ def home(request):
         'featured_posts': featured_posts,
     }
 
-    return render(request, 'blog/home.html', context)
+    return await arender(request, 'blog/home.html', context)
 
 
 def about(request):
@@ -69,54 +102,46 @@ def about(request):
     return render(request, 'blog/about.html', context)
 
 
-def posts(request):
+def latest_published(**filters):
+    """Newest ``updated_at`` of the published posts matching ``filters``."""
+    return Post.objects.filter(status=Post.Status.PUBLISHED, **filters).aggregate(updated_at=Max('updated_at'))
+
+
+@query_budget(6, max_duplicates=0)
+@read_from_replica
+@cache_anonymous_page(tags=lambda: ['posts'])
+@conditional_page(latest=latest_published, tags=lambda: ['posts'], last_modified=False)
+async def posts(request):
     posts_queryset = Post.objects.filter(
         status=Post.Status.PUBLISHED
-    ).select_related('author', 'category').prefetch_related('tags').order_by('-created_at')
+    ).for_listing().order_by('-created_at')
 
-    # Pagination
-    paginator = Paginator(posts_queryset, 9)  # Show 10 posts per page
-    page_number = request.GET.get('page')  # /posts/?page=2
-    posts = paginator.get_page(page_number)
+    # Keyset pagination, 9 posts per page: /posts/?cursor=<opaque>
+    paginator = CursorPaginator(posts_queryset, 9, ordering=('-created_at', '-id'))
+    posts, stats = await asyncio.gather(
+        paginator.aget_page(request.GET.get('cursor')),
+        sync_to_async(get_homepage_stats)(),
+    )
 
     context = {
         'page_title': 'All Blog Posts',
         'current_year': datetime.now().year,
         'posts': posts,
-        'total_posts': posts_queryset.count(),
+        'total_posts': stats['total_posts'],
     }
 
-    return render(request, 'blog/posts.html', context)
+    return await arender(request, 'blog/posts.html', context)
 
 
 @login_required(login_url='/login/')
 def post_create(request):
     """Create a new post"""
     if request.method == 'POST':
-        # Form submitted
-        form = PostForm(request.POST)
+        # Form submitted; the author is set before the single save
+        form = PostForm(request.POST, instance=Post(author=request.user))
         if form.is_valid():
-            # Save but don't commit to database yet
-            post = form.save(commit=False)
-            # Set the author to current user
-            post.author = request.user
-            # Now save to database
-            post.save()
-            # Save many-to-many relationships (tags)
-            form.save_m2m()
-
-            new_cat = form.cleaned_data.get('new_category')
-            if new_cat:
-                category_obj, _ = Category.objects.get_or_create(name=new_cat)
-                post.category = category_obj
-                post.save()
-
-            new_tags = form.cleaned_data.get('new_tags')
-            if new_tags:
-                tag_names = [t.strip() for t in new_tags.split(',')]
-                for name in tag_names:
-                    tag_obj, _ = Tag.objects.get_or_create(name=name)
-                    post.tags.add(tag_obj)
+            # Saves the post, its new category and tags in one transaction
+            post = form.save()
 
             # Show success message
             messages.success(request, 'Post created successfully!')
@@ -139,7 +164,7 @@ def post_create(request):
 def post_update(request, slug):
     """Update an existing post"""
     # Get the post
-    post = get_object_or_404(Post, slug=slug)
+    post = load_archived_content(get_object_or_404(Post, slug=slug))
 
     # Check if user is the author
     if post.author != request.user:
@@ -185,21 +210,44 @@ def post_delete(request, slug):
     return render(request, 'blog/post_detail.html', context)
 
 
-def post_detail(request, slug):
-    post = get_object_or_404(
-        Post.objects.select_related('author', 'category').prefetch_related('tags'),
-        slug=slug,
-    )
+def count_cached_view(request, response, slug):
+    view_counter.record(response.post_id)
 
-    post.views_count += 1
-    post.save(update_fields=['views_count'])
 
-    related_posts = Post.objects.filter(
-        category=post.category,
-        status=Post.Status.PUBLISHED
-    ).exclude(id=post.id)[:3]
+def count_not_modified_view(request, post, slug):
+    view_counter.record(post['pk'])
 
-    comments = post.comments.filter(is_approved=True)
+
+async def related_posts_unless_cached(post):
+    # Skip the query when the template will serve the related-posts fragment
+    # from cache; the lazy fallback covers the fragment expiring meanwhile.
+    if await cache.ahas_key(make_template_fragment_key('related_posts', [post.pk])):
+        return SimpleLazyObject(lambda: get_related_posts(post))
+    return await sync_to_async(get_related_posts)(post)
+
+
+@query_budget(10, max_duplicates=0)
+@read_from_replica
+@cache_anonymous_page(tags=lambda slug: [post_tag(slug)], on_hit=count_cached_view)
+@conditional_page(
+    # Comment changes touch the post's updated_at
+    latest=lambda slug: Post.objects.filter(slug=slug).order_by().values('pk', 'updated_at').first(),
+    tags=lambda slug: [post_tag(slug)],
+    on_not_modified=count_not_modified_view,
+)
+async def post_detail(request, slug):
+    post = await aget_object_or_404(
+        Post.objects.for_detail(),
+        slug=slug,
+    )
+
+    # A page of threads with their replies: /post/<slug>/?comments=<cursor>
+    _, related_posts, comments, _ = await asyncio.gather(
+        sync_to_async(record_view)(post),
+        related_posts_unless_cached(post),
+        aget_comment_page(post.pk, request.GET.get('comments')),
+        aload_archived_content(post),
+    )
 
     comment_form = CommentForm()
 
@@ -209,16 +257,37 @@ def post_detail(request, slug):
         'comments': comments,
         'comment_form': comment_form,
     }
-    return render(request, 'blog/post_detail.html', context)
+    response = await arender(request, 'blog/post_detail.html', context)
+    # Lets cached copies of this page keep counting views
+    response.post_id = post.pk
+    return response
+
+
+@query_budget(4, max_duplicates=0)
+@read_from_replica
+@cache_anonymous_page(tags=lambda slug: [post_tag(slug)])
+def post_comments(request, slug):
+    """
+    Next page of comment threads as JSON
+
+    URL: /post/<slug>/comments/?cursor=<opaque>
+    """
+    post = get_object_or_404(Post.objects.only('pk'), slug=slug)
+    page = get_comment_page(post.pk, request.GET.get('cursor'))
+
+    return JsonResponse({
+        'comments': [serialize_comment(comment) for comment in page],
+        'next_cursor': page.next_cursor,
+    })
 
 
 @login_required(login_url='/login/')
 def add_comment(request, slug):
-    """Add a comment to a post"""
+    """Add a comment, or a reply to one, to a post"""
     post = get_object_or_404(Post, slug=slug)
 
     if request.method == 'POST':
-        form = CommentForm(request.POST)
+        form = CommentForm(request.POST, post=post)
         if form.is_valid():
             comment = form.save(commit=False)
             comment.post = post
@@ -244,65 +313,83 @@ def delete_comment(request, comment_id):
     return redirect('blog:post_detail', slug=slug)
 
 
-def category_posts(request, category_name):
+@query_budget(6, max_duplicates=0)
+@read_from_replica
+@cache_anonymous_page(tags=lambda slug: [category_tag(slug)])
+@conditional_page(
+    latest=lambda slug: latest_published(category__slug=slug),
+    tags=lambda slug: [category_tag(slug)],
+    last_modified=False,
+)
+async def category_posts(request, slug):
     """
     Display posts filtered by category
 
     URL: /category/technology/
-    Shows only posts in that category
+    Shows only posts in that category; the old name-based URLs
+    (/category/Technology/) redirect to the slug.
     """
+    category = await Category.objects.filter(slug=slug).afirst()
+    if category is None:
+        category = await aget_object_or_404(Category, name__iexact=slug)
+        return redirect('blog:category_posts', slug=category.slug, permanent=True)
+
     posts_queryset = Post.objects.filter(
         status=Post.Status.PUBLISHED,
-        category__name__iexact=category_name
-
-    ).select_related('author', 'category').prefetch_related('tags').order_by('-created_at')
+        category=category,
+    ).for_listing()
 
-    paginator = Paginator(posts_queryset, 9)  # Show 10 posts per page
-    page_number = request.GET.get('page')  # /posts/?page=2
-    posts = paginator.get_page(page_number)
+    paginator = CursorPaginator(posts_queryset, 9, ordering=('-created_at', '-id'))
+    posts = await paginator.aget_page(request.GET.get('cursor'))
 
     context = {
-        'category_name': category_name.title(),
+        'category': category,
+        'category_name': category.name,
         'posts': posts,
-        'post_count': paginator.count,
-
+        'post_count': category.published_post_count,
     }
-    return render(request, 'blog/category_posts.html', context)
+    return await arender(request, 'blog/category_posts.html', context)
 
 
-def search_posts(request):
+@query_budget(6, max_duplicates=0)
+@read_from_replica
+async def search_posts(request):
     """
-    Search posts by title or content or category
+    Ranked full-text search over title, excerpt and content
 
-    URL: /search/?q=django
+    URL: /search/?search=django
     """
 
     posts = Post.objects.filter(
         status=Post.Status.PUBLISHED
-    ).select_related('author', 'category').prefetch_related('tags')
+    ).for_listing()
     # Get a search query from URL parameters
     query = request.GET.get('search', '')  # Default to empty string if no query
 
     if query:
-        search_results = posts.filter(
-            Q(title__icontains=query) |
-            Q(excerpt__icontains=query) |
-            Q(category__name__icontains=query) |
-            Q(author__username__icontains=query)
-        )
+        # The in-memory backend may build its index on first use
+        search_results = await sync_to_async(get_search_backend().search)(posts, query)
+        ordering = SEARCH_ORDERING
     else:
         search_results = posts
+        ordering = ('-created_at', '-id')
 
-    paginator = Paginator(search_results, 9)  # Show 10 posts per page
-    page_number = request.GET.get('page')  # /posts/?page=2
-    posts = paginator.get_page(page_number)
+    paginator = CursorPaginator(
+        search_results, 9,
+        ordering=ordering,
+        count_cache_key=count_cache_key('search', query),
+    )
+    posts, total_results = await asyncio.gather(
+        paginator.aget_page(request.GET.get('cursor')),
+        paginator.acount(),
+    )
 
     context = {
         'query': query,
         'posts': posts,
-        'total_results': paginator.count,
+        'total_results': total_results,
     }
-    return render(request, 'blog/search_results.html', context)
+    return await arender(request, 'blog/search_results.html', context)
 
 
 def contact(request):
@@ -360,26 +447,83 @@ def contact(request):
     return render(request, 'blog/contact.html', context)
 
 
-def author_posts(request, author_name):
-    posts = Post.objects.filter(
-        status=Post.Status.PUBLISHED
-    ).select_related('author', 'category').prefetch_related('tags')
+@query_budget(5, max_duplicates=0)
+@read_from_replica
+@cache_anonymous_page(tags=lambda slug: ['posts'])
+@conditional_page(
+    latest=lambda slug: latest_published(
+        author_id__in=AuthorProfile.objects.filter(slug=slug).values('user_id')
+    ),
+    tags=lambda slug: ['posts'],
+    last_modified=False,
+)
+def author_posts(request, slug):
+    """
+    Published posts of one author, newest first
 
-    author_name_normalized = author_name.lower().replace(' ', '-')
+    URL: /author/<slug>/?cursor=<opaque>
+    The old name-based URLs (/author/John-Doe/) redirect to the slug.
+    """
+    author = AuthorProfile.objects.select_related('user').filter(slug=slug).first()
+    if author is None:
+        # Old URLs spelled spaces in the username as hyphens
+        author = AuthorProfile.objects.filter(
+            Q(user__username__iexact=slug) | Q(user__username__iexact=slug.replace('-', ' '))
+        ).order_by('pk').first()
+        if author is None:
+            raise Http404('No author matches the given query.')
+        return redirect('blog:author_posts', slug=author.slug, permanent=True)
+
+    posts_queryset = Post.objects.filter(
+        author_id=author.user_id,
+        status=Post.Status.PUBLISHED,
+    ).for_listing()
+
+    paginator = CursorPaginator(posts_queryset, 9, ordering=('-created_at', '-id'))
+    posts = paginator.get_page(request.GET.get('cursor'))
 
-    filtered = posts.filter(
-        author__username__iexact=author_name.replace('-', ' ')
-    )
     context = {
-        'author_name': author_name.replace('-', ' ').title(),
-        'posts': filtered,
-        'total_posts': len(filtered),
+        'author': author,
+        'author_name': author.username,
+        'posts': posts,
+        'total_posts': author.published_post_count,
         'current_year': datetime.now().year,
     }
 
     return render(request, 'blog/author_posts.html', context)
 
 
+@query_budget(4, max_duplicates=0)
+@read_from_replica
+@cache_anonymous_page(tags=lambda: ['posts'])
+def authors(request):
+    """
+    Author leaderboard, by published posts or by views
+
+    URL: /authors/?order=views
+    """
+    order = request.GET.get('order')
+    if order not in LEADERBOARD_ORDERINGS:
+        order = 'posts'
+
+    context = {
+        'authors': leaderboard(order),
+        'order': order,
+    }
+    return render(request, 'blog/authors.html', context)
+
+
+@staff_member_required
+def connection_stats(request):
+    """
+    Database connection reuse and pool usage of this worker process
+
+    URL: /stats/connections/
+    """
+    return JsonResponse(get_connection_stats())
+
+
+@query_budget(5, max_duplicates=0)
 class MyPostsView(LoginRequiredMixin, ListView):
     """Display only the current user's posts"""
     model = Post
@@ -387,9 +531,10 @@ class MyPostsView(LoginRequiredMixin, ListView):
     context_object_name = 'posts'
 
     def get_queryset(self):
-        return Post.objects.filter(author=self.request.user)
+        return Post.objects.filter(author=self.request.user).for_listing()
 
 
+@query_budget(5, max_duplicates=0)
 class DraftPostsView(LoginRequiredMixin, ListView):
     """Display only draft posts of current user"""
     model = Post
@@ -400,7 +545,7 @@ class DraftPostsView(LoginRequiredMixin, ListView):
         return Post.objects.filter(
             author=self.request.user,
             status=Post.Status.DRAFT
-        )
+        ).for_listing()
 
 
 class LoginView(DjangoLoginView):